@@ -1,3 +1,5 @@
 """Gscli - A command-line tool."""
 
+from .client import Client, SubmissionStatus, GscliError, SubmissionError, NoSubmissionError
+
 __version__ = "0.1.0"
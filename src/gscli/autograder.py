@@ -0,0 +1,186 @@
+"""Running Gradescope autograders locally (`gscli test`).
+
+A Gradescope autograder bundle is a directory (or the zip uploaded to Gradescope)
+with a run_autograder script and optionally a setup.sh. On Gradescope, the bundle
+is unpacked to /autograder/source, run_autograder is copied to /autograder, the
+submitted files are put in /autograder/submission, and the script writes its
+results to /autograder/results/results.json.
+
+Each run gets that layout in a fresh temporary workspace instead, with every
+mention of /autograder in the workspace's copy of the bundle pointed at the
+workspace, so the bundle runs unchanged. A directory without a run_autograder whose
+subdirectories have one is a set of independent test groups; every group runs in
+its own workspace, in parallel, and their results are merged.
+"""
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+# Seconds a group may run before it's stopped, like Gradescope's default autograder timeout
+AUTOGRADER_TIMEOUT = 10 * 60
+
+# Test groups run at once
+TEST_WORKERS = 4
+
+# Characters of a failed run's output kept for its report
+LOG_LIMIT = 4000
+
+# Where Gradescope puts the autograder, rewritten to the workspace
+AUTOGRADER_ROOT = b"/autograder"
+
+
+class GroupRun(NamedTuple):
+    """The outcome of one test group. results is its results.json, or None if it failed to produce one."""
+    name: str
+    results: dict | None
+    error: str | None
+    duration: float
+    log: str
+    workspace: Path
+
+
+def find_groups(bundle: Path) -> list[tuple[str, Path]]:
+    """The test groups of a bundle, as (name, bundle directory or zip). Raises ValueError if it isn't a bundle."""
+    if bundle.is_file() and zipfile.is_zipfile(bundle):
+        return [(bundle.stem, bundle)]
+    if (bundle / "run_autograder").is_file():
+        return [(bundle.name, bundle)]
+    groups = sorted((d.name, d) for d in bundle.iterdir() if (d / "run_autograder").is_file()) if bundle.is_dir() else []
+    if not groups:
+        raise ValueError(f"{bundle} is not an autograder bundle: it has no run_autograder")
+    return groups
+
+
+def _point_at_workspace(source: Path, root: Path) -> None:
+    """Replace /autograder in every text file of source by root."""
+    for path in source.rglob("*"):
+        if not path.is_file():
+            continue
+        data = path.read_bytes()
+        if AUTOGRADER_ROOT not in data or b"\0" in data:
+            continue
+        path.write_bytes(data.replace(AUTOGRADER_ROOT, os.fsencode(root)))
+
+
+def prepare_workspace(root: Path, bundle: Path, files: list[str]) -> None:
+    """Lay out a bundle and the submitted files in root like Gradescope lays them out in /autograder."""
+    source = root / "source"
+    if bundle.is_file():
+        with zipfile.ZipFile(bundle) as zf:
+            zf.extractall(source)
+    else:
+        shutil.copytree(bundle, source, ignore=shutil.ignore_patterns("__pycache__"))
+    _point_at_workspace(source, root)
+
+    submission = root / "submission"
+    submission.mkdir()
+    for f in files:
+        # uploaded files keep only their names
+        shutil.copy(f, submission / Path(f).name)
+    (root / "results").mkdir()
+
+    shutil.copy(source / "run_autograder", root / "run_autograder")
+    for script in (root / "run_autograder", source / "setup.sh"):
+        if script.exists():
+            script.chmod(script.stat().st_mode | 0o755)
+
+
+def _run(command: list[str], cwd: Path, timeout: float) -> tuple[int | None, str]:
+    """Run a command in its own process group, killing it on timeout. Returns the exit status (None on timeout) and output."""
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                               errors="replace", **kwargs)
+    try:
+        output, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if sys.platform == "win32":
+            # there is no process group signal on Windows; only the command itself is killed
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+        output, _ = process.communicate()
+        return None, output
+    return process.returncode, output
+
+
+def _script(path: Path) -> list[str]:
+    # scripts without a shebang are run by bash, as they would be by Gradescope's image
+    with open(path, "rb") as f:
+        return [str(path)] if f.read(2) == b"#!" else ["bash", str(path)]
+
+
+def run_group(name: str, bundle: Path, files: list[str], timeout: float = AUTOGRADER_TIMEOUT,
+              setup: bool = False, keep: bool = False) -> GroupRun:
+    """Run one test group against the files in a fresh workspace, which is removed afterwards unless keep is set."""
+    root = Path(tempfile.mkdtemp(prefix="gscli-test-"))
+    start = time.monotonic()
+    log = ""
+    try:
+        prepare_workspace(root, bundle, files)
+        if setup and (root / "source" / "setup.sh").exists():
+            status, log = _run(_script(root / "source" / "setup.sh"), root / "source", timeout)
+            if status != 0:
+                error = "setup.sh timed out" if status is None else f"setup.sh exited with status {status}"
+                return GroupRun(name, None, error, time.monotonic() - start, log, root)
+
+        remaining = max(1.0, timeout - (time.monotonic() - start))
+        status, output = _run(_script(root / "run_autograder"), root, remaining)
+        log += output
+        duration = time.monotonic() - start
+        if status is None:
+            return GroupRun(name, None, f"timed out after {timeout:g} seconds", duration, log, root)
+        try:
+            results = json.loads((root / "results" / "results.json").read_text())
+        except (OSError, ValueError) as e:
+            return GroupRun(name, None, f"no results.json (run_autograder exited with status {status}): {e}", duration, log, root)
+        return GroupRun(name, results, None, duration, log, root)
+    except Exception as e:
+        return GroupRun(name, None, str(e), time.monotonic() - start, log, root)
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def run_groups(groups: list[tuple[str, Path]], files: list[str], timeout: float = AUTOGRADER_TIMEOUT, setup: bool = False,
+               keep: bool = False, workers: int = TEST_WORKERS) -> list[GroupRun]:
+    """Run test groups in parallel. Returns their runs in the order given."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda group: run_group(*group, files, timeout, setup, keep), groups))
+
+
+def merge_results(runs: list[GroupRun]) -> dict:
+    """One results JSON for all runs.
+
+    Test names get their group's name as prefix when there are several groups, and a
+    group that produced no results becomes a failed test carrying its output.
+    """
+    tests = []
+    score = 0.0
+    for run in runs:
+        prefix = f"{run.name}: " if len(runs) > 1 else ""
+        if run.results is None:
+            log = run.log if len(run.log) <= LOG_LIMIT else "..." + run.log[-LOG_LIMIT:]
+            tests.append({"name": f"{prefix}{run.error}", "status": "failed", "output": log, "score": 0.0, "max_score": 0.0})
+            continue
+        group_tests = run.results.get("tests", [])
+        for test in group_tests:
+            test_score, max_score = test.get("score", 0.0), test.get("max_score", 0.0)
+            # Gradescope counts tests without a status as passed if they got full marks
+            status = test.get("status") or ("passed" if test_score >= max_score else "failed")
+            tests.append({"name": prefix + test.get("name", "test"), "status": status, "output": test.get("output"),
+                          "score": test_score, "max_score": max_score})
+        score += run.results.get("score", sum(t.get("score", 0.0) for t in group_tests))
+    return {"score": score, "tests": tests}
@@ -0,0 +1,224 @@
+"""Record and replay the HTTP traffic of gscli sessions.
+
+With GSCLI_RECORD=dir every request made through a GscliSession is sent for real and
+appended, with its response, to dir/cassette.jsonl. With GSCLI_REPLAY=dir nothing
+touches the network: responses come from the cassette instead, so the real
+submit/status/list/choose code paths run offline in milliseconds.
+
+Credentials are scrubbed while recording: sensitive query parameters (gradescopeapi
+sends the login form as URL parameters) are replaced by REDACTED, as are cookie values,
+CSRF tokens in response bodies (the csrf-token meta tag and authenticity_token form
+fields), the email and password seen in them, and any extra strings listed,
+comma-separated, in GSCLI_RECORD_SCRUB. Request bodies and headers are never recorded.
+
+Requests are matched by method and scrubbed URL. Repeated requests get the recorded
+responses in order (e.g. a submission that is polled until it's processed), and the
+last one again once those run out. GSCLI_REPLAY_LATENCY adds simulated latency to
+every replayed response: a number of seconds, or "recorded" for the recorded times.
+"""
+import base64
+import json
+import os
+import re
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from .utils import file_lock
+
+RECORD_ENV = "GSCLI_RECORD"
+REPLAY_ENV = "GSCLI_REPLAY"
+LATENCY_ENV = "GSCLI_REPLAY_LATENCY"
+SCRUB_ENV = "GSCLI_RECORD_SCRUB"
+
+CASSETTE_NAME = "cassette.jsonl"
+REDACTED = "REDACTED"
+
+# Query parameters whose values are never recorded. Values of the first two are also
+# scrubbed from everything recorded after them.
+SECRET_PARAMS = {"session[email]", "session[password]"}
+SCRUBBED_PARAMS = SECRET_PARAMS | {"authenticity_token"}
+
+# CSRF tokens in recorded pages: the csrf-token meta tag and authenticity_token form fields
+CSRF_PATTERNS = [
+    re.compile(r'(<meta\b[^>]*\bname="csrf-token"[^>]*\bcontent=")[^"]*'),
+    re.compile(r'(<meta\b[^>]*\bcontent=")[^"]*("[^>]*\bname="csrf-token")'),
+    re.compile(r'(<input\b[^>]*\bname="authenticity_token"[^>]*\bvalue=")[^"]*'),
+    re.compile(r'(<input\b[^>]*\bvalue=")[^"]*("[^>]*\bname="authenticity_token")'),
+]
+
+# Headers that describe the encoding on the wire, which doesn't apply to recorded bodies
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# Secrets seen by any recording session in this process
+_secrets = set()
+
+
+class ReplayError(requests.ConnectionError):
+    """A request has no recorded response."""
+
+
+def scrub_url(url: str) -> str:
+    """Replace the values of sensitive query parameters, remembering the secret ones."""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    params = []
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        if name in SCRUBBED_PARAMS:
+            if name in SECRET_PARAMS and value:
+                _secrets.add(value)
+            value = REDACTED
+        params.append((name, value))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def _scrub_text(text: str) -> str:
+    extra = [s for s in os.environ.get(SCRUB_ENV, "").split(",") if s]
+    for secret in [*_secrets, *extra]:
+        text = text.replace(secret, REDACTED)
+    return text
+
+
+def _scrub_body(text: str) -> str:
+    for pattern in CSRF_PATTERNS:
+        text = pattern.sub(lambda m: m.group(1) + REDACTED + (m.group(2) if pattern.groups > 1 else ""), text)
+    return _scrub_text(text)
+
+
+def _scrub_header(name: str, value: str) -> str:
+    if name.lower() == "set-cookie":
+        # keep the cookie's name and attributes, not its value
+        cookie_name, _, rest = value.partition("=")
+        _, _, attributes = rest.partition(";")
+        value = f"{cookie_name}={REDACTED}" + (f";{attributes}" if attributes else "")
+    return _scrub_text(value)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests for real and appends every scrubbed interaction to a cassette."""
+
+    def __init__(self, directory: Path, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette_file = directory / CASSETTE_NAME
+        self.lock_file = directory / "cassette.lock"
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        elapsed = time.perf_counter() - start
+
+        url = scrub_url(request.url)
+        try:
+            body, encoding = _scrub_body(content.decode("utf-8")), "text"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        headers = [
+            (name, _scrub_header(name, value))
+            for name, value in response.raw.headers.items()
+            if name.lower() not in DROPPED_HEADERS
+        ] if response.raw is not None else []
+
+        interaction = {
+            "method": request.method,
+            "url": url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            "body": body,
+            "encoding": encoding,
+            "elapsed": elapsed,
+        }
+        with file_lock(self.lock_file):
+            with open(self.cassette_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction) + "\n")
+        return response
+
+
+class Cassette:
+    """Recorded interactions, handed out in order per (method, url)."""
+
+    def __init__(self, directory: Path):
+        self.interactions = defaultdict(deque)
+        with open(directory / CASSETTE_NAME, encoding="utf-8") as f:
+            for line in f:
+                interaction = json.loads(line)
+                self.interactions[(interaction["method"], interaction["url"])].append(interaction)
+
+    def next(self, method: str, url: str) -> dict:
+        """The next recorded interaction for a request, repeating the last one once all were used."""
+        recorded = self.interactions.get((method, scrub_url(url)))
+        if not recorded:
+            raise ReplayError(f"No recorded response for {method} {scrub_url(url)}")
+        return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+
+# Cassettes being replayed, shared by all sessions of the process so that
+# consecutive sessions continue where the previous one stopped
+_cassettes = {}
+
+
+def reset() -> None:
+    """Forget replay progress, so the next session replays its cassette from the start."""
+    _cassettes.clear()
+    _secrets.clear()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from a cassette, never touching the network."""
+
+    def __init__(self, directory: Path, latency: str | None = None):
+        super().__init__()
+        key = directory.resolve()
+        if key not in _cassettes:
+            _cassettes[key] = Cassette(directory)
+        self.cassette = _cassettes[key]
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        interaction = self.cassette.next(request.method, request.url)
+        if self.latency == "recorded":
+            time.sleep(interaction["elapsed"])
+        elif self.latency:
+            time.sleep(float(self.latency))
+
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        body = interaction["body"]
+        response._content = body.encode("utf-8") if interaction["encoding"] == "text" else base64.b64decode(body)
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=interaction["elapsed"])
+        return response
+
+    def close(self):
+        pass
+
+
+def mount_cassette(session: requests.Session) -> bool:
+    """Mount a recording or replaying adapter on session if GSCLI_RECORD or GSCLI_REPLAY is set.
+
+    Returns whether the session replays.
+    """
+    replay_dir = os.environ.get(REPLAY_ENV)
+    record_dir = os.environ.get(RECORD_ENV)
+    if replay_dir:
+        adapter = ReplayAdapter(Path(replay_dir), os.environ.get(LATENCY_ENV))
+    elif record_dir:
+        Path(record_dir).mkdir(parents=True, exist_ok=True)
+        adapter = RecordingAdapter(Path(record_dir))
+    else:
+        return False
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return bool(replay_dir)
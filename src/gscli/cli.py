@@ -1,8 +1,10 @@
 """CLI application entry point."""
 
 import typer
+from typing_extensions import Annotated
+from .project import find_project_file
 
-from .gscli import report_current_assignment, submit, join, status, logout, choose, clean, list_assignments_and_courses
+from .gscli import report_current_assignment, submit, join, status, notify, ratelimit, logout, choose, clean, list_assignments_and_courses, grades, due, diff, leaderboard, sync, stats, export, extensions_apply, run_tests, set_offline
 
 
 app = typer.Typer(
@@ -14,18 +16,36 @@ app = typer.Typer(
 )
 
 app.command()(choose)
-app.command(no_args_is_help=True)(submit)
+# inside a project with a .gscli file, a bare `gscli submit` submits the project's files
+app.command(no_args_is_help=find_project_file() is None)(submit)
+app.command(name="test")(run_tests)
 app.command(no_args_is_help=True)(join)
 app.command(name="list")(list_assignments_and_courses)
+app.command()(grades)
+app.command()(due)
+app.command()(sync)
 app.command()(status)
+app.command()(diff)
+app.command()(leaderboard)
+app.command()(stats)
+app.command(no_args_is_help=True)(export)
+extensions_app = typer.Typer(help="Manage per-student extensions (instructors only).", no_args_is_help=True)
+extensions_app.command(name="apply", no_args_is_help=True)(extensions_apply)
+app.add_typer(extensions_app, name="extensions")
+app.command()(notify)
+app.command()(ratelimit)
 app.command()(logout)
 app.command()(clean)
 # if __name__ == "__main__":
 #     app()
 
 @app.callback(invoke_without_command=True)
-def main(ctx: typer.Context):
+def main(
+    ctx: typer.Context,
+    offline: Annotated[bool, typer.Option("--offline", help="Answer read commands from the local mirror (see gscli sync) without network access")] = False,
+):
     """Default action when no subcommand is given."""
+    set_offline(offline)
     if ctx.invoked_subcommand is None:
         report_current_assignment()
         print("Run gscli --help on how to submit your assignment or choose a different assignment.")
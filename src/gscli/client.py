@@ -0,0 +1,264 @@
+"""Python API for Gradescope.
+
+Client owns one authenticated session (and with it one connection pool), so services
+can reuse a single warm client for many operations instead of running `gscli` once
+per job. The CLI commands are a thin layer over this class.
+
+Example:
+
+    from gscli import Client
+
+    client = Client.restore() or Client.login(email, password)
+    link = client.submit("1197898", "7308477", ["calculator.py"])
+    status = client.wait_for_results(link)
+    for result in status.results:
+        print(result.name, result.score, result.max_score)
+
+Every method that talks to Gradescope has an `_async` variant for asyncio callers.
+"""
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+from .utils import (
+    TestCaseResult, StagedUpload, collect_file_objs, get_courses, get_submissions, fetch_submission_status,
+    make_submission_link, parse_results_json, restore_connection, login_gradescope, store_session_cookies,
+    stage_upload, dispatch_staged_upload, build_archive, ARCHIVE_COMPRESSION_LEVEL,
+)
+
+# Defaults for waiting on autograder results
+RESULTS_TIMEOUT = 100  # seconds
+POLL_INTERVAL = 1  # seconds
+
+
+class GscliError(Exception):
+    """Base class of the errors raised by Client."""
+
+
+class SubmissionError(GscliError):
+    """Gradescope did not accept a submission."""
+
+
+class NoSubmissionError(GscliError):
+    """The assignment has no submission yet."""
+
+
+class SubmissionStatus(NamedTuple):
+    """The status of a submission, with its parsed results once it's processed."""
+    link: str
+    status: str
+    results: list[TestCaseResult] | None
+    json: dict
+
+    @property
+    def processed(self) -> bool:
+        return self.status == "processed"
+
+
+class Client:
+    """An authenticated Gradescope session.
+
+    Create one with Client.login() or Client.restore(), or wrap an existing
+    gradescopeapi GSConnection. Methods return values and raise exceptions; they
+    never print or exit.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @classmethod
+    def login(cls, email: str, password: str) -> "Client":
+        """Log in with email and password. Raises ValueError on invalid credentials."""
+        return cls(login_gradescope(email, password))
+
+    @classmethod
+    def restore(cls) -> "Client | None":
+        """Restore the session cached by save_session() (or the CLI). Returns None if it's missing or expired."""
+        connection = restore_connection()
+        return cls(connection) if connection is not None else None
+
+    @property
+    def session(self):
+        """The underlying requests session."""
+        return self.connection.session
+
+    def save_session(self) -> None:
+        """Cache the session cookies so later clients and CLI runs can restore the session."""
+        store_session_cookies(self.session)
+
+    def connection_stats(self) -> tuple[int, int]:
+        """Connections opened and requests sent by this client so far; many requests per connection means good reuse."""
+        return self.session.connection_stats()
+
+    def close(self) -> None:
+        """Close the session's pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def list_courses(self) -> dict:
+        """Map course ids to gradescopeapi Course objects, for both student and instructor courses."""
+        return get_courses(self.connection)
+
+    def list_assignments(self, course_id: str) -> list:
+        """List a course's assignments as gradescopeapi Assignment objects."""
+        return list(self.connection.account.get_assignments(course_id=course_id))
+
+    def submit(self, course_id: str, assignment_id: str, files: list, leaderboard_name: str | None = None, recursive: bool = False,
+               archive: bool = False, compression_level: int = ARCHIVE_COMPRESSION_LEVEL) -> str:
+        """Upload files to an assignment and return the submission link.
+
+        files can mix paths (directories are expanded, recursively if recursive is set)
+        and file objects opened in binary mode. Files opened here are closed again.
+        With archive set, the files are uploaded as a single zip compressed at compression_level.
+        Raises SubmissionError if Gradescope rejects the submission.
+        """
+        from gradescopeapi.classes.upload import upload_assignment
+
+        file_objs, opened = self._open_files(files, recursive)
+        if not file_objs:
+            raise SubmissionError("No files to submit")
+        try:
+            if archive:
+                file_objs = [build_archive(file_objs, compression_level)]
+            submission_link = upload_assignment(self.session, course_id, assignment_id, *file_objs, leaderboard_name=leaderboard_name)
+        except Exception as e:
+            # gradescopeapi raises internal errors for some invalid course ids
+            raise SubmissionError(f"Failed to submit: {e}") from e
+        finally:
+            for f in opened:
+                f.close()
+
+        if submission_link is None:
+            raise SubmissionError("Failed to submit. Check the course and assignment ids, "
+                                  "that the assignment accepts submissions and that no required field is missing.")
+        return submission_link
+
+    def stage_submission(self, course_id: str, assignment_id: str, files: list, leaderboard_name: str | None = None, recursive: bool = False,
+                         archive: bool = False, compression_level: int = ARCHIVE_COMPRESSION_LEVEL) -> StagedUpload:
+        """Prepare a submission so that dispatch() sends it with a single request.
+
+        files are handled as in submit(); their contents are read into memory now.
+        """
+        file_objs, opened = self._open_files(files, recursive)
+        if not file_objs:
+            raise SubmissionError("No files to submit")
+        try:
+            if archive:
+                file_objs = [build_archive(file_objs, compression_level)]
+            return stage_upload(self.session, course_id, assignment_id, file_objs, leaderboard_name=leaderboard_name)
+        finally:
+            for f in opened:
+                f.close()
+
+    def dispatch(self, staged: StagedUpload) -> tuple[str, float]:
+        """Send a staged submission. Returns the submission link and how long Gradescope took to accept it, in seconds."""
+        submission_link, latency = dispatch_staged_upload(self.session, staged)
+        if submission_link is None:
+            raise SubmissionError("Gradescope rejected the submission")
+        return submission_link, latency
+
+    def submission_status(self, submission_link: str) -> SubmissionStatus:
+        """Fetch the status of a submission."""
+        status_json = fetch_submission_status(self.session, submission_link)
+        results = parse_results_json(status_json["results"]) if status_json["status"] == "processed" else None
+        return SubmissionStatus(submission_link, status_json["status"], results, status_json)
+
+    def latest_submissions(self, course_id: str) -> dict[str, str]:
+        """Map the ids of a course's assignments to the ids of their latest submissions."""
+        return get_submissions(self.session, course_id=course_id)
+
+    def latest_submission_link(self, course_id: str, assignment_id: str) -> str:
+        """Link to the latest submission to an assignment. Raises NoSubmissionError if there is none."""
+        assignment_submissions = self.latest_submissions(course_id)
+        if assignment_id not in assignment_submissions:
+            raise NoSubmissionError(f"No submission found for assignment {assignment_id} in course {course_id}")
+        return make_submission_link(course_id, assignment_id, assignment_submissions[assignment_id])
+
+    def status(self, course_id: str, assignment_id: str) -> SubmissionStatus:
+        """Fetch the status of the latest submission to an assignment."""
+        return self.submission_status(self.latest_submission_link(course_id, assignment_id))
+
+    def wait_for_results(self, submission_link: str, timeout: float = RESULTS_TIMEOUT, poll_interval: float = POLL_INTERVAL,
+                         on_status: Callable[[SubmissionStatus], None] | None = None, first_poll_after: float = 0) -> SubmissionStatus:
+        """Poll a submission until it's processed or timeout seconds have passed, and return its last status.
+
+        on_status is called with every status fetched. The first poll waits first_poll_after
+        seconds, for submissions that can't be done sooner.
+        """
+        start_time = time.monotonic()
+        time.sleep(max(0.0, min(first_poll_after, timeout)))
+        while True:
+            status = self.submission_status(submission_link)
+            if on_status is not None:
+                on_status(status)
+            if status.processed or time.monotonic() - start_time >= timeout:
+                return status
+            time.sleep(poll_interval)
+
+    def _open_files(self, files: list, recursive: bool) -> tuple[list, list]:
+        """Open the paths in files. Returns all file objects, and the ones opened here."""
+        paths = [str(f) for f in files if isinstance(f, (str, Path))]
+        opened = collect_file_objs(paths, recursive=recursive) if paths else []
+        return [f for f in files if not isinstance(f, (str, Path))] + opened, opened
+
+    # asyncio variants. Requests run in worker threads; waiting between polls doesn't block one.
+    # asyncio is imported in each method because importing it slows down every CLI run.
+
+    async def list_courses_async(self) -> dict:
+        import asyncio
+        return await asyncio.to_thread(self.list_courses)
+
+    async def list_assignments_async(self, course_id: str) -> list:
+        import asyncio
+        return await asyncio.to_thread(self.list_assignments, course_id)
+
+    async def submit_async(self, course_id: str, assignment_id: str, files: list, leaderboard_name: str | None = None, recursive: bool = False,
+                           archive: bool = False, compression_level: int = ARCHIVE_COMPRESSION_LEVEL) -> str:
+        import asyncio
+        return await asyncio.to_thread(self.submit, course_id, assignment_id, files, leaderboard_name, recursive,
+                                       archive, compression_level)
+
+    async def stage_submission_async(self, course_id: str, assignment_id: str, files: list, leaderboard_name: str | None = None,
+                                     recursive: bool = False, archive: bool = False,
+                                     compression_level: int = ARCHIVE_COMPRESSION_LEVEL) -> StagedUpload:
+        import asyncio
+        return await asyncio.to_thread(self.stage_submission, course_id, assignment_id, files, leaderboard_name, recursive,
+                                       archive, compression_level)
+
+    async def dispatch_async(self, staged: StagedUpload) -> tuple[str, float]:
+        import asyncio
+        return await asyncio.to_thread(self.dispatch, staged)
+
+    async def submission_status_async(self, submission_link: str) -> SubmissionStatus:
+        import asyncio
+        return await asyncio.to_thread(self.submission_status, submission_link)
+
+    async def latest_submissions_async(self, course_id: str) -> dict[str, str]:
+        import asyncio
+        return await asyncio.to_thread(self.latest_submissions, course_id)
+
+    async def latest_submission_link_async(self, course_id: str, assignment_id: str) -> str:
+        import asyncio
+        return await asyncio.to_thread(self.latest_submission_link, course_id, assignment_id)
+
+    async def status_async(self, course_id: str, assignment_id: str) -> SubmissionStatus:
+        import asyncio
+        return await asyncio.to_thread(self.status, course_id, assignment_id)
+
+    async def wait_for_results_async(self, submission_link: str, timeout: float = RESULTS_TIMEOUT, poll_interval: float = POLL_INTERVAL,
+                                     on_status: Callable[[SubmissionStatus], None] | None = None, first_poll_after: float = 0) -> SubmissionStatus:
+        import asyncio
+
+        start_time = time.monotonic()
+        await asyncio.sleep(max(0.0, min(first_poll_after, timeout)))
+        while True:
+            status = await self.submission_status_async(submission_link)
+            if on_status is not None:
+                on_status(status)
+            if status.processed or time.monotonic() - start_time >= timeout:
+                return status
+            await asyncio.sleep(poll_interval)
@@ -0,0 +1,54 @@
+"""Shell completion callbacks for course and assignment ids.
+
+These run on every tab press, so they answer only from the local index and never
+import gradescopeapi or requests or touch the network. The index is filled in by
+commands that fetch course metadata, like `gscli list` and `gscli choose`.
+"""
+import time
+from datetime import datetime
+import typer
+from .index import load_index
+from .utils import retrieve_current_assignment
+
+
+def complete_course(incomplete: str) -> list[tuple[str, str]]:
+    """Complete a course id from the local index."""
+    courses = load_index()["courses"]
+    return [
+        (course_id, f"{course['name']} ({course['term']})".strip())
+        for course_id, course in courses.items()
+        if course_id.startswith(incomplete)
+    ]
+
+
+def complete_assignment(ctx: typer.Context, incomplete: str) -> list[tuple[str, str]]:
+    """Complete an assignment id of the course given on the command line (or the current course) from the local index."""
+    course_id = ctx.params.get("course")
+    if course_id is None:
+        current_assignment = retrieve_current_assignment()
+        if current_assignment is None:
+            return []
+        course_id = current_assignment["course"]
+
+    course = load_index()["courses"].get(str(course_id))
+    if course is None:
+        return []
+
+    now = time.time()
+    matches = [
+        (assignment_id, a)
+        for assignment_id, a in course["assignments"].items()
+        if assignment_id.startswith(incomplete)
+    ]
+    # upcoming deadlines first (soonest first), then everything else (most recent first)
+    matches.sort(key=lambda m: (
+        m[1]["due"] is None or m[1]["due"] < now,
+        abs((m[1]["due"] or 0) - now),
+    ))
+
+    def describe(a: dict) -> str:
+        if a["due"] is None:
+            return a["name"]
+        return f"{a['name']} (due {datetime.fromtimestamp(a['due']):%m/%d %H:%M})"
+
+    return [(assignment_id, describe(a)) for assignment_id, a in matches]
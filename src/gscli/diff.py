@@ -0,0 +1,61 @@
+"""Test case changes between two submissions, for `gscli diff` and `gscli submit`.
+
+Test cases are aligned by name through a dict, so comparing two runs is linear in the
+number of tests. Results come from the local results store.
+"""
+from typing import NamedTuple
+from .utils import TestCaseResult, parse_results_json
+from .results import all_entries
+
+
+class TestChange(NamedTuple):
+    """A test case whose outcome differs between two runs. before or after is None if the test is missing from that run."""
+    name: str
+    before: TestCaseResult | None
+    after: TestCaseResult | None
+
+
+def _by_name(results: list[TestCaseResult]) -> dict[tuple[str, int], TestCaseResult]:
+    """Key test cases by name, numbering repeated names in order of appearance."""
+    keyed = {}
+    seen = {}
+    for result in results:
+        n = seen.get(result.name, 0)
+        seen[result.name] = n + 1
+        keyed[(result.name, n)] = result
+    return keyed
+
+
+def diff_results(old: list[TestCaseResult], new: list[TestCaseResult]) -> list[TestChange]:
+    """Test cases that were added, removed, or changed status or score, in the order of new (removed ones last)."""
+    old_by_name = _by_name(old)
+    new_by_name = _by_name(new)
+    changes = []
+    for key, after in new_by_name.items():
+        before = old_by_name.get(key)
+        if before is None or (before.passed, before.score, before.max_score) != (after.passed, after.score, after.max_score):
+            changes.append(TestChange(after.name, before, after))
+    for key, before in old_by_name.items():
+        if key not in new_by_name:
+            changes.append(TestChange(before.name, before, None))
+    return changes
+
+
+def total_score(results: list[TestCaseResult]) -> tuple[float, float]:
+    """Points earned and possible over all test cases."""
+    return sum(r.score for r in results), sum(r.max_score for r in results)
+
+
+def entry_results(entry: dict) -> list[TestCaseResult]:
+    """The parsed test case results of a processed store entry."""
+    return parse_results_json(entry["results"])
+
+
+def previous_entry(entry: dict) -> dict | None:
+    """The newest processed submission to the same assignment made before entry, if the store has one."""
+    earlier = [
+        e for e in all_entries()
+        if e["course"] == entry["course"] and e["assignment"] == entry["assignment"]
+        and e["status"] == "processed" and e["submitted_at"] < entry["submitted_at"]
+    ]
+    return earlier[-1] if earlier else None
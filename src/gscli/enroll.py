@@ -0,0 +1,106 @@
+"""Joining courses with entry codes (`gscli join`).
+
+gradescopeapi has no call for this, so the account page's enroll form is posted
+directly: one request for the CSRF token, then one POST per code, all sent
+concurrently over the same session. Gradescope redirects a successful enrollment to
+the course page, which gives away the course id.
+
+The course each code led to is remembered in the local index under "entry_codes".
+A code whose course the user is still enrolled in is skipped without a request, and
+a code that turns out to lead to a course the user was already in is reported as such.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+from .utils import GRADESCOPE_URL
+
+ENROLL_URL = f"{GRADESCOPE_URL}/courses/enroll"
+
+# Codes sent at once
+ENROLL_WORKERS = 8
+
+# Outcomes of a code
+JOINED = "joined"
+ALREADY_ENROLLED = "already enrolled"
+FAILED = "failed"
+
+
+class JoinResult(NamedTuple):
+    code: str
+    outcome: str
+    course_id: str | None = None
+    detail: str = ""
+
+
+def normalize_code(code: str) -> str:
+    return code.strip().upper()
+
+
+def read_codes(path: Path) -> list[str]:
+    """Entry codes from a file, one per line. Blank lines and lines starting with # are ignored."""
+    lines = Path(path).read_text().splitlines()
+    return [normalize_code(line) for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def csrf_token(session) -> str:
+    """The authenticity token the account page's forms are posted with."""
+    from bs4 import BeautifulSoup
+
+    response = session.get(f"{GRADESCOPE_URL}/account")
+    response.raise_for_status()
+    token = BeautifulSoup(response.text, "html.parser").find("meta", {"name": "csrf-token"})
+    if token is None:
+        raise RuntimeError("Could not find an authenticity token. Is your session still valid?")
+    return token["content"]
+
+
+def enroll(session, token: str, code: str) -> tuple[str | None, str]:
+    """Post one entry code. Returns the id of the course it led to (None if it was refused) and Gradescope's message."""
+    from bs4 import BeautifulSoup
+
+    response = session.post(ENROLL_URL, data={"authenticity_token": token, "course[entry_code]": code},
+                            headers={"Referer": f"{GRADESCOPE_URL}/account"})
+    response.raise_for_status()
+    alert = BeautifulSoup(response.text, "html.parser").select_one(".alert")
+    message = " ".join(alert.get_text().split()) if alert is not None else ""
+    match = re.search(r"/courses/(\d+)", response.url)
+    return (match.group(1) if match else None), message
+
+
+def join_courses(session, codes: list[str], enrolled: set[str], known_codes: dict[str, str],
+                 workers: int = ENROLL_WORKERS) -> list[JoinResult]:
+    """Enroll with every code, in the given order.
+
+    enrolled holds the ids of the user's courses, and known_codes maps codes used
+    before to the course they led to; codes for courses in enrolled are skipped.
+    known_codes is updated with every code that leads to a course.
+    """
+    codes = list(dict.fromkeys(normalize_code(code) for code in codes))
+    results = {}
+    todo = []
+    for code in codes:
+        if known_codes.get(code) in enrolled:
+            results[code] = JoinResult(code, ALREADY_ENROLLED, known_codes[code])
+        else:
+            todo.append(code)
+
+    if todo:
+        token = csrf_token(session)
+
+        def attempt(code: str) -> JoinResult:
+            try:
+                course_id, message = enroll(session, token, code)
+            except Exception as e:
+                return JoinResult(code, FAILED, detail=str(e))
+            if course_id is None:
+                outcome = ALREADY_ENROLLED if "already" in message.lower() else FAILED
+                return JoinResult(code, outcome, detail=message or "Gradescope did not accept the code")
+            return JoinResult(code, ALREADY_ENROLLED if course_id in enrolled else JOINED, course_id)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(attempt, todo):
+                results[result.code] = result
+                if result.course_id is not None:
+                    known_codes[result.code] = result.course_id
+    return [results[code] for code in codes]
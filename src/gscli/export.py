@@ -0,0 +1,137 @@
+"""Bulk export of an assignment's submissions, for instructors (`gscli export`).
+
+Every submission gets a directory named by its id, holding the submitted files and
+the autograder's results.json. Submissions are exported concurrently by a bounded
+thread pool; files are streamed to disk in chunks. A checkpoint file in the export
+directory lists the submissions that were exported completely, so an interrupted
+export resumes where it stopped. Files are written under a temporary name and renamed
+once complete, so a half-written file is never mistaken for a finished one.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+from urllib.parse import unquote, urlsplit
+from .utils import GRADESCOPE_URL, fetch_submission_status, make_submission_link, write_json_atomic
+
+CHECKPOINT_NAME = ".gscli-export.json"
+
+
+class NoCodeFilesError(Exception):
+    """A submission has no files that can be downloaded, e.g. because it only has images or PDFs."""
+
+# Submissions exported at once
+EXPORT_WORKERS = 8
+
+# Bytes read from the network and written to disk at a time
+CHUNK_SIZE = 64 * 1024
+
+
+def list_submission_ids(session, course_id: str, assignment_id: str) -> list[str]:
+    """Ids of the latest submission of every student, from the assignment's review grades page."""
+    from bs4 import BeautifulSoup
+
+    response = session.get(f"{GRADESCOPE_URL}/courses/{course_id}/assignments/{assignment_id}/review_grades")
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    return [a["href"].rstrip("/").rsplit("/", 1)[-1] for a in soup.select("td.table--primaryLink a") if a.get("href")]
+
+
+def load_checkpoint(dest: Path, course_id: str, assignment_id: str) -> set[str]:
+    """Submissions already exported to dest for this assignment."""
+    try:
+        checkpoint = json.loads((dest / CHECKPOINT_NAME).read_text())
+    except (OSError, ValueError):
+        return set()
+    if (checkpoint.get("course"), checkpoint.get("assignment")) != (course_id, assignment_id):
+        return set()
+    return set(checkpoint.get("done", []))
+
+
+def save_checkpoint(dest: Path, course_id: str, assignment_id: str, done: set[str]) -> None:
+    write_json_atomic(dest / CHECKPOINT_NAME, {"course": course_id, "assignment": assignment_id, "done": sorted(done)})
+
+
+def download(session, url: str, path: Path) -> None:
+    """Stream url to path."""
+    partial = path.with_name(path.name + ".part")
+    with session.get(url, stream=True) as response:
+        response.raise_for_status()
+        with open(partial, "wb") as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+    os.replace(partial, path)
+
+
+def file_names(urls: list[str]) -> list[str]:
+    """Names to save files under, from their (presigned) URLs. Repeated names get a numeric prefix."""
+    names = []
+    seen = set()
+    for url in urls:
+        name = Path(unquote(urlsplit(url).path)).name or "file"
+        candidate, n = name, 1
+        while candidate in seen:
+            candidate = f"{n}_{name}"
+            n += 1
+        seen.add(candidate)
+        names.append(candidate)
+    return names
+
+
+def export_submission(session, course_id: str, assignment_id: str, submission_id: str, dest: Path) -> None:
+    """Download one submission's files and results into dest/<submission id>."""
+    from gradescopeapi.classes._helpers._assignment_helpers import get_submission_files
+
+    # gradescopeapi raises NotImplementedError for submissions without text files (images
+    # or PDFs only), and UnboundLocalError when the file list can't be fetched
+    try:
+        urls = get_submission_files(session, course_id, assignment_id, submission_id) or []
+    except NotImplementedError:
+        raise NoCodeFilesError(f"submission {submission_id} has no downloadable code files") from None
+    except UnboundLocalError:
+        raise RuntimeError(f"could not fetch the file list of submission {submission_id}") from None
+
+    directory = dest / submission_id
+    directory.mkdir(parents=True, exist_ok=True)
+    for url, name in zip(urls, file_names(urls)):
+        download(session, url, directory / name)
+
+    status_json = fetch_submission_status(session, make_submission_link(course_id, assignment_id, submission_id))
+    write_json_atomic(directory / "results.json", status_json.get("results"))
+
+
+def export_assignment(session, course_id: str, assignment_id: str, dest: Path, workers: int = EXPORT_WORKERS,
+                      on_start: Callable[[int], None] | None = None,
+                      on_progress: Callable[[str, Exception | None], None] | None = None) -> tuple[int, int, dict[str, Exception]]:
+    """Export every submission to an assignment that isn't in dest's checkpoint yet.
+
+    on_start is called with the number of submissions to export, and on_progress with
+    each submission id once it's done, with the exception if it failed. Returns how
+    many submissions were exported and skipped, and the failures. Submissions without
+    code files fail with NoCodeFilesError.
+    """
+    dest.mkdir(parents=True, exist_ok=True)
+    submission_ids = list_submission_ids(session, course_id, assignment_id)
+    done = load_checkpoint(dest, course_id, assignment_id)
+    todo = [s for s in submission_ids if s not in done]
+    if on_start is not None:
+        on_start(len(todo))
+
+    exported = 0
+    failed = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(export_submission, session, course_id, assignment_id, s, dest): s for s in todo}
+        # the checkpoint is only written from this thread
+        for future in as_completed(futures):
+            submission_id = futures[future]
+            error = future.exception()
+            if error is None:
+                done.add(submission_id)
+                save_checkpoint(dest, course_id, assignment_id, done)
+                exported += 1
+            else:
+                failed[submission_id] = error
+            if on_progress is not None:
+                on_progress(submission_id, error)
+    return exported, len(submission_ids) - len(todo), failed
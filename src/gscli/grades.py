@@ -0,0 +1,79 @@
+"""Grade snapshots across all courses, for `gscli grades`.
+
+A snapshot records every assignment's grade and the earned/possible points per
+course at one point in time. Snapshots are kept locally so repeated views don't
+refetch anything, and so grades can be compared with an earlier snapshot.
+"""
+import json
+import time
+from .utils import GLOBAL_CONFIG_DIR, write_json_atomic
+
+GRADES_FILE = GLOBAL_CONFIG_DIR / "grades.json"
+
+# Oldest snapshots are dropped beyond this many
+MAX_SNAPSHOTS = 100
+
+# A snapshot younger than this is shown instead of fetching grades again
+CACHE_MAX_AGE = 60 * 60  # seconds
+
+
+def _points(value) -> float | None:
+    """Parse a grade from gradescopeapi, which is None or empty for ungraded assignments."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def take_snapshot(course_list: dict, assignments_by_course: dict[str, list]) -> dict:
+    """Aggregate the grades of gradescopeapi Assignment objects per course.
+
+    Only assignments with both a grade and a maximum grade count towards a course's points.
+    """
+    courses = {}
+    for course_id, assignments in assignments_by_course.items():
+        graded = {}
+        for a in assignments:
+            grade, max_grade = _points(a.grade), _points(a.max_grade)
+            if a.assignment_id and grade is not None and max_grade is not None:
+                graded[a.assignment_id] = {"name": a.name, "grade": grade, "max_grade": max_grade}
+        courses[course_id] = {
+            "name": course_list[course_id].name,
+            "earned": sum(a["grade"] for a in graded.values()),
+            "possible": sum(a["max_grade"] for a in graded.values()),
+            "assignments": graded,
+        }
+    return {"taken_at": time.time(), "courses": courses}
+
+
+def load_snapshots() -> list[dict]:
+    """Load all stored snapshots, oldest first."""
+    try:
+        return json.loads(GRADES_FILE.read_text())
+    except (OSError, ValueError):
+        return []
+
+
+def save_snapshot(snapshot: dict) -> None:
+    """Append a snapshot to the store."""
+    snapshots = load_snapshots()
+    snapshots.append(snapshot)
+    write_json_atomic(GRADES_FILE, snapshots[-MAX_SNAPSHOTS:])
+
+
+def snapshot_before(snapshots: list[dict], when: float) -> dict | None:
+    """The newest snapshot taken at or before the timestamp when, if any."""
+    earlier = [s for s in snapshots if s["taken_at"] <= when]
+    return earlier[-1] if earlier else None
+
+
+def changed_assignments(old: dict, new: dict) -> list[tuple[str, str, dict | None, dict]]:
+    """Assignments graded or regraded between two snapshots, as (course id, assignment id, old grade, new grade)."""
+    changes = []
+    for course_id, course in new["courses"].items():
+        old_assignments = old["courses"].get(course_id, {}).get("assignments", {})
+        for assignment_id, a in course["assignments"].items():
+            before = old_assignments.get(assignment_id)
+            if before is None or (before["grade"], before["max_grade"]) != (a["grade"], a["max_grade"]):
+                changes.append((course_id, assignment_id, before, a))
+    return changes
@@ -1,40 +1,76 @@
 """CLI commands."""
-import sys
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime, timezone
 from rich import print
-from rich.spinner import Spinner
-from rich.live import Live
-from gradescopeapi.classes.upload import upload_assignment
 from pathlib import Path
 import typer
-from typing import List
+from typing import List, TYPE_CHECKING
 from typing_extensions import Annotated
-from questionary import Choice
-import questionary
 from .utils import (
-  collect_file_objs, get_courses, write_to_current_assignment_file, report_test_case_results,
-  login_gradescope, restore_connection, retrieve_current_assignment, store_session_cookies, parse_results_json,
-  get_submissions, fetch_submission_status, make_submission_link,
-  clear_session_cache, clear_current_assignment_file
+  collect_file_objs, write_to_current_assignment_file, report_test_case_results,
+  retrieve_current_assignment, parse_results_json,
+  clear_session_cache, clear_current_assignment_file,
+  parse_target_time, parse_past_time, parse_duration, ping_gradescope, KEEP_WARM_INTERVAL,
+  build_archive, ARCHIVE_COMPRESSION_LEVEL, make_submission_link, print_err
 )
+from .client import Client, SubmissionError, NoSubmissionError, RESULTS_TIMEOUT, POLL_INTERVAL
+from .index import (
+    load_index, save_index, index_courses, index_assignments, index_submissions, deadlines_between, LATE_DUE,
+    mirrored_courses, mirrored_assignments,
+)
+from .completion import complete_course, complete_assignment
+from .results import load_entry, save_entry, new_entry, record_status, note_phase, unnotified_entries, submission_id_from_link, all_entries, submission_time
+from .poller import spawn_poller
+from .ratelimit import RateLimiter
+from .grades import load_snapshots, save_snapshot, take_snapshot, snapshot_before, changed_assignments, CACHE_MAX_AGE
+from .watch import PollScheduler, discover
+from .diff import diff_results, entry_results, previous_entry, total_score
+from .project import find_project_file, load_project, write_project_file
+from .timings import load_timings, summarize, expected_total, earliest_results, UPLOADED
+from .export import export_assignment, EXPORT_WORKERS, NoCodeFilesError
+from .preflight import run_preflight
+from .autograder import find_groups, run_groups, merge_results, AUTOGRADER_TIMEOUT, TEST_WORKERS
+from .leaderboard import refresh_leaderboard, load_cached_leaderboard, name_column, LEADERBOARD_INTERVAL
+from .enroll import join_courses, read_codes, ENROLL_WORKERS, JOINED, FAILED as JOIN_FAILED
+from .extensions import read_extensions, apply_extensions, ExtensionsFileError, APPLY_WORKERS, APPLIED, SKIPPED, FAILED
 
-# Global GSConnection connecting to Gradescope
-connection = None
+if TYPE_CHECKING:
+    from rich.table import Table
 
-def print_err(e: Exception | str, color: bool = True) -> None:
-    """Print an error message."""
-    message = e.message if hasattr(e, 'message') else str(e)
-    if color:
-        print(f"[red]{message}[/red]", file=sys.stderr)
-    else:
-        print(message, file=sys.stderr)
+# Global Client connected to Gradescope
+client = None
+
+# Set by the global --offline flag: read commands answer from the local mirror (see gscli sync)
+offline = False
+
+# Threads used by choose to fetch the assignments of all courses up front
+PREFETCH_WORKERS = 8
+
+status_messages = {
+    'unprocessed': 'Waiting to be processed',
+    'autograder_harness_started': 'Preparing autograder',
+    'autograder_task_started': 'Autograder running',
+    'processed': 'Results ready'
+}
+
+def set_offline(value: bool) -> None:
+    global offline
+    offline = value
 
 # TODO add SSO option to login through institution through browser (or some other way through the command line?)
+def require_online() -> None:
+    """Exit if gscli was run with --offline."""
+    if offline:
+        print_err("This needs network access. Run it without --offline.")
+        exit(1)
+
 def login_if_needed() -> None:
-    global connection
-    connection = restore_connection()
-    if connection is not None:
+    global client
+    require_online()
+    client = Client.restore()
+    if client is not None:
         print("[blue]Restored previous session.[/blue]")
     else:
         print("[yellow]Please log in to Gradescope. Your credentials will not be saved anywhere.[/yellow]")
@@ -42,8 +78,8 @@ def login_if_needed() -> None:
         email = typer.prompt("Gradescope Email", hide_input=False)
         password = typer.prompt("Gradescope Password", hide_input=True)
         try:
-            connection = login_gradescope(email, password)
-            store_session_cookies(connection.session)
+            client = Client.login(email, password)
+            client.save_session()
             print("[blue]Thank you! You are now logged in.[/blue]")
         except Exception as e:
             print_err(e)
@@ -59,10 +95,12 @@ def report_current_assignment() -> None:
         return
     
     course = current_assignment["course"]
-    course_name = current_assignment["course_name"]
+    course_name = current_assignment.get("course_name", course)
     assignment = current_assignment["assignment"]
-    assignment_name = current_assignment["assignment_name"]
+    assignment_name = current_assignment.get("assignment_name", assignment)
     print(f"You're working on {assignment_name} ({assignment}) for {course_name} ({course})")
+    if "root" in current_assignment:
+        print(f"[blue]Set for this project in {Path(current_assignment['root'])}[/blue]")
 
 def load_current_assignment_info_or_exit() -> dict:
     """Retrieve the course and assignment set by the user. If not set, remind user to set the current assignment and exit."""
@@ -81,55 +119,136 @@ def format_assignment(assignment_id: str, assignment_obj) -> str:
     """Format an assignment object from gradescopeapi into a string for display"""
     return f"{assignment_id} - {assignment_obj.name}"
 
-def report_submission_results(list_of_results: list, submission_link: str) -> None:
+def format_age(timestamp: float | None) -> str:
+    """Describe when mirrored data was fetched, like 2025-10-01 14:05 (3 hrs ago)."""
+    if timestamp is None:
+        return "never"
+    return f"{datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M} ({format_time_left(time.time() - timestamp)} ago)"
+
+def report_submission_results(list_of_results: list, submission_link: str | None) -> None:
     for result in list_of_results:
         print(report_test_case_results(result))
-    print(f"[blue]View your submission at {submission_link}[/blue]")
+    if submission_link is not None:
+        print(f"[blue]View your submission at {submission_link}[/blue]")
 
 def join(
-    course: Annotated[int, typer.Argument(help="Course id")],
+    codes: Annotated[List[str] | None, typer.Argument(help="Course entry codes", show_default=False)] = None,
+    from_file: Annotated[Path | None, typer.Option("--from-file", help="File with one entry code per line", exists=True, dir_okay=False)] = None,
+    workers: Annotated[int, typer.Option("-w", "--workers", min=1, help="Codes sent at once")] = ENROLL_WORKERS,
 ) -> None:
-    """Join a course."""
-    pass
+    """Join courses with their entry codes. Courses you're already enrolled in are skipped."""
+    codes = list(codes or [])
+    if from_file is not None:
+        codes += read_codes(from_file)
+    if not codes:
+        print_err("Give at least one entry code, or a file of them with --from-file.")
+        exit(1)
 
-    # store_session_cookies(connection.session)
+    login_if_needed()
+    index = load_index()
+    known_codes = index.setdefault("entry_codes", {})
+    try:
+        course_list = client.list_courses()
+        results = join_courses(client.session, codes, set(course_list), known_codes, workers=workers)
+        # the course list is refreshed once, after all the codes
+        if any(r.outcome == JOINED for r in results):
+            course_list = client.list_courses()
+    except Exception as e:
+        print_err(e)
+        exit(1)
+    finally:
+        client.save_session()
+    index_courses(index, course_list)
+    save_index(index)
+
+    for r in results:
+        if r.outcome == JOIN_FAILED:
+            print_err(f"{r.code}: {r.detail}")
+            continue
+        if r.course_id is None:
+            print(f"[blue]{r.code}: {r.detail}[/blue]")
+            continue
+        course_obj = course_list.get(r.course_id)
+        course = format_course(r.course_id, course_obj) if course_obj is not None else r.course_id
+        if r.outcome == JOINED:
+            print(f"[green]{r.code}: joined {course}[/green]")
+        else:
+            print(f"[blue]{r.code}: already enrolled in {course}[/blue]")
+    if any(r.outcome == JOIN_FAILED for r in results):
+        exit(1)
 
 def logout() -> None:
     """Log out of Gradescope"""
     clear_session_cache()
     print("[blue]You are logged out.[/blue]")
 
+def ratelimit(
+    reset: Annotated[bool, typer.Option("--reset", help="Reset the counters")] = False,
+) -> None:
+    """Show the request budget shared by all gscli processes on this machine."""
+    limiter = RateLimiter()
+    if reset:
+        limiter.reset()
+        print("[blue]Rate limiter counters reset.[/blue]")
+        return
+    counters = limiter.counters()
+    print(f"Budget: {limiter.rate} requests/s, bursts of up to {limiter.burst}")
+    print(f"Tokens available: {counters['tokens']:.1f}")
+    print(f"Requests: {counters['requests']}")
+    print(f"Delayed by the limiter: {counters['delayed']} ({counters['delay_seconds']:.1f} s in total)")
+    print(f"Throttled by Gradescope: {counters['throttled']}")
+    if counters["connections"]:
+        print(f"Connections opened: {counters['connections']} ({counters['requests'] / counters['connections']:.1f} requests per connection)")
+
 def clean() -> None:
     """Unset the current assignment and session cache.
-    This will log you out and forget the current Gradescope assignment."""
+    This will log you out and forget the current Gradescope assignment. Project bindings (.gscli files) still apply."""
     clear_session_cache()
     clear_current_assignment_file()
     print("[blue]Cleaned session cache and forgot current assignment.[/blue]")
+    project_file = find_project_file()
+    if project_file is not None:
+        print(f"[yellow]This directory is still bound to an assignment by {project_file}. Delete it to unbind the project.[/yellow]")
 
 # Scrape submission results for an assignment at submission link
 # Currently, no easy way to do this besides scraping the assignment page for a
 # submission link, and then collecting the results from there.
 def status(
-    course: Annotated[str | None, typer.Argument(help="Course id")] = None,
-    assignment: Annotated[str | None, typer.Argument(help="Assignment id")] = None,
+    course: Annotated[str | None, typer.Argument(help="Course id", autocompletion=complete_course)] = None,
+    assignment: Annotated[str | None, typer.Argument(help="Assignment id", autocompletion=complete_assignment)] = None,
+    watch: Annotated[bool, typer.Option("-w", "--watch", help="Follow all unfinished submissions (optionally of one course or assignment) in a live table")] = False,
 ) -> None:
     """Check submission status for your assignment."""
-    login_if_needed()
+    if watch:
+        watch_submissions(course, assignment)
+        return
+
     if course is None or assignment is None:
         current_assignment = load_current_assignment_info_or_exit()
         course = current_assignment["course"]
         assignment = current_assignment["assignment"]
 
+    # Results the background poller saved since the user last looked need no network
+    finished = [e for e in unnotified_entries(course, assignment) if e["status"] == "processed"]
+    if finished:
+        for e in finished:
+            e["notified"] = True
+            save_entry(e)
+        latest = finished[-1]
+        report_submission_results(parse_results_json(latest["results"]), latest["link"])
+        return
+
+    if offline:
+        report_mirrored_status(course, assignment)
+        return
+
+    login_if_needed()
     try:
-        assignment_submissions = get_submissions(connection.session, course_id=course)
+        submission_status = client.status(course, assignment)
 
-        if assignment in assignment_submissions:
-            submission_id = assignment_submissions[assignment]
-            submission_link = make_submission_link(course, assignment, submission_id)
-            status_json = fetch_submission_status(connection.session, submission_link)
-        else:
-            print_err(f"No submission found for assignment {assignment} in course {course}")
-            return
+    except NoSubmissionError as e:
+        print_err(e)
+        return
 
     except Exception as e:
         print_err(e)
@@ -137,13 +256,207 @@ def status(
         return
     
     finally:
-        store_session_cookies(connection.session)
+        client.save_session()
+
+    entry = load_entry(submission_id_from_link(submission_status.link))
+    if entry is None:
+        entry = new_entry(course, assignment, submission_status.link, submission_time(submission_status.json))
+    record_status(entry, submission_status.json, notified=True)
         
-    if status_json['status'] == 'processed':
-        test_case_results = parse_results_json(status_json['results'])
-        report_submission_results(test_case_results, submission_link)
+    if submission_status.processed:
+        report_submission_results(submission_status.results, submission_status.link)
     else:
-        print(f"Status: {status_json['status']}")
+        print(f"Status: {submission_status.status}")
+
+def report_mirrored_status(course: str, assignment: str) -> None:
+    """Report the latest mirrored status of an assignment's latest submission."""
+    mirrored = load_index()["courses"].get(course, {}).get("assignments", {}).get(assignment, {})
+    entry = load_entry(mirrored["submission"]) if mirrored.get("submission") else None
+    if entry is None:
+        # the latest submission is newer than the last sync, or was never synced
+        known = [e for e in all_entries() if e["course"] == course and e["assignment"] == assignment]
+        entry = known[-1] if known else None
+    if entry is None:
+        print("[yellow]No submission to this assignment is mirrored.[/yellow] Run [bold]gscli sync[/bold] while online.")
+        return
+
+    print(f"[yellow]Offline: status as of {format_age(entry['updated_at'])}.[/yellow]")
+    if entry["status"] == "processed":
+        report_submission_results(parse_results_json(entry["results"]), entry["link"])
+    else:
+        print(f"Status: {entry['status']}")
+
+def format_seconds(seconds: float | None) -> str:
+    """Format a duration like 1:05 (minutes and seconds)."""
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02}"
+
+def render_watch_table(entries: list[dict], names: dict) -> "Table":
+    """A table of the watched submissions and their statuses."""
+    from rich.table import Table
+
+    table = Table()
+    table.add_column("Assignment")
+    table.add_column("Submission")
+    table.add_column("Status")
+    table.add_column("Waiting", justify="right")
+    for e in entries:
+        name = names.get((e["course"], e["assignment"]), f"{e['course']} / {e['assignment']}")
+        if e["status"] == "processed":
+            try:
+                state = f"[green]{summarize_score(e['results'])}[/green]"
+            except (KeyError, TypeError):
+                state = "[green]Results ready[/green]"
+        elif e["gave_up"]:
+            state = "[yellow]Gave up[/yellow]"
+        else:
+            state = status_messages.get(e["status"], e["status"])
+        table.add_row(name, e["submission"], state, format_seconds(time.time() - e["submitted_at"]))
+    return table
+
+def watch_submissions(course: str | None, assignment: str | None) -> None:
+    """Poll every unfinished submission from one scheduler and show them in a live table."""
+    from rich.live import Live
+
+    index = load_index()
+    names = {
+        (course_id, assignment_id): f"{c['name']} / {a['name']}"
+        for course_id, c in index["courses"].items()
+        for assignment_id, a in c["assignments"].items()
+    }
+
+    login_if_needed()
+    try:
+        entries = discover(client.session, index, course, assignment, on_error=lambda message: print_err(message, color=False))
+        if not entries:
+            print("No unfinished submissions.")
+            return
+
+        scheduler = PollScheduler(client.session, entries)
+        with Live(render_watch_table(entries, names), refresh_per_second=4) as live:
+            try:
+                scheduler.run(on_update=lambda: live.update(render_watch_table(entries, names)))
+            except KeyboardInterrupt:
+                pass
+    except Exception as e:
+        print_err(e)
+        return
+    finally:
+        client.save_session()
+
+    for e in entries:
+        if e["status"] == "processed":
+            print(f"[green]Results ready for {names.get((e['course'], e['assignment']), e['assignment'])}:[/green] {e['link']}")
+    print(f"{scheduler.requests} status requests for {len(entries)} submissions.")
+
+def report_changes(old: dict, new: dict) -> None:
+    """Print the test cases whose outcome changed between two processed submissions."""
+    old_results, new_results = entry_results(old), entry_results(new)
+    print(f"[gold1]Changes since submission {old['submission']}:[/gold1]")
+    changes = diff_results(old_results, new_results)
+    if not changes:
+        print("No test cases changed.")
+    for change in changes:
+        before, after = change.before, change.after
+        if after is None:
+            print(f"[yellow] - {change.name}: removed (was {before.score}/{before.max_score})[/yellow]")
+        elif before is None:
+            color = "green" if after.passed else "red"
+            print(f"[{color}] + {change.name}: {after.score}/{after.max_score} (new)[/{color}]")
+        else:
+            color = "green" if (after.passed, after.score) >= (before.passed, before.score) else "red"
+            print(f"[{color}] ~ {change.name}: {before.score}/{before.max_score} -> {after.score}/{after.max_score}[/{color}]")
+    (old_score, old_max), (new_score, new_max) = total_score(old_results), total_score(new_results)
+    print(f"Score: {old_score:g}/{old_max:g} -> {new_score:g}/{new_max:g}")
+
+def load_processed_entry(submission_id: str) -> dict | None:
+    """Results of a submission from the local store, fetching them (for the current assignment) only if they aren't stored yet."""
+    entry = load_entry(submission_id)
+    if entry is not None and entry["status"] == "processed":
+        return entry
+
+    current_assignment = load_current_assignment_info_or_exit()
+    course, assignment = current_assignment["course"], current_assignment["assignment"]
+    link = make_submission_link(course, assignment, submission_id)
+    if client is None:
+        login_if_needed()
+    try:
+        submission_status = client.submission_status(link)
+    except Exception as e:
+        print_err(f"Could not fetch submission {submission_id}: {e}")
+        return None
+    finally:
+        client.save_session()
+    if not submission_status.processed:
+        print_err(f"Submission {submission_id} isn't processed yet.", color=False)
+        return None
+    entry = entry or new_entry(course, assignment, link, submission_time(submission_status.json))
+    record_status(entry, submission_status.json, notified=True)
+    return entry
+
+def diff(
+    sub_a: Annotated[str | None, typer.Argument(help="Older submission id (default: the submission before sub_b)")] = None,
+    sub_b: Annotated[str | None, typer.Argument(help="Newer submission id (default: the latest submission to your current assignment)")] = None,
+) -> None:
+    """Show which test cases changed between two submissions."""
+    if sub_a is not None and sub_b is None:
+        # a single submission is compared with the one before it
+        sub_a, sub_b = None, sub_a
+
+    if sub_b is None:
+        current_assignment = load_current_assignment_info_or_exit()
+        processed = [
+            e for e in all_entries()
+            if e["course"] == current_assignment["course"] and e["assignment"] == current_assignment["assignment"]
+            and e["status"] == "processed"
+        ]
+        if not processed:
+            print("[yellow]No results of your current assignment are stored yet.[/yellow]")
+            print("Run [bold]gscli status[/bold] to fetch the latest ones.")
+            exit(1)
+        new = processed[-1]
+    else:
+        new = load_processed_entry(sub_b)
+        if new is None:
+            exit(1)
+
+    old = previous_entry(new) if sub_a is None else load_processed_entry(sub_a)
+    if old is None:
+        if sub_a is None:
+            print(f"[yellow]No earlier results of submission {new['submission']}'s assignment are stored.[/yellow]")
+        exit(1)
+
+    report_changes(old, new)
+
+def summarize_score(results: dict) -> str:
+    """Total score of a results JSON, like 8.0/10.0."""
+    test_case_results = parse_results_json(results)
+    score = results.get('score', sum(r.score for r in test_case_results))
+    max_score = sum(r.max_score for r in test_case_results)
+    return f"{score}/{max_score}"
+
+def notify() -> None:
+    """Report results that arrived in the background since you last looked.
+    Needs no network access, so it can run from a shell prompt hook."""
+    assignments = {
+        (course_id, assignment_id): a["name"]
+        for course_id, c in load_index()["courses"].items()
+        for assignment_id, a in c["assignments"].items()
+    }
+    for e in unnotified_entries():
+        name = assignments.get((e["course"], e["assignment"]), f"assignment {e['assignment']}")
+        if e["status"] == "processed":
+            try:
+                score = f" {summarize_score(e['results'])}"
+            except (KeyError, TypeError):
+                score = ""
+            print(f"[green]Results ready for {name}:{score}[/green] (gscli status {e['course']} {e['assignment']})")
+        else:
+            print(f"[yellow]Gave up waiting for results of {name}.[/yellow] (gscli status {e['course']} {e['assignment']})")
+        e["notified"] = True
+        save_entry(e)
 
 # TODO clean up this function
 # TODO prevent rich's automatic coloring cuz it looks bad
@@ -152,24 +465,35 @@ def list_assignments_and_courses(
     show_only_courses: Annotated[bool, typer.Option("-c", "--courses", help="Only list courses")] = False
 ) -> None:
     """List courses and assignments."""
-    login_if_needed()
-    
-    try:
-        course_list = get_courses(connection)
-    except Exception as e:
-        print_err(e)
-        return
+    index = load_index()
+    if offline:
+        course_list = mirrored_courses(index)
+        print(f"[yellow]Offline: courses as of {format_age(index['updated_at'])}.[/yellow]")
+    else:
+        login_if_needed()
+        try:
+            course_list = client.list_courses()
+        except Exception as e:
+            print_err(e)
+            return
+        index_courses(index, course_list)
     
     for id, course in course_list.items():
         print(format_course(id, course))
         if show_only_courses:
             continue
 
-        try:
-            assignments = list(connection.account.get_assignments(course_id=id))
-        except Exception as e:
-            print_err(e)
-            return
+        if offline:
+            assignments = mirrored_assignments(index, id)
+            print(f"[yellow] (as of {format_age(index['courses'][id].get('synced_at'))})[/yellow]")
+        else:
+            try:
+                assignments = client.list_assignments(id)
+            except Exception as e:
+                print_err(e)
+                save_index(index)
+                return
+            index_assignments(index, id, assignments)
 
         if assignments:
             # Calculate max widths for alignment
@@ -188,26 +512,28 @@ def list_assignments_and_courses(
             def late(a):
                 return a.late_due_date and (now <= a.late_due_date) and (not a.due_date or now > a.due_date)
 
-            sorted_assignments = sorted(assignments, key=lambda a: (not due_today(a), not active(a), not late(a)))
+            # Classify each assignment once, not in every comparison of the sort and again when printing
+            classified = [(a, bool(due_today(a)), bool(active(a)), bool(late(a))) for a in assignments]
+            sorted_assignments = sorted(classified, key=lambda c: (not c[1], not c[2], not c[3]))
             
             # Filter assignments if not showing all
             if not all:
-                sorted_assignments = [a for a in sorted_assignments if active(a) or late(a)]
+                sorted_assignments = [c for c in sorted_assignments if c[2] or c[3]]
             
-            for a in sorted_assignments:
+            for a, is_due_today, is_active, is_late in sorted_assignments:
                 # Build assignment info string with alignment
-                due_str = "today" if due_today(a) else (a.due_date.strftime("%m/%d") if a.due_date else "N/A")
+                due_str = "today" if is_due_today else (a.due_date.strftime("%m/%d") if a.due_date else "N/A")
                 grade_str = f" [{a.grade}/{a.max_grade}]" if a.grade and a.max_grade else ""
                 
                 # Check if late submissions are accepted
                 late_str = ""
-                if a.late_due_date and now <= a.late_due_date and (not a.due_date or now > a.due_date):
+                if is_late:
                     late_str = " (Accepting late submissions)"
                 
                 # Calculate time remaining for assignments due today
                 # TODO don't display time remaining if past due date
                 time_remaining_str = ""
-                if due_today(a):
+                if is_due_today:
                     time_delta = a.due_date - now
                     hours_left = time_delta.total_seconds() / 3600
                     if hours_left < 1:
@@ -221,36 +547,276 @@ def list_assignments_and_courses(
                 assignment_line = f" - {str(a.assignment_id).ljust(max_id_width)} {a.name.ljust(max_name_width)} (Due: {due_str}){grade_str}{late_str}{time_remaining_str}"
                 
                 # Color assignments: yellow for due today, green for active, default for others
-                if due_today(a):
+                if is_due_today:
                     print(f"[yellow]{assignment_line}[/yellow]")
-                elif active(a):
+                elif is_active:
                     print(f"[green]{assignment_line}[/green]")
                 else:
                     print(assignment_line)
 
-    store_session_cookies(connection.session)
+    if not offline:
+        save_index(index)
+        client.save_session()
+
+def render_grades(snapshot: dict, baseline: dict | None) -> None:
+    """Print a table of points per course, with the changes since baseline if given."""
+    from rich.table import Table
+
+    table = Table()
+    table.add_column("Course")
+    table.add_column("Points", justify="right")
+    table.add_column("%", justify="right")
+    if baseline is not None:
+        table.add_column("Change", justify="right")
+
+    for course_id, course in snapshot["courses"].items():
+        percent = f"{100 * course['earned'] / course['possible']:.1f}" if course["possible"] else "-"
+        row = [course["name"], f"{course['earned']:g}/{course['possible']:g}", percent]
+        if baseline is not None:
+            old = baseline["courses"].get(course_id, {"earned": 0, "possible": 0})
+            earned, possible = course["earned"] - old["earned"], course["possible"] - old["possible"]
+            row.append(f"{earned:+g}/{possible:+g}" if earned or possible else "")
+        table.add_row(*row)
+    print(table)
+
+    if baseline is not None:
+        changes = changed_assignments(baseline, snapshot)
+        if not changes:
+            print("No grades changed.")
+        for course_id, _, before, after in changes:
+            was = f" (was {before['grade']:g}/{before['max_grade']:g})" if before else " (new)"
+            print(f" - {snapshot['courses'][course_id]['name']} / {after['name']}: {after['grade']:g}/{after['max_grade']:g}{was}")
+
+def grades(
+    refresh: Annotated[bool, typer.Option("-r", "--refresh", help="Fetch grades even if a recent snapshot exists")] = False,
+    since: Annotated[str | None, typer.Option("--since", help="Show changes since this long ago (e.g. 7d) or since this date")] = None,
+) -> None:
+    """Summarize your grades across all courses."""
+    since_time = None
+    if since is not None:
+        try:
+            since_time = parse_past_time(since).timestamp()
+        except ValueError as e:
+            print_err(e)
+            exit(1)
+
+    snapshots = load_snapshots()
+    if offline and not snapshots:
+        print("[yellow]No grades are mirrored yet.[/yellow] Run [bold]gscli grades[/bold] while online.")
+        return
+    if not offline and (refresh or not snapshots or time.time() - snapshots[-1]["taken_at"] > CACHE_MAX_AGE):
+        login_if_needed()
+        try:
+            course_list = client.list_courses()
+        except Exception as e:
+            print_err(e)
+            return
+
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            assignments_by_course = collect_assignments(course_list, prefetch_assignments(executor, course_list))
+        client.save_session()
+
+        index = load_index()
+        index_courses(index, course_list)
+        for course_id, assignments in assignments_by_course.items():
+            index_assignments(index, course_id, assignments)
+        save_index(index)
+
+        snapshot = take_snapshot(course_list, assignments_by_course)
+        save_snapshot(snapshot)
+        snapshots.append(snapshot)
+    else:
+        snapshot = snapshots[-1]
+        print(f"[blue]Grades as of {datetime.fromtimestamp(snapshot['taken_at']):%Y-%m-%d %H:%M}. Run with --refresh to fetch them again.[/blue]")
+
+    baseline = None
+    if since_time is not None:
+        earlier = snapshots[:-1]
+        baseline = snapshot_before(earlier, since_time)
+        if baseline is None and earlier:
+            baseline = earlier[0]
+            print(f"[yellow]No snapshot from before then; comparing with the oldest one, from {datetime.fromtimestamp(baseline['taken_at']):%Y-%m-%d %H:%M}.[/yellow]")
+        elif baseline is None:
+            print("[yellow]No earlier snapshot to compare with yet.[/yellow]")
+
+    render_grades(snapshot, baseline)
+
+def format_time_left(seconds: float) -> str:
+    """Format a positive number of seconds like 45 min, 5 hrs or 3 days."""
+    if seconds < 60 * 60:
+        return f"{int(seconds / 60)} min"
+    if seconds < 2 * 24 * 60 * 60:
+        hours = int(seconds / (60 * 60))
+        return f"{hours} hr{'s' if hours != 1 else ''}"
+    return f"{int(seconds / (24 * 60 * 60))} days"
+
+def due(
+    within: Annotated[str, typer.Option("-w", "--within", help="How far ahead to look, e.g. 48h or 2w")] = "7d",
+    refresh: Annotated[bool, typer.Option("-r", "--refresh", help="Fetch the assignments of all courses first")] = False,
+) -> None:
+    """List upcoming deadlines across all courses.
+    Answers from the local index without network access, unless --refresh is given."""
+    try:
+        horizon = parse_duration(within)
+    except ValueError as e:
+        print_err(e)
+        exit(1)
+
+    index = load_index()
+    if refresh:
+        login_if_needed()
+        try:
+            course_list = client.list_courses()
+        except Exception as e:
+            print_err(e)
+            return
+        index_courses(index, course_list)
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            for course_id, assignments in collect_assignments(course_list, prefetch_assignments(executor, course_list)).items():
+                index_assignments(index, course_id, assignments)
+        save_index(index)
+        client.save_session()
+    elif index["updated_at"] is None:
+        print("[yellow]No deadlines known yet.[/yellow] Run [bold]gscli due --refresh[/bold] to fetch them.")
+        return
+
+    now = time.time()
+    deadlines = deadlines_between(index, now, now + horizon)
+    if not deadlines:
+        print(f"Nothing due within {within}.")
+    for timestamp, kind, course_id, assignment_id in deadlines:
+        course = index["courses"][course_id]
+        name = course["assignments"][assignment_id]["name"]
+        late_str = " (late submissions)" if kind == LATE_DUE else ""
+        line = f"{datetime.fromtimestamp(timestamp):%a %m/%d %H:%M}  {format_time_left(timestamp - now).rjust(8)}  {course['name']} / {name}{late_str}"
+        print(f"[yellow]{line}[/yellow]" if timestamp - now < 24 * 60 * 60 else line)
+
+    if not refresh and now - index["updated_at"] > 24 * 60 * 60:
+        print(f"[yellow]Deadlines as of {datetime.fromtimestamp(index['updated_at']):%Y-%m-%d %H:%M}. Run with --refresh to update them.[/yellow]")
+
+def wait_until(session, target: datetime) -> None:
+    """Sleep until the target time, pinging Gradescope in between so the connection stays warm."""
+    while True:
+        remaining = (target - datetime.now().astimezone()).total_seconds()
+        if remaining <= 0:
+            return
+        # the last ping happens a couple of seconds before the target, never right at it
+        if remaining > 2:
+            try:
+                if not ping_gradescope(session):
+                    print_err("Your session expired while waiting. The upload will likely fail.")
+            except Exception:
+                pass
+            remaining = (target - datetime.now().astimezone()).total_seconds()
+            time.sleep(max(0, min(KEEP_WARM_INTERVAL, remaining - 2)))
+        else:
+            time.sleep(remaining)
+
+def wait_for_enter(session) -> None:
+    """Block until the user presses Enter, pinging Gradescope in the background so the connection stays warm."""
+    stop = threading.Event()
+    # held during each ping so the upload never shares the connection with one
+    lock = threading.Lock()
+
+    def keep_warm():
+        while not stop.wait(KEEP_WARM_INTERVAL):
+            with lock:
+                if stop.is_set():
+                    return
+                try:
+                    ping_gradescope(session)
+                except Exception:
+                    pass
+
+    threading.Thread(target=keep_warm, daemon=True).start()
+    try:
+        input("Press Enter to submit...")
+    finally:
+        stop.set()
+        with lock:
+            pass
+
+def format_eta(elapsed: float, expected: tuple[float, float] | None) -> str:
+    """Describe how much longer results should take, given their usual p50 and p95 times."""
+    if expected is None:
+        return ""
+    p50, p95 = expected
+    if elapsed < p50:
+        return f"(about {format_seconds(p50 - elapsed)} left)"
+    if elapsed < p95:
+        return "(almost done)"
+    return "(taking longer than usual)"
+
+def submit_staged(course: str, assignment: str, files: list, leaderboard_name: str | None, target: datetime | None) -> str | None:
+    """Stage an upload, then dispatch it at the target time (or when the user presses Enter if there is no target)."""
+    try:
+        staged = client.stage_submission(course, assignment, files, leaderboard_name=leaderboard_name)
+    except Exception as e:
+        print_err(e)
+        return None
+
+    if target is None:
+        print("[blue]Upload staged.[/blue]")
+        wait_for_enter(client.session)
+    else:
+        print(f"[blue]Upload staged. Submitting at {target:%H:%M:%S}.[/blue]")
+        wait_until(client.session, target)
+
+    try:
+        submission_link, latency = client.dispatch(staged)
+    except SubmissionError:
+        return None
+    except Exception as e:
+        print_err(e)
+        return None
+
+    print(f"[blue]Gradescope answered the upload in {latency * 1000:.0f} ms.[/blue]")
+    return submission_link
 
 def submit(
-    course: Annotated[str | None, typer.Option("-c", "--course", help="Course id")] = None,
-    assignment: Annotated[str | None, typer.Option("-a", "--assignment", help="Assignment id")] = None,
+    course: Annotated[str | None, typer.Option("-c", "--course", help="Course id", autocompletion=complete_course)] = None,
+    assignment: Annotated[str | None, typer.Option("-a", "--assignment", help="Assignment id", autocompletion=complete_assignment)] = None,
     files: Annotated[List[str] | None, typer.Argument(help="File list or directory to submit")] = None,
     leaderboard_name: Annotated[str | None, typer.Option("-n", "--leaderboard", help="Leaderboard name")] = None,
     recursive: Annotated[bool, typer.Option("-r", "--recursive", help="Recursively search directories for files")] = False,
+    at: Annotated[str | None, typer.Option("--at", help="Prepare the upload now and submit it at this time (HH:MM, HH:MM:SS or ISO 8601)")] = None,
+    stage: Annotated[bool, typer.Option("--stage", help="Prepare the upload now and submit it when you press Enter")] = False,
+    detach: Annotated[bool, typer.Option("-d", "--detach", help="Don't wait for results; poll for them in the background")] = False,
+    archive: Annotated[bool, typer.Option("--archive", help="Upload the files as a single zip")] = False,
+    compression_level: Annotated[int, typer.Option("--compression-level", min=0, max=9, help="Compression level of --archive (0 stores files uncompressed)")] = ARCHIVE_COMPRESSION_LEVEL,
+    no_checks: Annotated[bool, typer.Option("--no-checks", help="Skip the pre-flight checks (syntax, required files, sizes, the project's check commands)")] = False,
 ) -> None:
-    """Make a submission to your current assignment."""
+    """Make a submission to your current assignment.
+    Python files are syntax checked before uploading, along with the checks configured in the project's .gscli file."""
+
+    # checked up front, since logging in waits until the files passed the pre-flight checks
+    require_online()
+    target = None
+    if at is not None:
+        try:
+            target = parse_target_time(at)
+        except ValueError as e:
+            print_err(e)
+            exit(1)
 
-    login_if_needed()
     if course is None or assignment is None:
         current_assignment = load_current_assignment_info_or_exit()
         course = current_assignment["course"] if course is None else course
         assignment = current_assignment["assignment"] if assignment is None else assignment
 
+    # a project's .gscli file can name the files to submit, files to ignore and the leaderboard name
+    project = load_project() or {}
+    if leaderboard_name is None:
+        leaderboard_name = project.get("leaderboard")
+    if files is None and project.get("files"):
+        files = [str(Path(project["root"]) / f) for f in project["files"]]
+
     # if no files are given, submit all files in current directory
     files = [str(Path.cwd().absolute())] if files is None else files
 
     # User can specify a directory to submit all files within
     try:
-        files = collect_file_objs(files, recursive=recursive)
+        files = collect_file_objs(files, recursive=recursive, ignore=project.get("ignore"))
         if not files:
             print_err("You must specify at least one file to submit.", color=False)
             return
@@ -258,17 +824,43 @@ def submit(
         print_err(e)
         return
 
+    # mistakes that would fail in the autograder are caught before any network traffic
+    if not no_checks:
+        failures = run_preflight([f.name for f in files], project.get("preflight"), cwd=project.get("root"), archive=archive)
+        if failures:
+            for f in files:
+                f.close()
+            print_err("Pre-flight checks failed, nothing was uploaded:")
+            for failure in failures:
+                where = f"{failure.path}: " if failure.path is not None else f"{failure.check}: "
+                print_err(f" - {where}{failure.message}", color=False)
+            print_err("Fix them, or submit anyway with --no-checks.", color=False)
+            exit(1)
+
+    login_if_needed()
+
     # TODO prompt user to confirm submission details if the file list is long (and provide flag to skip -force)
-    
-    session = connection.session
 
-    try:
-        submission_link = upload_assignment(session, course, assignment, *files, leaderboard_name=leaderboard_name)
-    except Exception as e:
-        # a command like this: gscli submit 34 34 will cause an internal runtime error in gradescopeapi library
-        # some course ids but not others cause a runtime error in that library
-        # just report the course id was maybe wrong
-        submission_link = None
+    uploads = files
+    if archive:
+        try:
+            uploads = [build_archive(files, compression_level)]
+        except Exception as e:
+            print_err(f"Could not build the archive: {e}")
+            return
+        size = sum(Path(f.name).stat().st_size for f in files)
+        print(f"[blue]Packed {len(files)} files ({size / 1024:.1f} KB) into {uploads[0].name} ({len(uploads[0].getbuffer()) / 1024:.1f} KB).[/blue]")
+
+    if stage or target is not None:
+        submission_link = submit_staged(course, assignment, uploads, leaderboard_name, target)
+    else:
+        try:
+            submission_link = client.submit(course, assignment, uploads, leaderboard_name=leaderboard_name)
+        except SubmissionError:
+            # a command like this: gscli submit 34 34 will cause an internal runtime error in gradescopeapi library
+            # some course ids but not others cause a runtime error in that library
+            # just report the course id was maybe wrong
+            submission_link = None
     
     print("[gold1]Files uploaded:[/gold1]")
     for f in files:
@@ -281,84 +873,104 @@ def submit(
         print_err(" - The assignment/course is not accepting submissions", color=False)
         print_err(" - You are missing a required form field (e.g., leaderboard name)", color=False)
         return
+
+    entry = new_entry(course, assignment, submission_link)
+    note_phase(entry, UPLOADED, entry["submitted_at"])
+    # stored right away, so the submission isn't lost if waiting for its results fails
+    save_entry(entry)
+    if detach:
+        spawn_poller()
+        print("[blue]Waiting for results in the background.[/blue]")
+        print("Run [bold]gscli notify[/bold] or [bold]gscli status[/bold] to see them once they're ready.")
+        return
     
-    # Poll for submission results
-    timeout = 100  # seconds
-    start_time = time.time()
-    poll_interval = 1
-    
-    # TODO lift this code out so that gscli status can also use it
-    status_messages = {
-        'unprocessed': 'Waiting to be processed',
-        'autograder_harness_started': 'Preparing autograder',
-        'autograder_task_started': 'Autograder running',
-        'processed': 'Results ready'
-    }
-    
-    spinner = Spinner("dots", text="Initializing...")
-    results_data = None
-    
-    # TODO don't use context manager here. It's confusing
-    with Live(spinner, refresh_per_second=8, transient=True):
-        while True:
-            try:
-                status_json = fetch_submission_status(session, submission_link)
+    from rich.spinner import Spinner
+    from rich.live import Live
 
-            except Exception as e:
-                print_err(e)
-                break
-        
-            finally:
-                store_session_cookies(session)
-            
-            if status_json['status'] == 'processed':
-                results_data = parse_results_json(status_json['results'])
-                break
+    spinner = Spinner("dots")
+    expected = expected_total(course, assignment)
+    current_status = "unprocessed"
 
-            elif time.time() - start_time >= timeout:
-                break
+    def show_status(submission_status):
+        nonlocal current_status
+        current_status = submission_status.status
+        note_phase(entry, current_status)
 
-            status = status_json['status']
-            status_text = status_messages.get(status, status)
-            spinner.update(text=f"{status_text}...")
-            time.sleep(poll_interval)
+    def render_spinner():
+        # rendered on every refresh, so the ETA counts down between polls
+        status_text = status_messages.get(current_status, current_status)
+        spinner.update(text=f"{status_text}... {format_eta(time.time() - entry['submitted_at'], expected)}")
+        return spinner
 
-    if results_data:
+    # Poll for submission results, not before they could possibly be ready
+    submission_status = None
+    first_poll_after = earliest_results(course, assignment)
+    with Live(get_renderable=render_spinner, refresh_per_second=8, transient=True):
+        try:
+            submission_status = client.wait_for_results(submission_link, timeout=RESULTS_TIMEOUT, poll_interval=POLL_INTERVAL,
+                                                        on_status=show_status, first_poll_after=first_poll_after)
+        except Exception as e:
+            print_err(e)
+        except KeyboardInterrupt:
+            save_entry(entry)
+            spawn_poller()
+            raise
+        finally:
+            client.save_session()
+
+    if submission_status is None:
+        # the entry is still pending, so the background poller picks it up
+        save_entry(entry)
+        spawn_poller()
+        print("Use [bold]gscli notify[/bold] or [bold]gscli status[/bold] later to check for results.")
+        return
+
+    if submission_status.processed:
+        record_status(entry, submission_status.json, notified=True)
         print("\nAutograder Results:")
         print("=" * 50)
-        report_submission_results(results_data, submission_link)
-    elif time.time() - start_time >= timeout:
+        report_submission_results(submission_status.results, submission_link)
+        previous = previous_entry(entry)
+        if previous is not None:
+            print()
+            report_changes(previous, entry)
+    else:
+        # hand the submission over to the background poller
+        save_entry(entry)
+        spawn_poller()
         print("[red]Timeout reached while waiting for autograder results.[/red]")
         print(f"Check your submission at: [blue]{submission_link}[/blue]")
-        print("Or use [bold]gscli status[/bold] command later to check for results.")
+        print("Or use [bold]gscli notify[/bold] or [bold]gscli status[/bold] later to check for results.")
 
 
-def choose() -> None:
-    """Choose a course and assignment to submit to."""
-    
-    login_if_needed()
-    
-    # Get course list
-    try:
-        course_list = get_courses(connection)
-    except Exception as e:
-        print_err(e)
-        return
-    
-    if not course_list:
-        print_err("No courses found", color=False)
-        return
-    
+def prefetch_assignments(executor: ThreadPoolExecutor, course_ids) -> dict[str, Future]:
+    """Start fetching the assignments of every course in the background (or reading them from the mirror with --offline)."""
+    if offline:
+        index = load_index()
+        return {course_id: executor.submit(mirrored_assignments, index, course_id) for course_id in course_ids}
+    return {course_id: executor.submit(client.list_assignments, course_id) for course_id in course_ids}
+
+def collect_assignments(course_list: dict, prefetched: dict[str, Future]) -> dict[str, list]:
+    """Wait for the prefetched assignments of all courses. Courses whose assignments couldn't be loaded are reported and left out."""
+    assignments_by_course = {}
+    for course_id, future in prefetched.items():
+        try:
+            assignments_by_course[course_id] = future.result()
+        except Exception as e:
+            print_err(f"Could not load assignments for {format_course(course_id, course_list[course_id])}: {e}")
+    return assignments_by_course
+
+def select_assignment(course_list: dict, prefetched: dict[str, Future], index: dict) -> tuple | None:
+    """Prompt for a course, then for one of its assignments. Returns (course id, assignment) or None if cancelled."""
+    import questionary
+    from questionary import Choice
+
     # Prompt user to select one of their courses
     course_choices = [
         Choice(title=format_course(course_id, course_obj), value=course_id)
         for course_id, course_obj in course_list.items()
     ]
 
-    if not course_choices:
-        print_err("You're not enrolled in any courses.", color=False)
-        return
-    
     # Interactive course selection
     course_prompt = questionary.select(
         "Select a course:",
@@ -371,13 +983,16 @@ def choose() -> None:
         selected_course_id = course_prompt.ask()
         if selected_course_id is None:
             print("[yellow]Cancelled.[/yellow]")
-            return 
+            return None
     
         try:
-            assignments = list(connection.account.get_assignments(course_id=selected_course_id))
+            # usually finished while the user was looking at the course prompt
+            assignments = prefetched[selected_course_id].result()
         except Exception as e:
             print_err(e)
-            return
+            return None
+
+        index_assignments(index, selected_course_id, assignments)
     
         if not assignments:
             print("No assignments found for this course")
@@ -385,29 +1000,407 @@ def choose() -> None:
             if to_continue:
                 continue
             else:
-                return
+                return None
         break
     
     # Prompt user to select one of the assignments from selected course
     assignment_choices = [
-        Choice(title=format_assignment(a.assignment_id, a), value=a.assignment_id)
+        Choice(title=format_assignment(a.assignment_id, a), value=a)
         for a in assignments if a.assignment_id
     ]
     
-    selected_assignment_id = questionary.select(
+    selected_assignment = questionary.select(
         "Select an assignment:",
         choices=assignment_choices,
         use_arrow_keys=True,
         use_shortcuts=False
     ).ask()
     
-    if selected_assignment_id is None:
+    if selected_assignment is None:
         print("[yellow]Cancelled.[/yellow]")
+        return None
+    return selected_course_id, selected_assignment
+
+def search_assignment(course_list: dict, prefetched: dict[str, Future], index: dict) -> tuple | None:
+    """Prompt for an assignment of any course with fuzzy search. Returns (course id, assignment) or None if cancelled."""
+    import questionary
+    from .search import AssignmentIndex, AssignmentCompleter
+
+    assignment_index = AssignmentIndex()
+    for course_id, assignments in collect_assignments(course_list, prefetched).items():
+        index_assignments(index, course_id, assignments)
+        assignment_index.add(course_id, course_list[course_id].name, assignments)
+
+    if not assignment_index.entries:
+        print_err("No assignments found", color=False)
+        return None
+
+    selected = questionary.autocomplete(
+        "Search assignments:",
+        choices=list(assignment_index.entries),
+        completer=AssignmentCompleter(assignment_index),
+        validate=lambda text: text in assignment_index.entries or "Pick one of the suggestions",
+    ).ask()
+
+    if selected is None:
+        print("[yellow]Cancelled.[/yellow]")
+        return None
+    return assignment_index.entries[selected]
+
+def choose(
+    search: Annotated[bool, typer.Option("-s", "--search", help="Fuzzy search over the assignments of all your courses")] = False,
+    project: Annotated[bool, typer.Option("-p", "--project", help="Bind the assignment to the current directory (writes a .gscli file) instead of setting it globally")] = False,
+) -> None:
+    """Choose a course and assignment to submit to.
+    Inside a project bound by a .gscli file, the project's binding is updated instead of the global assignment."""
+    index = load_index()
+    if offline:
+        course_list = mirrored_courses(index)
+        print(f"[yellow]Offline: assignments as of {format_age(index['updated_at'])}.[/yellow]")
+    else:
+        login_if_needed()
+        # Get course list
+        try:
+            course_list = client.list_courses()
+        except Exception as e:
+            print_err(e)
+            return
+        index_courses(index, course_list)
+    
+    if not course_list:
+        print_err("No courses found", color=False)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+    try:
+        prefetched = prefetch_assignments(executor, course_list)
+        if search:
+            selection = search_assignment(course_list, prefetched, index)
+        else:
+            selection = select_assignment(course_list, prefetched, index)
+    finally:
+        # don't wait on courses the user didn't look at
+        executor.shutdown(wait=False, cancel_futures=True)
+        if not offline:
+            save_index(index)
+
+    if selection is None:
         return
     
     # Initialize local config
+    selected_course_id, selected_assignment = selection
     course_name = course_list[selected_course_id].name
-    assignment_name = [a.name for a in assignments if a.assignment_id == selected_assignment_id][0]
-    write_to_current_assignment_file(course_name, selected_course_id, assignment_name, selected_assignment_id)
+    # a project binding takes precedence over the global assignment, so inside a project it's the one to change
+    project_file = find_project_file()
+    if project:
+        path = write_project_file(Path.cwd(), course_name, selected_course_id, selected_assignment.name, selected_assignment.assignment_id)
+        print(f"[blue]Wrote {path}. Add the files to submit, ignore patterns and a leaderboard name there.[/blue]")
+    elif project_file is not None:
+        write_project_file(project_file.parent, course_name, selected_course_id, selected_assignment.name, selected_assignment.assignment_id)
+        print(f"[blue]Updated the project binding in {project_file}.[/blue]")
+    else:
+        write_to_current_assignment_file(course_name, selected_course_id, selected_assignment.name, selected_assignment.assignment_id)
     report_current_assignment()
-    store_session_cookies(connection.session)
+    if not offline:
+        client.save_session()
+
+def sync() -> None:
+    """Mirror your courses, assignments, latest submissions and their results locally.
+    Afterwards, read commands run with --offline answer from the mirror."""
+    login_if_needed()
+    try:
+        course_list = client.list_courses()
+    except Exception as e:
+        print_err(e)
+        return
+
+    index = load_index()
+    index_courses(index, course_list)
+
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+        prefetched = prefetch_assignments(executor, course_list)
+        pages = {course_id: executor.submit(client.latest_submissions, course_id) for course_id in course_list}
+        for course_id, assignments in collect_assignments(course_list, prefetched).items():
+            index_assignments(index, course_id, assignments)
+
+        # only submissions without processed results in the store are fetched
+        unfetched = []
+        for course_id, page in pages.items():
+            try:
+                submissions = page.result()
+            except Exception as e:
+                print_err(f"Could not load submissions for {format_course(course_id, course_list[course_id])}: {e}")
+                continue
+            index_submissions(index, course_id, submissions)
+            for assignment_id, submission_id in submissions.items():
+                entry = load_entry(submission_id)
+                if entry is None or entry["status"] != "processed":
+                    unfetched.append((entry, course_id, assignment_id, make_submission_link(course_id, assignment_id, submission_id)))
+
+        statuses = [executor.submit(client.submission_status, link) for *_, link in unfetched]
+        fetched = 0
+        for (entry, course_id, assignment_id, link), future in zip(unfetched, statuses):
+            try:
+                submission_status = future.result()
+            except Exception as e:
+                print_err(f"Could not load {link}: {e}")
+                continue
+            if entry is None:
+                # results the user never asked about aren't announced by gscli notify
+                entry = new_entry(course_id, assignment_id, link, submission_time(submission_status.json))
+                record_status(entry, submission_status.json, notified=True)
+            else:
+                record_status(entry, submission_status.json, notified=entry["notified"])
+            fetched += 1
+
+    save_index(index)
+    client.save_session()
+    assignment_count = sum(len(c["assignments"]) for c in index["courses"].values())
+    print(f"[blue]Synced {len(course_list)} courses and {assignment_count} assignments; fetched {fetched} submission statuses.[/blue]")
+
+def stats(
+    course: Annotated[str | None, typer.Argument(help="Course id", autocompletion=complete_course)] = None,
+    assignment: Annotated[str | None, typer.Argument(help="Assignment id", autocompletion=complete_assignment)] = None,
+) -> None:
+    """Show how long autograders took for your past submissions: median (p50) and p95 queue and run times.
+    Covers all assignments unless a course or assignment is given."""
+    from rich.table import Table
+
+    by_assignment = {}
+    for timing in load_timings(course, assignment):
+        by_assignment.setdefault((timing[0], timing[1]), []).append(timing)
+    if not by_assignment:
+        print("[yellow]No timings yet.[/yellow] They're recorded for submissions you wait for with gscli.")
+        return
+
+    courses = load_index()["courses"]
+    table = Table()
+    table.add_column("Assignment")
+    table.add_column("Submissions", justify="right")
+    table.add_column("Queue p50/p95", justify="right")
+    table.add_column("Run p50/p95", justify="right")
+    table.add_column("Total p50/p95", justify="right")
+    for (course_id, assignment_id), timings in by_assignment.items():
+        c = courses.get(course_id, {})
+        name = c.get("assignments", {}).get(assignment_id, {}).get("name", assignment_id)
+        summary = summarize(timings)
+        table.add_row(
+            f"{c.get('name', course_id)} / {name}", str(summary["count"]),
+            *(f"{format_seconds(summary[phase][0])} / {format_seconds(summary[phase][1])}" for phase in ("queue", "run", "total")),
+        )
+    print(table)
+
+def render_leaderboard(board: dict, changed: set[str], own_name: str | None) -> "Table":
+    """A leaderboard table, with changed rows highlighted and your own row in bold."""
+    from rich.table import Table
+
+    column = name_column(board["headers"])
+    table = Table(caption=f"As of {format_age(board['fetched_at'])}")
+    for header in board["headers"]:
+        table.add_column(header)
+    for row in board["rows"]:
+        name = row[column] if len(row) > column else None
+        style = "yellow" if name in changed else None
+        if own_name is not None and name == own_name:
+            style = f"bold {style}" if style else "bold"
+        table.add_row(*row, style=style)
+    return table
+
+def leaderboard(
+    course: Annotated[str | None, typer.Argument(help="Course id", autocompletion=complete_course)] = None,
+    assignment: Annotated[str | None, typer.Argument(help="Assignment id", autocompletion=complete_assignment)] = None,
+    watch: Annotated[bool, typer.Option("-w", "--watch", help=f"Keep refreshing the leaderboard every {LEADERBOARD_INTERVAL} seconds")] = False,
+) -> None:
+    """Show an assignment's leaderboard. Rows that changed since you last looked are highlighted."""
+    if course is None or assignment is None:
+        current_assignment = load_current_assignment_info_or_exit()
+        course = current_assignment["course"]
+        assignment = current_assignment["assignment"]
+    project = load_project()
+    own_name = project.get("leaderboard") if project is not None else None
+
+    if offline:
+        board = load_cached_leaderboard(course, assignment)
+        if board is None:
+            print("[yellow]This leaderboard isn't cached.[/yellow] Run [bold]gscli leaderboard[/bold] while online.")
+            return
+        print(render_leaderboard(board, set(), own_name))
+        return
+
+    login_if_needed()
+    try:
+        board, changed = refresh_leaderboard(client.session, course, assignment)
+        if not board["rows"] and not watch:
+            print("[yellow]The leaderboard is empty, or the assignment has none.[/yellow]")
+            return
+        if not watch:
+            print(render_leaderboard(board, changed, own_name))
+            return
+
+        from rich.live import Live
+
+        with Live(render_leaderboard(board, changed, own_name), refresh_per_second=1) as live:
+            try:
+                while True:
+                    time.sleep(LEADERBOARD_INTERVAL)
+                    board, new_changes = refresh_leaderboard(client.session, course, assignment)
+                    # keep showing the last changes until there are new ones
+                    if new_changes:
+                        changed = new_changes
+                    live.update(render_leaderboard(board, changed, own_name))
+            except KeyboardInterrupt:
+                pass
+    except Exception as e:
+        print_err(e)
+        print_err("Check that the course and assignment IDs are correct", color=False)
+        exit(1)
+    finally:
+        client.save_session()
+
+def export(
+    course: Annotated[str, typer.Argument(help="Course id", autocompletion=complete_course)],
+    assignment: Annotated[str, typer.Argument(help="Assignment id", autocompletion=complete_assignment)],
+    output: Annotated[Path | None, typer.Option("-o", "--output", help="Directory to export to (default: <course>-<assignment>)")] = None,
+    workers: Annotated[int, typer.Option("-w", "--workers", min=1, help="Submissions downloaded at once")] = EXPORT_WORKERS,
+) -> None:
+    """Download every student's submission files and results (instructors only).
+    Rerunning an interrupted export only downloads the submissions that are missing."""
+    from rich.progress import Progress
+
+    dest = output if output is not None else Path(f"{course}-{assignment}")
+    login_if_needed()
+    with Progress(transient=True) as progress:
+        task = progress.add_task("Exporting submissions...", total=None)
+
+        def on_progress(submission_id, error):
+            if isinstance(error, NoCodeFilesError):
+                progress.console.print(f"[yellow]Skipping {error}.[/yellow]")
+            elif error is not None:
+                progress.console.print(f"[red]Submission {submission_id} failed: {error}[/red]")
+            progress.advance(task)
+
+        try:
+            exported, skipped, failed = export_assignment(client.session, course, assignment, dest, workers=workers,
+                                                          on_start=lambda total: progress.update(task, total=total), on_progress=on_progress)
+        except Exception as e:
+            print_err(e)
+            exit(1)
+        finally:
+            client.save_session()
+
+    print(f"[blue]Exported {exported} submissions to {dest}[/blue]" + (f" ({skipped} were already exported)" if skipped else ""))
+    no_code = [s for s, error in failed.items() if isinstance(error, NoCodeFilesError)]
+    if no_code:
+        print(f"[yellow]Skipped {len(no_code)} submissions without downloadable code files.[/yellow]")
+    if len(failed) > len(no_code):
+        print_err(f"{len(failed) - len(no_code)} submissions failed. Run the same command again to retry them.", color=False)
+        exit(1)
+
+def report_file_problems(file: Path, problems: list[str]) -> None:
+    """Print the problems found in an input file and exit."""
+    print_err(f"{file} has {len(problems)} problem(s), nothing was changed:")
+    for problem in problems:
+        print_err(problem, color=False)
+    exit(1)
+
+def extensions_apply(
+    file: Annotated[Path, typer.Argument(help="CSV file with columns assignment,student,release,due,late_due", exists=True, dir_okay=False)],
+    course: Annotated[str | None, typer.Option("-c", "--course", help="Course id (default: the current assignment's course)", autocompletion=complete_course)] = None,
+    workers: Annotated[int, typer.Option("-w", "--workers", min=1, help="Extensions applied at once")] = APPLY_WORKERS,
+    dry_run: Annotated[bool, typer.Option("--dry-run", help="Check the file and show what would change without changing anything")] = False,
+) -> None:
+    """Grant per-student extensions listed in a CSV file (instructors only).
+    Students are given by email or user id, dates in ISO 8601 (like 2025-10-03 23:59); empty dates are left alone.
+    The whole file is checked before anything changes, and rows already in effect are skipped, so reruns are safe."""
+    from rich.progress import Progress
+    from rich.table import Table
+
+    try:
+        rows = read_extensions(file)
+    except ExtensionsFileError as e:
+        report_file_problems(file, e.problems)
+    if course is None:
+        course = load_current_assignment_info_or_exit()["course"]
+
+    login_if_needed()
+    with Progress(transient=True) as progress:
+        task = progress.add_task("Applying extensions...", total=None)
+        try:
+            results = apply_extensions(client.session, course, rows, workers=workers, dry_run=dry_run,
+                                       on_start=lambda total: progress.update(task, total=total),
+                                       on_result=lambda result: progress.advance(task))
+        except ExtensionsFileError as e:
+            progress.stop()
+            report_file_problems(file, e.problems)
+        except Exception as e:
+            progress.stop()
+            print_err(e)
+            exit(1)
+        finally:
+            client.save_session()
+
+    colors = {APPLIED: "green", SKIPPED: "blue", FAILED: "red"}
+    table = Table()
+    table.add_column("Line", justify="right")
+    table.add_column("Assignment")
+    table.add_column("Student")
+    table.add_column("Result")
+    for result in results:
+        outcome = f"[{colors[result.outcome]}]{result.outcome}[/{colors[result.outcome]}]"
+        table.add_row(str(result.row.line), result.row.assignment, result.row.student, f"{outcome} {result.detail}".rstrip())
+    print(table)
+
+    counts = {outcome: sum(r.outcome == outcome for r in results) for outcome in colors}
+    verb = "Would apply" if dry_run else "Applied"
+    print(f"[blue]{verb} {counts[APPLIED]} extensions, skipped {counts[SKIPPED]} already in effect.[/blue]")
+    if counts[FAILED]:
+        print_err(f"{counts[FAILED]} extensions failed. Run the same command again to retry them.", color=False)
+        exit(1)
+
+def run_tests(
+    bundles: Annotated[List[Path] | None, typer.Argument(help="Autograder bundle directories or zips (default: the project's \"autograder\")", show_default=False)] = None,
+    files: Annotated[List[str] | None, typer.Option("-f", "--file", help="File or directory to test (default: what gscli submit would upload)")] = None,
+    recursive: Annotated[bool, typer.Option("-r", "--recursive", help="Recursively search directories for files")] = False,
+    timeout: Annotated[float, typer.Option("-t", "--timeout", min=1, help="Seconds each test group may run")] = AUTOGRADER_TIMEOUT,
+    workers: Annotated[int, typer.Option("-w", "--workers", min=1, help="Test groups run at once")] = TEST_WORKERS,
+    setup: Annotated[bool, typer.Option("--setup", help="Run the bundle's setup.sh first (it may install packages on your machine)")] = False,
+    keep: Annotated[bool, typer.Option("--keep", help="Keep the temporary workspaces for debugging")] = False,
+) -> None:
+    """Run a Gradescope autograder locally on your files, so you only submit once it passes.
+    A bundle is a directory (or zip) with run_autograder; a directory of such bundles runs as test groups in parallel."""
+    project = load_project() or {}
+    if not bundles:
+        if not project.get("autograder"):
+            print_err("Give an autograder bundle, or name one under \"autograder\" in the project's .gscli file.")
+            exit(1)
+        bundles = [Path(project["root"]) / project["autograder"]]
+    if files is None:
+        files = [str(Path(project["root"]) / f) for f in project["files"]] if project.get("files") else [str(Path.cwd().absolute())]
+
+    try:
+        groups = [group for bundle in bundles for group in find_groups(bundle)]
+        file_objs = collect_file_objs(files, recursive=recursive, ignore=project.get("ignore"))
+    except Exception as e:
+        print_err(e)
+        exit(1)
+    paths = [f.name for f in file_objs]
+    for f in file_objs:
+        f.close()
+    if not paths:
+        print_err("You must specify at least one file to test.", color=False)
+        exit(1)
+
+    from rich.status import Status
+
+    with Status(f"Running {len(groups)} test group(s) on {len(paths)} files..."):
+        runs = run_groups(groups, paths, timeout=timeout, setup=setup, keep=keep, workers=workers)
+
+    results = merge_results(runs)
+    print("\nLocal Autograder Results:")
+    report_submission_results(parse_results_json(results), None)
+    for run in runs:
+        where = f" in {run.workspace}" if keep else ""
+        print(f"[blue]{run.name}: {format_seconds(run.duration)}{where}[/blue]")
+    print(f"[bold]Score: {summarize_score(results)}[/bold]")
+    if any(run.results is None for run in runs) or any(r["status"] != "passed" for r in results["tests"]):
+        exit(1)
@@ -0,0 +1,162 @@
+"""Compact local index of the user's courses and assignments.
+
+The index is refreshed whenever gscli fetches course or assignment metadata anyway
+(e.g. in `gscli list` and `gscli choose`), and read by code that must answer without
+the network, such as shell completion. Keep this module free of gradescopeapi and
+requests imports.
+
+Besides the courses and their assignments, the index keeps every due and late due
+date in one sorted list of [timestamp, kind, course id, assignment id] entries, so
+"what's due next" is a binary search. Re-indexing a course only replaces that
+course's entries.
+
+`gscli sync` also records the latest submission to every assignment, which makes the
+index (with the results store) the mirror that `--offline` commands answer from.
+mirrored_courses() and mirrored_assignments() turn it back into objects with the
+attributes of gradescopeapi's Course and Assignment.
+"""
+import bisect
+import heapq
+import json
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+from .utils import GLOBAL_CONFIG_DIR, write_json_atomic
+
+INDEX_FILE = GLOBAL_CONFIG_DIR / "index.json"
+INDEX_VERSION = 2
+
+# Kinds of deadlines
+DUE = "due"
+LATE_DUE = "late_due"
+
+
+class IndexedCourse(NamedTuple):
+    """A course from the index, standing in for a gradescopeapi Course."""
+    name: str
+    semester: str
+    year: str
+
+
+class IndexedAssignment(NamedTuple):
+    """An assignment from the index, standing in for a gradescopeapi Assignment."""
+    assignment_id: str
+    name: str
+    release_date: datetime | None
+    due_date: datetime | None
+    late_due_date: datetime | None
+    grade: str | None
+    max_grade: str | None
+
+
+def _timestamp(dt) -> float | None:
+    return dt.timestamp() if dt else None
+
+
+def _datetime(timestamp: float | None) -> datetime | None:
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp is not None else None
+
+
+def load_index() -> dict:
+    """Load the local index. Returns an empty index if there is none or it is unreadable."""
+    try:
+        with open(INDEX_FILE, "rb") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index
+        if index.get("version") == 1:
+            index["version"] = INDEX_VERSION
+            index["deadlines"] = sorted(e for course_id in index["courses"] for e in _course_deadlines(index, course_id))
+            index["updated_at"] = None
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "courses": {}, "deadlines": [], "updated_at": None}
+
+
+def save_index(index: dict) -> None:
+    """Write the index to disk."""
+    index["updated_at"] = time.time()
+    write_json_atomic(INDEX_FILE, index)
+
+
+def _course_deadlines(index: dict, course_id: str) -> list[list]:
+    """Deadline entries of one course's indexed assignments."""
+    entries = []
+    for assignment_id, a in index["courses"][course_id]["assignments"].items():
+        for kind in (DUE, LATE_DUE):
+            if a[kind] is not None:
+                entries.append([a[kind], kind, course_id, assignment_id])
+    return entries
+
+
+def index_courses(index: dict, course_list: dict) -> None:
+    """Replace the indexed courses with the ones in course_list, keeping their known assignments.
+
+    course_list maps course ids to gradescopeapi Course objects, as returned by get_courses.
+    """
+    courses = index["courses"]
+    index["courses"] = {
+        course_id: {
+            "name": course.name,
+            "term": f"{course.semester} {course.year}",
+            "assignments": courses.get(course_id, {}).get("assignments", {}),
+        }
+        for course_id, course in course_list.items()
+    }
+    index["deadlines"] = [e for e in index["deadlines"] if e[2] in index["courses"]]
+
+
+def index_assignments(index: dict, course_id: str, assignments: list) -> None:
+    """Replace the indexed assignments of a course with gradescopeapi Assignment objects."""
+    course = index["courses"].setdefault(course_id, {"name": course_id, "term": "", "assignments": {}})
+    known = course["assignments"]
+    course["assignments"] = {
+        a.assignment_id: {
+            "name": a.name,
+            "release": _timestamp(a.release_date),
+            "due": _timestamp(a.due_date),
+            "late_due": _timestamp(a.late_due_date),
+            "grade": a.grade,
+            "max_grade": a.max_grade,
+            "submission": known.get(a.assignment_id, {}).get("submission"),
+        }
+        for a in assignments if a.assignment_id
+    }
+    course["synced_at"] = time.time()
+    kept = (e for e in index["deadlines"] if e[2] != course_id)
+    index["deadlines"] = list(heapq.merge(kept, sorted(_course_deadlines(index, course_id))))
+
+
+def deadlines_between(index: dict, start: float, end: float) -> list[list]:
+    """Deadline entries with start <= timestamp <= end, soonest first."""
+    deadlines = index["deadlines"]
+    lo = bisect.bisect_left(deadlines, [start])
+    hi = bisect.bisect_right(deadlines, [end, "~"])
+    return deadlines[lo:hi]
+
+
+def index_submissions(index: dict, course_id: str, submissions: dict[str, str]) -> None:
+    """Record the latest submission id of each assignment of a course, as returned by get_submissions."""
+    for assignment_id, a in index["courses"].get(course_id, {}).get("assignments", {}).items():
+        a["submission"] = submissions.get(assignment_id)
+
+
+def mirrored_courses(index: dict) -> dict[str, IndexedCourse]:
+    """The indexed courses, like get_courses() returns them."""
+    courses = {}
+    for course_id, c in index["courses"].items():
+        semester, _, year = c["term"].rpartition(" ")
+        courses[course_id] = IndexedCourse(c["name"], semester, year)
+    return courses
+
+
+def mirrored_assignments(index: dict, course_id: str) -> list[IndexedAssignment]:
+    """The indexed assignments of a course, like Account.get_assignments() returns them."""
+    return [
+        IndexedAssignment(
+            assignment_id, a["name"], _datetime(a["release"]), _datetime(a["due"]), _datetime(a["late_due"]),
+            a.get("grade"), a.get("max_grade"),
+        )
+        for assignment_id, a in index["courses"].get(course_id, {}).get("assignments", {}).items()
+    ]
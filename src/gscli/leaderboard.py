@@ -0,0 +1,168 @@
+"""Assignment leaderboards, for `gscli leaderboard`.
+
+Each leaderboard is cached in its own JSON file with the ETag and Last-Modified
+headers it came with. Refreshing it is a conditional request, so an unchanged
+leaderboard costs a 304 and no parsing. A changed one is fed chunk by chunk to a
+streaming HTML parser that keeps only the table's cells (and stops reading once the
+table ends), so the page never has to be held as a whole or turned into a DOM. Rows
+are compared with the cached ones by name, so callers can tell which rows changed.
+"""
+import json
+import time
+from functools import lru_cache
+from .utils import GLOBAL_CONFIG_DIR, GRADESCOPE_URL, write_json_atomic
+
+LEADERBOARD_DIR = GLOBAL_CONFIG_DIR / "leaderboards"
+
+# Pause between refreshes in `gscli leaderboard --watch`
+LEADERBOARD_INTERVAL = 30  # seconds
+
+# Characters of the page parsed at a time
+CHUNK_SIZE = 16 * 1024
+
+
+@lru_cache(maxsize=None)
+def _parser_class() -> type:
+    """The LeaderboardParser class, defined on first use so the CLI starts without html.parser."""
+    from html.parser import HTMLParser
+
+    class LeaderboardParser(HTMLParser):
+        """Collects the header and body cells of a page's leaderboard table as text.
+
+        The leaderboard is the first table whose class mentions "leaderboard"; done is
+        set once it has been read completely. Until one turns up, the first top-level
+        table is collected instead, for pages whose table has no telling class.
+        """
+
+        def __init__(self):
+            super().__init__(convert_charrefs=True)
+            self.headers = []
+            self.rows = []
+            self.done = False
+            self._tables = []  # per open table: "leaderboard", "fallback", or None if its cells aren't collected
+            self._fallback_seen = False
+            self._cell = None
+            self._row = None
+
+        @property
+        def _inside(self) -> bool:
+            # directly in the collected table, not in a table nested in one of its cells
+            return bool(self._tables) and self._tables[-1] is not None
+
+        def handle_starttag(self, tag, attrs):
+            if self.done:
+                return
+            if tag == "table":
+                if "leaderboard" in (dict(attrs).get("class") or "").lower():
+                    self.headers, self.rows = [], []
+                    self._tables.append("leaderboard")
+                elif not self._tables and not self._fallback_seen:
+                    self._fallback_seen = True
+                    self._tables.append("fallback")
+                else:
+                    self._tables.append(None)
+            elif self._inside and tag == "tr":
+                self._row = []
+            elif self._inside and tag in ("td", "th") and self._row is not None:
+                self._cell = []
+
+        def handle_endtag(self, tag):
+            if self.done or not self._tables:
+                return
+            if tag == "table":
+                if self._tables.pop() == "leaderboard":
+                    self.done = True
+            elif self._inside and tag in ("td", "th") and self._cell is not None:
+                self._row.append(" ".join("".join(self._cell).split()))
+                self._cell = None
+            elif self._inside and tag == "tr" and self._row is not None:
+                if self._row:
+                    if not self.headers and not self.rows:
+                        self.headers = self._row
+                    else:
+                        self.rows.append(self._row)
+                self._row = None
+
+        def handle_data(self, data):
+            if self._cell is not None:
+                self._cell.append(data)
+
+    return LeaderboardParser
+
+
+def parse_leaderboard(chunks) -> tuple[list[str], list[list[str]]]:
+    """The header and rows of the leaderboard table in an HTML page given as chunks of text."""
+    parser = _parser_class()()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    parser.close()
+    return parser.headers, parser.rows
+
+
+def cache_path(course_id: str, assignment_id: str):
+    return LEADERBOARD_DIR / f"{course_id}-{assignment_id}.json"
+
+
+def load_cached_leaderboard(course_id: str, assignment_id: str) -> dict | None:
+    """The cached leaderboard of an assignment, or None if there is none or it's unreadable."""
+    try:
+        return json.loads(cache_path(course_id, assignment_id).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def name_column(headers: list[str]) -> int:
+    """The column identifying a row: the first header mentioning a name, else the second column (after the rank)."""
+    for i, header in enumerate(headers):
+        if "name" in header.lower():
+            return i
+    return 1 if len(headers) > 1 else 0
+
+
+def changed_rows(old: dict | None, headers: list[str], rows: list[list[str]]) -> set[str]:
+    """Names of the rows that are new or differ from the rows in old, a cached leaderboard.
+
+    Without a cached leaderboard there is nothing to compare with, and no row counts as changed.
+    """
+    if old is None:
+        return set()
+    column = name_column(headers)
+    before = {}
+    if old["headers"] == headers:
+        before = {row[column]: row for row in old["rows"] if len(row) > column}
+    return {row[column] for row in rows if len(row) > column and before.get(row[column]) != row}
+
+
+def refresh_leaderboard(session, course_id: str, assignment_id: str) -> tuple[dict, set[str]]:
+    """Fetch an assignment's leaderboard unless the cached one is current, and cache it.
+
+    Returns the leaderboard (a dict with "headers", "rows" and "fetched_at") and the
+    names of the rows that changed since the cached one.
+    """
+    cached = load_cached_leaderboard(course_id, assignment_id)
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    url = f"{GRADESCOPE_URL}/courses/{course_id}/assignments/{assignment_id}/leaderboard"
+    with session.get(url, headers=headers, stream=True) as response:
+        if response.status_code == 304 and cached is not None:
+            cached["fetched_at"] = time.time()
+            write_json_atomic(cache_path(course_id, assignment_id), cached)
+            return cached, set()
+        response.raise_for_status()
+        # without a charset in the header requests assumes ISO-8859-1 for HTML, which garbles
+        # non-ASCII names. Gradescope's pages are UTF-8, and guessing would need the whole page.
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        columns, rows = parse_leaderboard(response.iter_content(CHUNK_SIZE, decode_unicode=True))
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    board = {"headers": columns, "rows": rows, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+    write_json_atomic(cache_path(course_id, assignment_id), board)
+    return board, changed_rows(cached, columns, rows)
@@ -0,0 +1,83 @@
+"""Detached background poller for `gscli submit --detach`.
+
+One poller process serves every pending submission in the results store, so many
+detached submissions on one machine share a single process and session. The poller
+exits once nothing is pending.
+
+Run as `python -m gscli.poller`; use spawn_poller() to start it in the background.
+"""
+import subprocess
+import sys
+import time
+from .utils import GLOBAL_CONFIG_DIR, file_lock, restore_connection, store_session_cookies, fetch_submission_status
+from .results import pending_entries, record_status, save_entry, DETACHED_TIMEOUT
+from .timings import earliest_results
+
+POLLER_LOCK_FILE = GLOBAL_CONFIG_DIR / "poller.lock"
+
+# Pause between rounds over all pending submissions
+POLL_INTERVAL = 2  # seconds
+
+
+def spawn_poller() -> None:
+    """Start a detached poller process. It exits immediately if another poller is already running."""
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(
+        [sys.executable, "-m", "gscli.poller"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        **kwargs,
+    )
+
+
+def poll_pending(session) -> None:
+    """Poll every pending submission until none are left."""
+    while pending := pending_entries():
+        for entry in pending:
+            age = time.time() - entry["submitted_at"]
+            if age > DETACHED_TIMEOUT:
+                entry["gave_up"] = True
+                save_entry(entry)
+                continue
+            if age < earliest_results(entry["course"], entry["assignment"]):
+                # results of this assignment never came this fast
+                continue
+            try:
+                status_json = fetch_submission_status(session, entry["link"])
+            except Exception:
+                # try again next round; transient errors are common under load
+                continue
+            if status_json["status"] != entry["status"]:
+                record_status(entry, status_json)
+        time.sleep(POLL_INTERVAL)
+
+
+def main() -> None:
+    connection = None
+    while True:
+        with file_lock(POLLER_LOCK_FILE, blocking=False) as acquired:
+            if not acquired:
+                # the running poller picks up our submission on its next round
+                return
+            if connection is None:
+                connection = restore_connection()
+                if connection is None:
+                    # logged out; `gscli status` can still fetch results later
+                    return
+            poll_pending(connection.session)
+            store_session_cookies(connection.session)
+
+        # A submission may have been added after our last look, by a process whose own
+        # poller saw the lock still held and exited. Check again now that it's released.
+        if not pending_entries():
+            return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Checks run on a submission's files before anything is uploaded (`gscli submit`).
+
+They catch the mistakes that would otherwise cost an upload and a trip through the
+autograder queue: Python files with syntax errors, required files that are missing,
+two files that would be uploaded under the same name (like off_by_1/calculator.py
+and correct/calculator.py), and files that are too large. A project's .gscli file
+can configure them:
+
+    "preflight": {
+        "required": ["calculator.py"],   # file names the upload must contain
+        "max_file_size": 1048576,        # bytes, per file
+        "checks": ["pytest -q tests"]    # commands that must succeed, run in the project
+    }
+
+Compiling sources and running check commands are independent jobs, so they run
+in parallel in a process pool.
+"""
+import os
+import subprocess
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
+# Gradescope refuses larger files
+MAX_FILE_SIZE = 100 * 1024 * 1024  # bytes
+
+# Seconds a check command may run
+CHECK_TIMEOUT = 120
+
+# Characters of a failed check command's output shown
+OUTPUT_LIMIT = 2000
+
+
+class CheckFailure(NamedTuple):
+    """A check that failed. path is the file it concerns, if any."""
+    check: str
+    message: str
+    path: str | None = None
+
+
+def compile_source(path: str) -> CheckFailure | None:
+    """Byte-compile a Python file in memory, without writing a .pyc."""
+    try:
+        source = Path(path).read_bytes()
+        compile(source, path, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return CheckFailure("syntax", f"line {e.lineno}: {e.msg}", path)
+    except (OSError, ValueError) as e:
+        return CheckFailure("syntax", str(e), path)
+    return None
+
+
+def run_check(command: str, cwd: str | None, timeout: float = CHECK_TIMEOUT) -> CheckFailure | None:
+    """Run a check command in a shell. It fails if it exits with a nonzero status or times out."""
+    try:
+        completed = subprocess.run(command, shell=True, cwd=cwd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return CheckFailure(command, f"timed out after {timeout:g} seconds")
+    if completed.returncode != 0:
+        output = (completed.stdout + completed.stderr).strip()
+        if len(output) > OUTPUT_LIMIT:
+            output = "..." + output[-OUTPUT_LIMIT:]
+        return CheckFailure(command, f"exited with status {completed.returncode}" + (f"\n{output}" if output else ""))
+    return None
+
+
+def check_files(paths: list[str], required: list[str], max_file_size: int) -> list[CheckFailure]:
+    """Check file names and sizes. Files are uploaded under their base names, so those must be unique."""
+    failures = []
+    names = Counter(Path(p).name for p in paths)
+    for name in required:
+        if names[name] == 0:
+            failures.append(CheckFailure("required", f"{name} is required but not among the files"))
+    for path in paths:
+        if names[Path(path).name] > 1:
+            failures.append(CheckFailure("duplicate", f"{Path(path).name} is submitted more than once", path))
+    for path in paths:
+        size = os.path.getsize(path)
+        if size > max_file_size:
+            failures.append(CheckFailure("size", f"{size / 1024:.1f} KB is over the limit of {max_file_size / 1024:.1f} KB", path))
+    return failures
+
+
+def run_preflight(paths: list[str], config: dict | None = None, cwd: str | None = None, archive: bool = False,
+                  workers: int | None = None) -> list[CheckFailure]:
+    """Run every check on the files to be submitted and return the failures.
+
+    config is the "preflight" section of a project file and cwd is where check
+    commands run. Repeated names are fine in an archive, which keeps the files' paths.
+    """
+    config = config or {}
+    failures = check_files(paths, config.get("required", []), config.get("max_file_size", MAX_FILE_SIZE))
+    if archive:
+        failures = [f for f in failures if f.check != "duplicate"]
+
+    sources = [p for p in paths if p.endswith(".py")]
+    commands = config.get("checks", [])
+    if not sources and not commands:
+        return failures
+    # imported here since it loads multiprocessing, which would slow down every CLI start
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or min(len(sources) + len(commands), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # check commands are usually the slow part, so they start first
+        checks = [executor.submit(run_check, command, cwd) for command in commands]
+        compiled = executor.map(compile_source, sources, chunksize=max(1, len(sources) // (4 * workers)))
+        failures += [f for f in compiled if f is not None]
+        failures += [f for f in (future.result() for future in checks) if f is not None]
+    return failures
@@ -0,0 +1,90 @@
+"""Project-local assignment bindings.
+
+A `.gscli` file in a project directory binds it (and every directory below it) to an
+assignment, so gscli commands run anywhere in the project need no `gscli choose`. It
+is JSON like the global current assignment file, with optional extras:
+
+    {
+        "course": "1197898", "assignment": "7308477",
+        "course_name": "Python", "assignment_name": "Calculator",
+        "files": ["src", "README.md"],   # what `gscli submit` uploads, relative to the project
+        "ignore": ["*.pyc", "__pycache__"],  # glob patterns never uploaded
+        "leaderboard": "my name",  # default leaderboard name
+        "preflight": {...},  # checks before uploading, see preflight.py
+        "autograder": "grader"   # autograder bundle `gscli test` runs, relative to the project
+    }
+
+The file is found by searching upward from the working directory. Every directory
+looked at is memoized, so repeated lookups in one process cost nothing.
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+
+PROJECT_FILE_NAME = ".gscli"
+
+
+@lru_cache(maxsize=None)
+def _find_from(directory: Path) -> Path | None:
+    candidate = directory / PROJECT_FILE_NAME
+    if candidate.is_file():
+        return candidate
+    if directory.parent == directory:
+        return None
+    return _find_from(directory.parent)
+
+
+def find_project_file(start: Path | None = None) -> Path | None:
+    """The nearest .gscli file in start (the working directory by default) or its ancestors."""
+    return _find_from((start or Path.cwd()).resolve())
+
+
+# Invalid project files already reported, so each is reported once per process
+_reported = set()
+
+
+def _report_invalid(path: Path, reason: str) -> None:
+    # utils imports this module, so it's imported here
+    from .utils import print_err
+
+    if path not in _reported:
+        _reported.add(path)
+        print_err(f"Ignoring {path}: {reason}")
+
+
+def load_project(start: Path | None = None) -> dict | None:
+    """The nearest project binding, with its directory under "root".
+
+    None if there is none, or if it's unreadable or not a JSON object with a course
+    and an assignment, in which case the problem is reported.
+    """
+    path = find_project_file(start)
+    if path is None:
+        return None
+    try:
+        project = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        _report_invalid(path, f"it isn't readable JSON ({e})")
+        return None
+    if not isinstance(project, dict) or not all(isinstance(project.get(key), (str, int)) for key in ("course", "assignment")):
+        _report_invalid(path, "it must be a JSON object with a course and an assignment")
+        return None
+    # ids are strings everywhere else, but hand-written files may use numbers
+    project["course"], project["assignment"] = str(project["course"]), str(project["assignment"])
+    project["root"] = str(path.parent)
+    return project
+
+
+def write_project_file(directory: Path, course_name: str, course: str, assignment_name: str, assignment: str) -> Path:
+    """Bind directory to an assignment, keeping the files, ignore rules and leaderboard name of an existing binding."""
+    path = directory / PROJECT_FILE_NAME
+    try:
+        project = json.loads(path.read_text())
+    except (OSError, ValueError):
+        project = None
+    if not isinstance(project, dict):
+        project = {"files": [], "ignore": [], "leaderboard": None}
+    project.update(course=course, assignment=assignment, course_name=course_name, assignment_name=assignment_name)
+    path.write_text(json.dumps(project, indent=4) + "\n")
+    _find_from.cache_clear()
+    return path
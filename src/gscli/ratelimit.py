@@ -0,0 +1,101 @@
+"""Token-bucket rate limiting shared by all gscli processes on the machine.
+
+The bucket lives in a small JSON file under GLOBAL_CONFIG_DIR and is only read and
+written while holding a file lock, so concurrent gscli invocations (CI jobs, several
+terminals, scripted loops) draw from one request budget.
+
+Requests have priorities: polls may only take a token while the bucket is at least
+half full, so uploads always find tokens left even when many processes are polling.
+"""
+import json
+import time
+from .utils import GLOBAL_CONFIG_DIR, file_lock, write_json_atomic
+
+RATE_LIMIT_FILE = GLOBAL_CONFIG_DIR / "ratelimit.json"
+
+RATE = 4  # tokens added per second
+BURST = 8  # bucket capacity
+
+# Request priorities
+UPLOAD = 0
+NORMAL = 1
+POLL = 2
+
+
+def request_priority(request) -> int:
+    """Classify a prepared request: uploads and other form posts, polls of a submission's status, or anything else."""
+    if request.method == "POST":
+        return UPLOAD
+    if "/submissions/" in request.url and "json" in request.headers.get("Accept", ""):
+        return POLL
+    return NORMAL
+
+
+class RateLimiter:
+    """A token bucket stored in state_file."""
+
+    def __init__(self, state_file=None, rate: float = RATE, burst: float = BURST):
+        self.state_file = state_file or RATE_LIMIT_FILE
+        self.lock_file = self.state_file.with_suffix(".lock")
+        self.rate = rate
+        self.burst = burst
+        # tokens a request of each priority must leave in the bucket
+        self.reserve = {UPLOAD: 0, NORMAL: 1, POLL: burst / 2}
+
+    def _load(self, now: float) -> dict:
+        try:
+            state = json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            state = {"tokens": self.burst, "updated": now, "blocked_until": 0,
+                     "requests": 0, "delayed": 0, "delay_seconds": 0.0, "throttled": 0}
+        state.setdefault("connections", 0)
+        state["tokens"] = min(self.burst, state["tokens"] + (now - state["updated"]) * self.rate)
+        state["updated"] = now
+        return state
+
+    def acquire(self, priority: int = NORMAL) -> float:
+        """Block until a request of the given priority may be sent. Returns the time waited in seconds."""
+        waited = 0.0
+        while True:
+            with file_lock(self.lock_file):
+                now = time.time()
+                state = self._load(now)
+                needed = self.reserve[priority] + 1
+                if now >= state["blocked_until"] and state["tokens"] >= needed:
+                    state["tokens"] -= 1
+                    state["requests"] += 1
+                    if waited:
+                        state["delayed"] += 1
+                        state["delay_seconds"] += waited
+                    write_json_atomic(self.state_file, state)
+                    return waited
+                wait = max(state["blocked_until"] - now, (needed - state["tokens"]) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def throttled(self, retry_after: float) -> None:
+        """Record that Gradescope throttled a request, and hold every process back for retry_after seconds."""
+        with file_lock(self.lock_file):
+            now = time.time()
+            state = self._load(now)
+            state["throttled"] += 1
+            state["tokens"] = 0
+            state["blocked_until"] = max(state["blocked_until"], now + retry_after)
+            write_json_atomic(self.state_file, state)
+
+    def connections_opened(self, count: int) -> None:
+        """Record that count new connections to Gradescope were opened."""
+        with file_lock(self.lock_file):
+            state = self._load(time.time())
+            state["connections"] += count
+            write_json_atomic(self.state_file, state)
+
+    def counters(self) -> dict:
+        """Current shared state: available tokens and counts of requests, delayed and throttled requests, and connections opened."""
+        with file_lock(self.lock_file):
+            return self._load(time.time())
+
+    def reset(self) -> None:
+        """Forget all counters and refill the bucket."""
+        with file_lock(self.lock_file):
+            self.state_file.unlink(missing_ok=True)
@@ -0,0 +1,119 @@
+"""Local store of submission statuses and results.
+
+Each submission gscli follows gets one small JSON file, written by whichever process
+polled it last (`gscli submit`, `gscli status` or the detached poller). Entries whose
+status isn't processed yet are the work queue of the detached poller, and finished
+entries that the user hasn't seen yet are reported by `gscli notify`.
+
+Entries also note when each status was first seen ("phases"); processed submissions
+whose upload was noted add their timing to the timings store (see timings.py).
+"""
+import json
+import time
+from datetime import datetime
+from .utils import GLOBAL_CONFIG_DIR, write_json_atomic
+from .timings import record_timing
+
+RESULTS_DIR = GLOBAL_CONFIG_DIR / "results"
+
+# The detached poller gives up on a submission this long after it was submitted
+DETACHED_TIMEOUT = 30 * 60  # seconds
+
+
+def submission_id_from_link(submission_link: str) -> str:
+    """Extract the submission id from a submission link."""
+    return submission_link.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _entry_file(submission_id: str):
+    return RESULTS_DIR / f"{submission_id}.json"
+
+
+def load_entry(submission_id: str) -> dict | None:
+    """Load the stored entry of a submission, or None if there is none."""
+    try:
+        return json.loads(_entry_file(submission_id).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def save_entry(entry: dict) -> None:
+    """Write a submission entry to the store."""
+    entry["updated_at"] = time.time()
+    write_json_atomic(_entry_file(entry["submission"]), entry)
+
+
+def submission_time(status_json: dict) -> float | None:
+    """When a submission was made, from the created_at of its status JSON, or None if it's missing."""
+    try:
+        return datetime.fromisoformat(status_json["created_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def new_entry(course: str, assignment: str, submission_link: str, submitted_at: float | None = None) -> dict:
+    """Create (but don't save) the entry of a submission, made submitted_at or (by default) just now.
+
+    Entries of submissions made elsewhere should pass submission_time() of their status,
+    since entries are ordered by submitted_at.
+    """
+    return {
+        "course": course,
+        "assignment": assignment,
+        "submission": submission_id_from_link(submission_link),
+        "link": submission_link,
+        "submitted_at": time.time() if submitted_at is None else submitted_at,
+        "status": "unprocessed",
+        "results": None,
+        "gave_up": False,
+        "notified": False,
+    }
+
+
+def note_phase(entry: dict, phase: str, when: float | None = None) -> None:
+    """Note when an entry was first seen in a phase (a status, or timings.UPLOADED). Doesn't save the entry."""
+    entry.setdefault("phases", {}).setdefault(phase, time.time() if when is None else when)
+
+
+def record_status(entry: dict, status_json: dict, notified: bool = False) -> None:
+    """Update and save an entry with a status fetched from Gradescope."""
+    newly_processed = status_json["status"] == "processed" and entry["status"] != "processed"
+    entry["status"] = status_json["status"]
+    entry["results"] = status_json.get("results") if status_json["status"] == "processed" else None
+    entry["notified"] = notified
+    note_phase(entry, status_json["status"])
+    if newly_processed:
+        record_timing(entry)
+    save_entry(entry)
+
+
+def all_entries() -> list[dict]:
+    """Load every entry in the store, oldest submission first."""
+    entries = []
+    for path in RESULTS_DIR.glob("*.json"):
+        try:
+            entries.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    entries.sort(key=lambda e: e["submitted_at"])
+    return entries
+
+
+def is_pending(entry: dict) -> bool:
+    """Whether the detached poller should still poll this entry."""
+    return entry["status"] != "processed" and not entry["gave_up"]
+
+
+def pending_entries() -> list[dict]:
+    """Entries the detached poller still has to poll."""
+    return [e for e in all_entries() if is_pending(e)]
+
+
+def unnotified_entries(course: str | None = None, assignment: str | None = None) -> list[dict]:
+    """Finished entries the user hasn't been shown yet, optionally only those of one assignment."""
+    return [
+        e for e in all_entries()
+        if not e["notified"] and not is_pending(e)
+        and (course is None or e["course"] == course)
+        and (assignment is None or e["assignment"] == assignment)
+    ]
@@ -0,0 +1,66 @@
+"""Fuzzy search over all (course, assignment) pairs, used by `gscli choose --search`."""
+from prompt_toolkit.completion import Completer, Completion
+
+# Most suggestions shown while typing
+MAX_SUGGESTIONS = 50
+
+
+def fuzzy_score(query: str, text: str) -> tuple[int, int] | None:
+    """Score how well query matches text as a subsequence, ignoring whitespace.
+
+    Both strings are expected to be lowercase. Returns None if query doesn't match,
+    otherwise (number of skipped characters, start of match), where lower is better.
+    """
+    query = "".join(query.split())
+    if not query:
+        return (0, 0)
+
+    start = text.find(query[0])
+    if start == -1:
+        return None
+    pos = start
+    for char in query[1:]:
+        pos = text.find(char, pos + 1)
+        if pos == -1:
+            return None
+    return (pos + 1 - start - len(query), start)
+
+
+class AssignmentIndex:
+    """In-memory index of assignments across courses, searchable by a fuzzy query."""
+
+    def __init__(self):
+        self.entries = {}  # title -> (course_id, assignment)
+        self._keys = []  # (lowercase title, title)
+
+    def add(self, course_id: str, course_name: str, assignments: list) -> None:
+        """Add a course's gradescopeapi Assignment objects to the index."""
+        for a in assignments:
+            if not a.assignment_id:
+                continue
+            title = f"{course_name} / {a.name} ({a.assignment_id})"
+            self.entries[title] = (course_id, a)
+            self._keys.append((title.lower(), title))
+
+    def search(self, query: str) -> list[str]:
+        """Return the titles matching query, best match first."""
+        query = query.lower()
+        scored = []
+        for key, title in self._keys:
+            score = fuzzy_score(query, key)
+            if score is not None:
+                scored.append((score, title))
+        scored.sort()
+        return [title for _, title in scored]
+
+
+class AssignmentCompleter(Completer):
+    """prompt_toolkit completer suggesting the best matches of the whole input line."""
+
+    def __init__(self, index: AssignmentIndex):
+        self.index = index
+
+    def get_completions(self, document, complete_event):
+        query = document.text_before_cursor
+        for title in self.index.search(query)[:MAX_SUGGESTIONS]:
+            yield Completion(title, start_position=-len(query))
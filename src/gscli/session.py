@@ -0,0 +1,118 @@
+"""The requests session gscli uses for every request to Gradescope."""
+import os
+import socket
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from .ratelimit import RateLimiter, request_priority
+from .utils import GRADESCOPE_URL
+from .cassette import mount_cassette
+
+# Seconds to hold back after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 5
+
+# Hosts that get a connection pool of their own
+POOL_CONNECTIONS = 4
+# Connections kept open per host. At least as many as gscli's largest thread pools
+# (choose, sync, status --watch), so concurrent requests never wait for a connection.
+# GSCLI_POOL_MAXSIZE overrides it.
+POOL_MAXSIZE = 16
+
+# Idle seconds before TCP keep-alive probes start, so that pooled connections survive
+# long pauses (e.g. a staged upload waiting for its time) instead of going stale
+KEEPALIVE_IDLE = 30
+
+
+def keepalive_socket_options() -> list[tuple]:
+    """urllib3 socket options enabling TCP keep-alive, with the idle time where the platform supports it."""
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE))
+    elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, KEEPALIVE_IDLE))
+    return options
+
+
+class PooledAdapter(HTTPAdapter):
+    """An HTTPAdapter with gscli's pool sizes and TCP keep-alive on every connection."""
+
+    def __init__(self, pool_maxsize: int | None = None):
+        if pool_maxsize is None:
+            pool_maxsize = int(os.environ.get("GSCLI_POOL_MAXSIZE") or POOL_MAXSIZE)
+        super().__init__(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", HTTPConnection.default_socket_options + keepalive_socket_options())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def connection_stats(self, host: str | None = None) -> tuple[int, int]:
+        """Connections opened and requests sent over this adapter's pools (only the pools to host, if given)."""
+        pools = self.poolmanager.pools
+        connections = requests_sent = 0
+        for key in pools.keys():
+            if host is not None and key.key_host != host:
+                continue
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        return connections, requests_sent
+
+
+class GscliSession(requests.Session):
+    """A requests.Session whose requests all go through the shared rate limiter.
+
+    Hooking send() covers every request, including redirects and the requests made
+    inside gradescopeapi. If GSCLI_RECORD or GSCLI_REPLAY is set, the session records
+    or replays its traffic (see cassette.py); replayed requests aren't rate limited.
+
+    Connections are pooled by a PooledAdapter. The number of connections opened to
+    Gradescope is added to the rate limiter's shared counters, so `gscli ratelimit`
+    shows how well connections are reused.
+    """
+
+    def __init__(self, rate_limiter: RateLimiter | None = None, pool_maxsize: int | None = None):
+        super().__init__()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.pooled_adapter = PooledAdapter(pool_maxsize)
+        self.mount("https://", self.pooled_adapter)
+        self.mount("http://", self.pooled_adapter)
+        self._connections_counted = 0
+        self._connections_lock = threading.Lock()
+        if mount_cassette(self):
+            self.rate_limiter = None
+
+    def connection_stats(self) -> tuple[int, int]:
+        """Connections this session opened, and requests it sent over them."""
+        return self.pooled_adapter.connection_stats()
+
+    def send(self, request, **kwargs):
+        # downloads of submitted files from cloud storage don't count against Gradescope's budget
+        if self.rate_limiter is not None and request.url.startswith(GRADESCOPE_URL):
+            self.rate_limiter.acquire(request_priority(request))
+        response = super().send(request, **kwargs)
+        if self.rate_limiter is not None and request.url.startswith(GRADESCOPE_URL):
+            with self._connections_lock:
+                connections, _ = self.pooled_adapter.connection_stats(urlsplit(GRADESCOPE_URL).hostname)
+                opened = connections - self._connections_counted
+                self._connections_counted = connections
+            if opened > 0:
+                self.rate_limiter.connections_opened(opened)
+        if response.status_code == 429 and self.rate_limiter is not None:
+            try:
+                retry_after = float(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+            except ValueError:
+                retry_after = DEFAULT_RETRY_AFTER
+            self.rate_limiter.throttled(retry_after)
+        return response
+
+
+def new_connection():
+    """Create a GSConnection that uses a GscliSession."""
+    from gradescopeapi.classes.connection import GSConnection
+
+    connection = GSConnection()
+    connection.session = GscliSession()
+    return connection
@@ -0,0 +1,94 @@
+"""How long the autograder of each assignment takes, for `gscli stats` and ETAs.
+
+Every submission gscli uploaded and followed until it was processed adds one line to
+a JSON lines file: [course, assignment, uploaded at, queue time, run time, total
+time], in seconds. Queue time is from the upload until the autograder was first seen
+running, run time from then until the results were first seen; both are None if the
+submission was never seen in between. Phases are only noticed when a submission is
+polled, so the times are upper bounds accurate to about one poll interval.
+"""
+import json
+import math
+from .utils import GLOBAL_CONFIG_DIR, file_lock
+
+TIMINGS_FILE = GLOBAL_CONFIG_DIR / "timings.jsonl"
+
+# Phases of a submission: the upload, then Gradescope's submission statuses
+UPLOADED = "uploaded"
+STARTED = ("autograder_harness_started", "autograder_task_started")
+PROCESSED = "processed"
+
+# Fewer timings than this are too few to skip polls on
+MIN_SAMPLES = 5
+
+
+def record_timing(entry: dict) -> None:
+    """Append the timing of a processed results store entry whose upload was observed."""
+    phases = entry.get("phases", {})
+    if UPLOADED not in phases or PROCESSED not in phases:
+        return
+    uploaded, processed = phases[UPLOADED], phases[PROCESSED]
+    started = min((phases[p] for p in STARTED if p in phases), default=None)
+    queue = started - uploaded if started is not None else None
+    run = processed - started if started is not None else None
+    line = json.dumps([entry["course"], entry["assignment"], uploaded, queue, run, processed - uploaded])
+
+    GLOBAL_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    with file_lock(TIMINGS_FILE.with_suffix(".lock")):
+        with open(TIMINGS_FILE, "a") as f:
+            f.write(line + "\n")
+
+
+def load_timings(course: str | None = None, assignment: str | None = None) -> list[list]:
+    """Stored timings, oldest first, optionally only those of one course or assignment."""
+    timings = []
+    try:
+        with open(TIMINGS_FILE) as f:
+            for line in f:
+                try:
+                    timing = json.loads(line)
+                except ValueError:
+                    continue
+                if (course is None or timing[0] == course) and (assignment is None or timing[1] == assignment):
+                    timings.append(timing)
+    except OSError:
+        pass
+    return timings
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    """The nearest-rank p-th percentile (0 < p <= 100) of values, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(timings: list[list]) -> dict:
+    """p50 and p95 of the queue, run and total times of some timings."""
+    columns = {"queue": 3, "run": 4, "total": 5}
+    summary = {"count": len(timings)}
+    for name, column in columns.items():
+        values = [t[column] for t in timings if t[column] is not None]
+        summary[name] = (percentile(values, 50), percentile(values, 95))
+    return summary
+
+
+def expected_total(course: str, assignment: str) -> tuple[float, float] | None:
+    """p50 and p95 of an assignment's time from upload to results, or None if it has no timings yet."""
+    totals = [t[5] for t in load_timings(course, assignment)]
+    if not totals:
+        return None
+    return percentile(totals, 50), percentile(totals, 95)
+
+
+def earliest_results(course: str, assignment: str) -> float:
+    """Seconds after an upload before which polling an assignment's submission is pointless.
+
+    This is the fastest 5% of the assignment's past submissions, or 0 while there are
+    fewer than MIN_SAMPLES of them.
+    """
+    totals = [t[5] for t in load_timings(course, assignment)]
+    if len(totals) < MIN_SAMPLES:
+        return 0.0
+    return percentile(totals, 5)
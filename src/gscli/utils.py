@@ -1,26 +1,43 @@
-from multiprocessing import connection
+from __future__ import annotations
+import re
 import sys
-from typing import NamedTuple
+import time
+import mimetypes
+from datetime import datetime, timedelta
+from typing import NamedTuple, TYPE_CHECKING, Iterator
+from contextlib import contextmanager
+from urllib.parse import urljoin
+import io
 import json
-import requests
+import os
 from pathlib import Path
-from cryptography.fernet import Fernet
 import platformdirs
-from gradescopeapi.classes.connection import GSConnection
-from gradescopeapi.classes.account import Account
+from .project import load_project
+
+# requests and gradescopeapi are slow to import, and this module is also loaded
+# by shell completion, which must never touch them. Import them where they're used.
+if TYPE_CHECKING:
+	import requests
+	from gradescopeapi.classes.connection import GSConnection
 
 GRADESCOPE_URL = "https://www.gradescope.com"
 
 # Encrypted cache directory - use platform-appropriate paths
-GLOBAL_CONFIG_DIR = Path(platformdirs.user_config_dir("gscli"))
+# (GSCLI_CONFIG_DIR overrides it, e.g. to run tests against a clean directory)
+GLOBAL_CONFIG_DIR = Path(os.environ.get("GSCLI_CONFIG_DIR") or platformdirs.user_config_dir("gscli"))
 CACHE_FILE = GLOBAL_CONFIG_DIR / "session_cache"
 KEY_FILE = GLOBAL_CONFIG_DIR / "cache.key"
 CURRENT_ASSIGNMENT_FILE = GLOBAL_CONFIG_DIR / "current_assignment"
 
+# How often a staged upload pings Gradescope to keep its connection alive
+KEEP_WARM_INTERVAL = 15  # seconds
+
 
 # TODO can use encryption to store cookies,
 # but better to use keyring when this code is moved to intermediate server
 
+# from cryptography.fernet import Fernet
+
 # def _get_or_create_key() -> bytes:
 # 	"""Get or create the encryption key for cache."""
 # 	if KEY_FILE.exists():
@@ -42,6 +59,17 @@ CURRENT_ASSIGNMENT_FILE = GLOBAL_CONFIG_DIR / "current_assignment"
 # 	key = _get_or_create_key()
 # 	return Fernet(key)
 
+def print_err(e: Exception | str, color: bool = True) -> None:
+	"""Print an error message."""
+	# rich is imported here, since shell completion loads this module too
+	from rich import print as rich_print
+
+	message = e.message if hasattr(e, 'message') else str(e)
+	if color:
+		rich_print(f"[red]{message}[/red]", file=sys.stderr)
+	else:
+		rich_print(message, file=sys.stderr)
+
 def _get_stored_session_cookies() -> dict | None:
 	"""Retrieve session cookies from cache."""
 	if not CACHE_FILE.exists():
@@ -88,6 +116,51 @@ def store_session_cookies(session: requests.Session) -> None:
 			file=sys.stderr
 		)
 
+def _lock(f, blocking: bool) -> bool:
+	"""Take an exclusive lock on an open file. Returns False if it is held elsewhere and blocking is False."""
+	try:
+		if sys.platform == "win32":
+			import msvcrt
+			f.seek(0)
+			msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+		else:
+			import fcntl
+			fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+	except OSError:
+		return False
+	return True
+
+def _unlock(f) -> None:
+	if sys.platform == "win32":
+		import msvcrt
+		f.seek(0)
+		msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+	else:
+		import fcntl
+		fcntl.flock(f, fcntl.LOCK_UN)
+
+def write_json_atomic(path: Path, data) -> None:
+	"""Write data as compact JSON by replacing path, so concurrent readers never see a partial file."""
+	path.parent.mkdir(parents=True, exist_ok=True)
+	tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+	tmp_path.write_text(json.dumps(data, separators=(",", ":")))
+	os.replace(tmp_path, path)
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+	"""Hold an exclusive lock on path (shared by all local gscli processes) for the duration of a with block.
+
+	Yields whether the lock was acquired, which can only be False if blocking is False.
+	"""
+	path.parent.mkdir(parents=True, exist_ok=True)
+	with open(path, "a+b") as f:
+		acquired = _lock(f, blocking)
+		try:
+			yield acquired
+		finally:
+			if acquired:
+				_unlock(f)
+
 def clear_session_cache() -> None:
 	"""Clears the stored session cache."""
 	if CACHE_FILE.exists():
@@ -97,11 +170,14 @@ def clear_session_cache() -> None:
 def restore_connection() -> GSConnection | None:
 	"""Restore Gradescope connection from cached session if available."""
 	
+	from gradescopeapi.classes.account import Account
+	from .session import new_connection
+
 	cookies = _get_stored_session_cookies()
 	if cookies is None:
 		return None
 	
-	connection = GSConnection()
+	connection = new_connection()
 	connection.session.cookies.update(cookies)
 
 	# try to retrieve courses to verify session validity
@@ -121,7 +197,9 @@ def restore_connection() -> GSConnection | None:
 
 def login_gradescope(email: str, password: str) -> GSConnection:
 	"""Login to Gradescope and return an authenticated session."""
-	connection = GSConnection()
+	from .session import new_connection
+
+	connection = new_connection()
 	connection.login(email, password)
 	
 	return connection
@@ -150,7 +228,11 @@ def write_to_current_assignment_file(course_name: str, course: str, assignment_n
 
 def retrieve_current_assignment() -> dict | None:
 	"""Retrieve the user's currently set assignment.
-	A dictionary containing the course id, assignment id, course name, assignment name, and files to submit if available."""
+	A dictionary containing the course id, assignment id, course name, assignment name, and files to submit if available.
+	A project's .gscli file (see project.py) takes precedence over the assignment set by gscli choose."""
+	project = load_project()
+	if project is not None:
+		return project
 	if not Path(CURRENT_ASSIGNMENT_FILE).exists():
 		return None
 	with open(CURRENT_ASSIGNMENT_FILE, "r") as f:
@@ -233,23 +315,27 @@ def fetch_submission_status(session: requests.Session, submission_link: str) ->
 	return response.json()
 
 
-def collect_file_objs(file_paths: list[str], recursive: bool) -> list:
+def collect_file_objs(file_paths: list[str], recursive: bool, ignore: list[str] | None = None) -> list:
 	"""Collect and open files in binary read mode.
 	
 	Args:
 		file_paths: List of file or directory paths. Hidden files are only included if explicitly named.
 		recursive: If True, recursively follow subdirectories
+		ignore: Glob patterns of files and directories to leave out of directories, matched against names and paths
 		
 	Returns:
 		List of file objects opened in binary read mode
 	"""
+	from fnmatch import fnmatch
+
 	file_paths = list(set(file_paths))  # remove duplicates
 	file_objs = []
+	ignore = [pattern.rstrip("/") for pattern in ignore or []]
 	
 
 	def should_skip(path: Path) -> bool:
 		"""Check if a path should be skipped (hidden or in skip list)."""
-		return path.name.startswith('.')
+		return path.name.startswith('.') or any(fnmatch(path.name, p) or fnmatch(path.as_posix(), p) for p in ignore)
 	
 	def collect_from_dir(dir_path: Path, is_recursive: bool) -> None:
 		"""Recursively collect files from a directory."""
@@ -281,3 +367,162 @@ def collect_file_objs(file_paths: list[str], recursive: bool) -> list:
 	return file_objs
 
 
+# Name of the zip uploaded by `gscli submit --archive`, and its default deflate level (0 stores files uncompressed)
+ARCHIVE_NAME = "submission.zip"
+ARCHIVE_COMPRESSION_LEVEL = 6
+
+# Timestamp of every archive member, so that the same files always give the same archive
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def build_archive(file_objs: list, compression_level: int = ARCHIVE_COMPRESSION_LEVEL) -> io.BytesIO:
+	"""Pack file objects into one zip, to upload as a single multipart part.
+
+	Members are named by their path relative to the deepest directory containing all
+	files and are written in sorted order with fixed timestamps and permissions, so the
+	archive only depends on the file names and contents. The archive is kept in memory
+	(the upload needs its length up front) and named ARCHIVE_NAME.
+
+	Each file is read whole before it is compressed, so packing briefly holds one file
+	next to the archive. Streaming members in chunks would need ZipFile.open(info, "w"),
+	which only takes the compression level from a private ZipInfo attribute before
+	Python 3.13; submissions are small enough that writestr's public API is preferred.
+	"""
+	import zipfile
+
+	paths = [Path(f.name).resolve() for f in file_objs]
+	base = Path(os.path.commonpath([p.parent for p in paths])) if paths else Path()
+	members = sorted({p.relative_to(base).as_posix(): f for p, f in zip(paths, file_objs)}.items())
+
+	compression = zipfile.ZIP_DEFLATED if compression_level > 0 else zipfile.ZIP_STORED
+	archive = io.BytesIO()
+	with zipfile.ZipFile(archive, "w", compression=compression, compresslevel=compression_level or None) as zf:
+		for name, f in members:
+			info = zipfile.ZipInfo(name, date_time=ARCHIVE_DATE_TIME)
+			info.external_attr = 0o644 << 16
+			zf.writestr(info, f.read(), compress_type=compression, compresslevel=compression_level or None)
+
+	archive.seek(0)
+	archive.name = ARCHIVE_NAME
+	return archive
+
+
+def parse_target_time(value: str) -> datetime:
+	"""Parse a submission time given as HH:MM, HH:MM:SS or an ISO 8601 datetime.
+
+	Times without a date refer to today. Returns a timezone-aware local datetime.
+	Raises ValueError if the time cannot be parsed or is already in the past.
+	"""
+	now = datetime.now().astimezone()
+	for fmt in ("%H:%M", "%H:%M:%S"):
+		try:
+			parsed = datetime.strptime(value, fmt)
+		except ValueError:
+			continue
+		target = now.replace(hour=parsed.hour, minute=parsed.minute, second=parsed.second, microsecond=0)
+		break
+	else:
+		try:
+			target = datetime.fromisoformat(value)
+		except ValueError:
+			raise ValueError(f"Could not understand time '{value}'. Use HH:MM, HH:MM:SS or an ISO 8601 datetime.")
+		if target.tzinfo is None:
+			target = target.astimezone()
+
+	if target <= now:
+		raise ValueError(f"{target:%Y-%m-%d %H:%M:%S} is in the past.")
+	return target
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+
+def parse_duration(value: str) -> float:
+	"""Parse a duration such as 90s, 30m, 48h, 7d or 2w into seconds. Raises ValueError."""
+	match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhdw])", value.strip().lower())
+	if match is None:
+		raise ValueError(f"Could not understand duration '{value}'. Use a number followed by s, m, h, d or w, like 48h.")
+	return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+def parse_past_time(value: str) -> datetime:
+	"""Parse how long ago (a duration like 7d) or since when (an ISO 8601 date or datetime) into an aware datetime."""
+	try:
+		return datetime.now().astimezone() - timedelta(seconds=parse_duration(value))
+	except ValueError:
+		pass
+	try:
+		when = datetime.fromisoformat(value)
+	except ValueError:
+		raise ValueError(f"Could not understand '{value}'. Use a duration like 7d or a date like 2025-10-01.")
+	return when.astimezone() if when.tzinfo is None else when
+
+
+class StagedUpload(NamedTuple):
+	"""An upload whose authenticity token and multipart body were prepared ahead of time."""
+	course_url: str
+	upload_url: str
+	request: requests.PreparedRequest
+
+
+def stage_upload(session: requests.Session, course_id: str, assignment_id: str, file_objs: list, leaderboard_name: str | None = None) -> StagedUpload:
+	"""Do all the work of gradescopeapi's upload_assignment except the final POST.
+
+	The course page is fetched for its CSRF token and the file contents are read and
+	encoded into the request body, so dispatching the upload later costs one request.
+	"""
+	import requests
+	from bs4 import BeautifulSoup
+
+	course_url = f"{GRADESCOPE_URL}/courses/{course_id}"
+	upload_url = f"{course_url}/assignments/{assignment_id}/submissions"
+
+	response = session.get(course_url)
+	response.raise_for_status()
+	token = BeautifulSoup(response.text, 'html.parser').find("meta", {"name": "csrf-token"})
+	if token is None:
+		raise RuntimeError(f"Could not find an authenticity token for course {course_id}")
+
+	fields = [
+		("utf8", "✓"),
+		("authenticity_token", token["content"]),
+		("submission[method]", "upload"),
+	]
+	if leaderboard_name is not None:
+		fields.append(("submission[leaderboard_name]", leaderboard_name))
+
+	form_files = [
+		("submission[files][]", (Path(f.name).name, f.read(), mimetypes.guess_type(f.name)[0]))
+		for f in file_objs
+	]
+
+	request = requests.Request("POST", upload_url, data=fields, files=form_files, headers={"Referer": course_url})
+	return StagedUpload(course_url, upload_url, session.prepare_request(request))
+
+
+def ping_gradescope(session: requests.Session) -> bool:
+	"""Make a cheap request to keep the connection alive. Returns whether the session is still logged in."""
+	response = session.head(f"{GRADESCOPE_URL}/account", allow_redirects=False)
+	return response.status_code == 200
+
+
+def dispatch_staged_upload(session: requests.Session, staged: StagedUpload) -> tuple[str | None, float]:
+	"""Send a staged upload.
+
+	Returns the submission link (None if Gradescope rejected the upload) and the
+	time in seconds between dispatching the request and Gradescope answering it.
+	"""
+	request = staged.request
+	# Cookies may have been refreshed by keep-alive pings since the upload was staged
+	request.headers.pop("Cookie", None)
+	request.prepare_cookies(session.cookies)
+	settings = session.merge_environment_settings(request.url, {}, None, None, None)
+
+	start = time.perf_counter()
+	response = session.send(request, allow_redirects=False, **settings)
+	latency = time.perf_counter() - start
+
+	# Same check as upload_assignment: a successful upload redirects to the submission page,
+	# an unsuccessful one back to the course page or the submissions form
+	location = urljoin(staged.upload_url, response.headers["Location"]) if response.is_redirect else staged.upload_url
+	if location == staged.course_url or location.endswith("submissions"):
+		return None, latency
+	return location, latency
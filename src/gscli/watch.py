@@ -0,0 +1,173 @@
+"""Scheduler behind `gscli status --watch`.
+
+All unfinished submissions are polled from one loop instead of one blocking loop per
+submission. Each submission is polled once per interval, with the first polls spread
+over the interval so requests don't arrive in bursts. Submissions whose polls fall due
+together are fetched as one concurrent batch, and a submission leaves the schedule as
+soon as it is processed, so the number of requests is proportional to the number of
+unfinished submissions.
+"""
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from .utils import get_submissions, fetch_submission_status, make_submission_link
+from .results import pending_entries, load_entry, new_entry, record_status, save_entry, submission_time, DETACHED_TIMEOUT
+from .index import deadlines_between
+from .timings import earliest_results
+
+# Pause between two polls of the same submission
+WATCH_INTERVAL = 3  # seconds
+
+# Most requests in flight at once, both while discovering and while polling
+BATCH_SIZE = 8
+
+# Course pages are searched for submissions if the course has a deadline after this long ago
+DISCOVERY_LOOKBACK = 7 * 24 * 60 * 60  # seconds
+
+
+def watched_courses(index: dict, now: float | None = None) -> list[str]:
+    """Courses in the local index with a deadline in the last week or still to come."""
+    now = time.time() if now is None else now
+    return sorted({course_id for _, _, course_id, _ in deadlines_between(index, now - DISCOVERY_LOOKBACK, float("inf"))})
+
+
+def _matches(entry: dict, course: str | None, assignment: str | None) -> bool:
+    return (course is None or entry["course"] == course) and (assignment is None or entry["assignment"] == assignment)
+
+
+def discover(session, index: dict, course: str | None = None, assignment: str | None = None,
+             on_error: Callable[[str], None] | None = None) -> list[dict]:
+    """Find every submission that isn't processed yet.
+
+    These are the pending entries of the results store, plus the latest submissions
+    listed on the pages of the watched courses (or only of course, if given) that the
+    store doesn't know to be processed or given up on. Those are fetched once,
+    concurrently, and saved to the store, so the next discovery skips the ones that
+    turned out to be finished. A course page or status that can't be fetched is left
+    out and reported to on_error, without affecting the others.
+    """
+    entries = {e["submission"]: e for e in pending_entries() if _matches(e, course, assignment)}
+    course_ids = [course] if course is not None else watched_courses(index)
+
+    def report(message: str) -> None:
+        if on_error is not None:
+            on_error(message)
+
+    def fetch_page(course_id: str) -> dict:
+        try:
+            return get_submissions(session, course_id)
+        except Exception as e:
+            report(f"Could not list the submissions of course {course_id}: {e}")
+            return {}
+
+    def fetch_status(entry: dict) -> dict | None:
+        try:
+            return fetch_submission_status(session, entry["link"])
+        except Exception as e:
+            report(f"Could not fetch the status of submission {entry['submission']}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=BATCH_SIZE) as executor:
+        pages = executor.map(fetch_page, course_ids)
+        unknown = []
+        for course_id, submissions in zip(course_ids, pages):
+            for assignment_id, submission_id in submissions.items():
+                if assignment is not None and assignment_id != assignment:
+                    continue
+                if submission_id in entries:
+                    continue
+                stored = load_entry(submission_id)
+                if stored is not None and (stored["status"] == "processed" or stored["gave_up"]):
+                    continue
+                unknown.append((stored or new_entry(course_id, assignment_id, make_submission_link(course_id, assignment_id, submission_id)),
+                                stored is None))
+
+        statuses = executor.map(lambda item: fetch_status(item[0]), unknown)
+        for (entry, is_new), status_json in zip(unknown, statuses):
+            if status_json is None:
+                continue
+            if is_new:
+                # made elsewhere, so it was submitted before it was discovered
+                entry["submitted_at"] = submission_time(status_json) or entry["submitted_at"]
+            # the user didn't ask about these, so don't announce them in `gscli notify`
+            record_status(entry, status_json, notified=True)
+            if status_json["status"] != "processed":
+                entries[entry["submission"]] = entry
+
+    return sorted(entries.values(), key=lambda e: e["submitted_at"])
+
+
+class PollScheduler:
+    """Polls a set of submissions until each is processed.
+
+    entries are result store entries; they're updated and saved as their status
+    changes. Submissions older than DETACHED_TIMEOUT are given up on, like the
+    detached poller does.
+    """
+
+    def __init__(self, session, entries: list[dict], interval: float = WATCH_INTERVAL, batch_size: int = BATCH_SIZE):
+        self.session = session
+        self.interval = interval
+        self.batch_size = batch_size
+        self.entries = {e["submission"]: e for e in entries}
+        self.requests = 0
+
+        # (time of next poll, submission id), first polls staggered over one interval,
+        # and no earlier than the assignment's results ever came
+        start = time.monotonic()
+        self._queue = []
+        for i, e in enumerate(entries):
+            too_early = earliest_results(e["course"], e["assignment"]) - (time.time() - e["submitted_at"])
+            self._queue.append((start + max(i * interval / len(entries), too_early), e["submission"]))
+        heapq.heapify(self._queue)
+
+    @property
+    def done(self) -> bool:
+        return not self._queue
+
+    def next_poll(self) -> float | None:
+        """The monotonic time of the next poll, or None if nothing is left to poll."""
+        return self._queue[0][0] if self._queue else None
+
+    def _due(self, now: float) -> list[dict]:
+        batch = []
+        while self._queue and self._queue[0][0] <= now and len(batch) < self.batch_size:
+            _, submission_id = heapq.heappop(self._queue)
+            batch.append(self.entries[submission_id])
+        return batch
+
+    def _poll(self, entry: dict) -> bool:
+        """Poll one submission. Returns whether a request was sent."""
+        if time.time() - entry["submitted_at"] > DETACHED_TIMEOUT:
+            entry["gave_up"] = True
+            save_entry(entry)
+            return False
+        try:
+            status_json = fetch_submission_status(self.session, entry["link"])
+        except Exception:
+            # transient errors are common under load; poll again next time
+            return True
+        if status_json["status"] != entry["status"] or status_json["status"] == "processed":
+            record_status(entry, status_json, notified=True)
+        return True
+
+    def step(self, executor: ThreadPoolExecutor, now: float | None = None) -> list[dict]:
+        """Poll every submission that is due as one batch, and return the entries polled."""
+        now = time.monotonic() if now is None else now
+        batch = self._due(now)
+        # counted here rather than in the pool's threads, so no increment is lost
+        self.requests += sum(executor.map(self._poll, batch))
+        for entry in batch:
+            if entry["status"] != "processed" and not entry["gave_up"]:
+                heapq.heappush(self._queue, (now + self.interval, entry["submission"]))
+        return batch
+
+    def run(self, on_update=None) -> None:
+        """Poll until every submission is processed or given up on, calling on_update after each batch."""
+        with ThreadPoolExecutor(max_workers=self.batch_size) as executor:
+            while not self.done:
+                time.sleep(max(0.0, self.next_poll() - time.monotonic()))
+                self.step(executor)
+                if on_update is not None:
+                    on_update()
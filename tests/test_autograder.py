@@ -0,0 +1,61 @@
+import json
+import sys
+
+from typer.testing import CliRunner
+
+from gscli import autograder
+from gscli.cli import app
+
+CORRECT_CALCULATOR_FILE_PATH = "tests/uploads/correct/calculator.py"
+
+# A Gradescope-style autograder: it reads the submission and writes results from /autograder paths
+RUN_AUTOGRADER = f"""#!/usr/bin/env bash
+cd /autograder/source
+{sys.executable} grade.py
+"""
+
+GRADE = """import json
+passed = "def lex" in open("/autograder/submission/calculator.py").read()
+tests = [{"name": "has lex", "status": "passed" if passed else "failed", "score": float(passed), "max_score": 1.0, "output": ""}]
+json.dump({"tests": tests}, open("/autograder/results/results.json", "w"))
+"""
+
+
+def make_bundle(directory, run_autograder=RUN_AUTOGRADER):
+    directory.mkdir(parents=True)
+    (directory / "run_autograder").write_text(run_autograder)
+    (directory / "grade.py").write_text(GRADE)
+    return directory
+
+
+def test_groups_run_in_isolated_workspaces(tmp_path):
+    bundle = tmp_path / "grader"
+    make_bundle(bundle / "public")
+    make_bundle(bundle / "slow", RUN_AUTOGRADER.replace("cd ", "sleep 30; cd "))
+
+    groups = autograder.find_groups(bundle)
+    runs = autograder.run_groups(groups, [CORRECT_CALCULATOR_FILE_PATH], timeout=2)
+
+    assert [run.name for run in runs] == ["public", "slow"]
+    assert runs[0].results["tests"][0]["status"] == "passed"
+    assert runs[1].error == "timed out after 2 seconds"
+    assert not any(run.workspace.exists() for run in runs)
+    # the bundle itself still mentions /autograder
+    assert "/autograder/source" in (bundle / "public" / "run_autograder").read_text()
+
+    results = autograder.merge_results(runs)
+    assert [(t["name"], t["status"]) for t in results["tests"]] == [
+        ("public: has lex", "passed"),
+        ("slow: timed out after 2 seconds", "failed"),
+    ]
+
+
+def test_cli_reports_local_results(tmp_path):
+    bundle = make_bundle(tmp_path / "grader")
+
+    result = CliRunner().invoke(app, ["test", str(bundle), "-f", CORRECT_CALCULATOR_FILE_PATH])
+
+    assert result.exit_code == 0
+    assert "has lex (1.0/1.0)" in result.output
+    assert "Score: 1.0/1.0" in result.output
+    assert "View your submission" not in result.output
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from gscli import cassette
+from gscli.session import GscliSession
+from gscli.utils import GRADESCOPE_URL
+
+LOGIN_URL = f"{GRADESCOPE_URL}/login?session%5Bemail%5D=student%40example.com&session%5Bpassword%5D=hunter2"
+
+
+def fake_send(self, request, **kwargs):
+    """Stand-in for the network: every response mentions the account, carries CSRF tokens and sets a cookie."""
+    fake_send.count += 1
+    body = (
+        '<meta name="csrf-token" content="csrf-secret">'
+        '<form action="/login"><input type="hidden" name="authenticity_token" value="form-secret"></form>'
+        f"<p>student@example.com #{fake_send.count}</p>"
+    )
+    raw = HTTPResponse(
+        body=io.BytesIO(body.encode()),
+        headers={"Content-Type": "text/html; charset=utf-8", "Set-Cookie": "signed_token=abc123; path=/"},
+        status=200,
+        preload_content=False,
+    )
+    return self.build_response(request, raw)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cassettes(monkeypatch):
+    fake_send.count = 0
+    monkeypatch.setattr(HTTPAdapter, "send", fake_send)
+    cassette.reset()
+    yield
+    cassette.reset()
+
+
+def record(tmp_path, monkeypatch, *urls):
+    monkeypatch.setenv(cassette.RECORD_ENV, str(tmp_path))
+    session = GscliSession()
+    for url in urls:
+        session.get(url)
+    monkeypatch.delenv(cassette.RECORD_ENV)
+    cassette.reset()
+
+
+def test_recording_scrubs_credentials(tmp_path, monkeypatch):
+    record(tmp_path, monkeypatch, LOGIN_URL)
+    recorded = (tmp_path / cassette.CASSETTE_NAME).read_text()
+    assert "student@example.com" not in recorded and "student%40example.com" not in recorded
+    assert "hunter2" not in recorded and "abc123" not in recorded
+    assert "signed_token=REDACTED" in recorded
+    assert "csrf-secret" not in recorded and "form-secret" not in recorded
+    assert 'content=\\"REDACTED\\"' in recorded and 'value=\\"REDACTED\\"' in recorded
+
+
+def test_replay_returns_recorded_responses_in_order(tmp_path, monkeypatch):
+    record(tmp_path, monkeypatch, f"{GRADESCOPE_URL}/account", f"{GRADESCOPE_URL}/account")
+    monkeypatch.setenv(cassette.REPLAY_ENV, str(tmp_path))
+    session = GscliSession()
+
+    assert session.rate_limiter is None
+    assert [session.get(f"{GRADESCOPE_URL}/account").text[-6:] for _ in range(3)] == ["#1</p>", "#2</p>", "#2</p>"]
+    assert fake_send.count == 2
+    with pytest.raises(cassette.ReplayError):
+        session.get(f"{GRADESCOPE_URL}/courses")
+
+
+def test_replayed_login_matches_whatever_credentials(tmp_path, monkeypatch):
+    record(tmp_path, monkeypatch, LOGIN_URL)
+    monkeypatch.setenv(cassette.REPLAY_ENV, str(tmp_path))
+    other_login = LOGIN_URL.replace("hunter2", "something-else")
+    assert GscliSession().get(other_login).status_code == 200
+    assert isinstance(cassette.ReplayError("x"), requests.ConnectionError)
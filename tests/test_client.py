@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from gscli import client as client_module
+from gscli import Client, SubmissionError
+
+LINK = "https://www.gradescope.com/courses/1197898/assignments/7308477/submissions/42"
+
+PROCESSED = {
+    "status": "processed",
+    "results": {"tests": [{"name": "add", "status": "passed", "output": None, "score": 1.0, "max_score": 1.0}]},
+}
+
+
+@pytest.fixture
+def statuses(monkeypatch):
+    """Make the submission at LINK report these statuses, one per poll."""
+    queue = [{"status": "unprocessed"}, {"status": "autograder_task_started"}, PROCESSED]
+    monkeypatch.setattr(client_module, "fetch_submission_status", lambda session, link: queue.pop(0))
+    return queue
+
+
+def make_client():
+    return Client(SimpleNamespace(session=None))
+
+
+def test_wait_for_results(statuses):
+    seen = []
+    status = make_client().wait_for_results(LINK, poll_interval=0, on_status=lambda s: seen.append(s.status))
+    assert seen == ["unprocessed", "autograder_task_started", "processed"]
+    assert status.processed
+    assert status.results[0].name == "add"
+    assert status.link == LINK
+
+
+def test_wait_for_results_timeout(statuses):
+    status = make_client().wait_for_results(LINK, timeout=0, poll_interval=0)
+    assert not status.processed
+    assert status.results is None
+
+
+def test_wait_for_results_async(statuses):
+    status = asyncio.run(make_client().wait_for_results_async(LINK, poll_interval=0))
+    assert status.processed
+
+
+def test_every_blocking_method_has_an_async_variant():
+    import inspect
+
+    local = {"save_session", "connection_stats", "close"}
+    blocking = [
+        name for name, member in vars(Client).items()
+        if inspect.isfunction(member) and not name.startswith("_") and not name.endswith("_async") and name not in local
+    ]
+    assert blocking
+    for name in blocking:
+        variant = getattr(Client, f"{name}_async", None)
+        assert inspect.iscoroutinefunction(variant), name
+        # variants take the same arguments, so callers can switch without losing options
+        assert list(inspect.signature(variant).parameters) == list(inspect.signature(getattr(Client, name)).parameters), name
+
+
+def test_submit_without_files():
+    with pytest.raises(SubmissionError):
+        make_client().submit("1197898", "7308477", [])
@@ -0,0 +1,82 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+import typer
+
+from gscli import index, completion
+
+
+@pytest.fixture
+def local_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(index, "INDEX_FILE", tmp_path / "index.json")
+
+    now = datetime.now(timezone.utc)
+    course_list = {
+        "1197898": SimpleNamespace(name="Python", semester="Fall", year="2025"),
+        "2000000": SimpleNamespace(name="Systems", semester="Fall", year="2025"),
+    }
+    assignments = [
+        SimpleNamespace(
+            assignment_id=str(7000000 + i),
+            name=f"Homework {i}",
+            release_date=now - timedelta(days=30),
+            due_date=now + timedelta(days=i - 250, hours=1),
+            late_due_date=None,
+            grade=None,
+            max_grade=None,
+        )
+        for i in range(500)
+    ]
+
+    data = index.load_index()
+    index.index_courses(data, course_list)
+    index.index_assignments(data, "1197898", assignments)
+    index.save_index(data)
+
+
+def test_complete_course(local_index):
+    assert [c for c, _ in completion.complete_course("")] == ["1197898", "2000000"]
+    assert completion.complete_course("2") == [("2000000", "Systems (Fall 2025)")]
+
+
+def test_complete_assignment_upcoming_first(local_index):
+    ctx = SimpleNamespace(params={"course": "1197898"})
+    matches = completion.complete_assignment(ctx, "")
+    assert len(matches) == 500
+    # Homework 250 is due the soonest
+    assert matches[0][0] == "7000250"
+    assert matches[0][1].startswith("Homework 250 (due ")
+
+    assert [a for a, _ in completion.complete_assignment(ctx, "700049")] == [
+        str(a) for a in range(7000490, 7000500)
+    ]
+
+
+def test_completion_answers_from_one_index_read(local_index, monkeypatch):
+    reads = []
+    load_index = completion.load_index
+    monkeypatch.setattr(completion, "load_index", lambda: reads.append(1) or load_index())
+    monkeypatch.setattr(completion, "retrieve_current_assignment", lambda: pytest.fail("read the current assignment"))
+    ctx = SimpleNamespace(params={"course": "1197898"})
+
+    completion.complete_course("")
+    matches = completion.complete_assignment(ctx, "70001")
+
+    assert len(reads) == 2
+    # only the assignments matching the prefix are ranked
+    assert sorted(a for a, _ in matches) == [str(a) for a in range(7000100, 7000200)]
+
+
+def test_completion_does_not_import_network_libraries():
+    code = "import sys, gscli.cli; print(any(m in sys.modules for m in ('requests', 'gradescopeapi')))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_cli_does_not_import_slow_standard_modules():
+    code = "import sys, gscli.cli; print(any(m in sys.modules for m in ('multiprocessing', 'html.parser')))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+
+import pytest
+from typer.testing import CliRunner
+
+import gscli.gscli as commands
+from gscli import diff, results, utils
+from gscli.cli import app
+from gscli.client import SubmissionStatus
+from gscli.utils import TestCaseResult as Case, parse_results_json
+
+LINK = "https://www.gradescope.com/courses/1197898/assignments/7308477/submissions/{}"
+
+
+def results_json(*tests):
+    return {"tests": [
+        {"name": name, "status": "passed" if score == 1 else "failed", "output": "", "score": float(score), "max_score": 1.0}
+        for name, score in tests
+    ]}
+
+
+@pytest.fixture(autouse=True)
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "RESULTS_DIR", tmp_path)
+
+
+def store(submission_id, submitted_at, *tests):
+    entry = results.new_entry("1197898", "7308477", LINK.format(submission_id))
+    entry["submitted_at"] = submitted_at
+    results.record_status(entry, {"status": "processed", "results": results_json(*tests)}, notified=True)
+    return entry
+
+
+def test_diff_results_aligns_by_name():
+    old = [Case(True, "add", "", 1, 1), Case(False, "div", "", 0, 1), Case(True, "dup", "", 1, 1), Case(True, "dup", "", 1, 1), Case(True, "gone", "", 1, 1)]
+    new = [Case(True, "div", "", 1, 1), Case(True, "add", "", 1, 1), Case(True, "dup", "", 1, 1), Case(False, "dup", "", 0, 1), Case(True, "mul", "", 1, 1)]
+
+    changes = diff.diff_results(old, new)
+
+    assert [(c.name, c.before is None, c.after is None) for c in changes] == [
+        ("div", False, False), ("dup", False, False), ("mul", True, False), ("gone", False, True),
+    ]
+    assert changes[1].before.passed and not changes[1].after.passed
+
+
+def test_previous_entry():
+    first = store("1", 100, ("add", 0))
+    store("2", 200, ("add", 1))
+    third = results.new_entry("1197898", "7308477", LINK.format(3))
+    third["submitted_at"] = 300
+    results.save_entry(third)  # not processed yet
+
+    assert diff.previous_entry(results.load_entry("2"))["submission"] == "1"
+    assert diff.previous_entry(third)["submission"] == "2"
+    assert diff.previous_entry(first) is None
+
+
+def test_diff_command_reads_cached_results():
+    store("1", 100, ("add", 0), ("sub", 1))
+    store("2", 200, ("add", 1), ("sub", 1))
+    store("3", 300, ("add", 1), ("sub", 0))
+
+    result = CliRunner().invoke(app, ["diff", "1", "3"])
+    assert result.exit_code == 0
+    assert "add: 0.0/1.0 -> 1.0/1.0" in result.stdout
+    assert "sub: 1.0/1.0 -> 0.0/1.0" in result.stdout
+
+    result = CliRunner().invoke(app, ["diff", "2"])
+    assert result.exit_code == 0
+    assert "Changes since submission 1" in result.stdout
+    assert "~ sub" not in result.stdout
+    assert "Score: 1/2 -> 2/2" in result.stdout
+
+
+def test_diff_of_an_older_submission_fetched_on_demand(monkeypatch):
+    store("100", 100, ("t", 0))
+    store("300", 300, ("t", 0))
+    utils.write_to_current_assignment_file("Python", "1197898", "Calculator", "7308477")
+
+    class FakeClient:
+        def submission_status(self, link):
+            status_json = {"status": "processed", "results": results_json(("t", 1)),
+                           "created_at": datetime.fromtimestamp(200, timezone.utc).isoformat()}
+            return SubmissionStatus(link, "processed", parse_results_json(status_json["results"]), status_json)
+
+        def save_session(self):
+            pass
+
+    monkeypatch.setattr(commands.Client, "restore", classmethod(lambda cls: FakeClient()))
+
+    result = CliRunner().invoke(app, ["diff", "200"])
+
+    assert result.exit_code == 0
+    # 200 was made between the stored submissions, not after them
+    assert results.load_entry("200")["submitted_at"] == 200
+    assert "Changes since submission 100" in result.stdout
+    assert "t: 0.0/1.0 -> 1.0/1.0" in result.stdout
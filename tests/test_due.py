@@ -0,0 +1,73 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from typer.testing import CliRunner
+
+from gscli import index
+from gscli.cli import app
+
+NOW = datetime.now(timezone.utc)
+COURSE_LIST = {
+    "1": SimpleNamespace(name="Python", semester="Fall", year="2025"),
+    "2": SimpleNamespace(name="Systems", semester="Fall", year="2025"),
+}
+
+
+def assignment(assignment_id, name, due_in_hours, late_due_in_hours=None):
+    return SimpleNamespace(
+        assignment_id=assignment_id,
+        name=name,
+        release_date=NOW - timedelta(days=7),
+        due_date=NOW + timedelta(hours=due_in_hours),
+        late_due_date=NOW + timedelta(hours=late_due_in_hours) if late_due_in_hours is not None else None,
+        grade=None,
+        max_grade=None,
+    )
+
+
+@pytest.fixture
+def local_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(index, "INDEX_FILE", tmp_path / "index.json")
+    data = index.load_index()
+    index.index_courses(data, COURSE_LIST)
+    index.index_assignments(data, "1", [assignment("10", "Homework 1", 5), assignment("11", "Homework 2", 100)])
+    index.index_assignments(data, "2", [assignment("20", "Malloc Lab", -2, late_due_in_hours=20)])
+    return data
+
+
+def test_deadlines_are_sorted(local_index):
+    assert [(kind, a) for _, kind, _, a in local_index["deadlines"]] == [
+        ("due", "20"), ("due", "10"), ("late_due", "20"), ("due", "11"),
+    ]
+
+
+def test_reindexing_a_course_only_replaces_its_deadlines(local_index):
+    index.index_assignments(local_index, "1", [assignment("12", "Homework 3", 1)])
+    assert [a for _, _, _, a in local_index["deadlines"]] == ["20", "12", "20"]
+
+    index.index_courses(local_index, {"1": COURSE_LIST["1"]})
+    assert [a for _, _, _, a in local_index["deadlines"]] == ["12"]
+
+
+def test_deadlines_between(local_index):
+    now = time.time()
+    assert [a for _, _, _, a in index.deadlines_between(local_index, now, now + 48 * 3600)] == ["10", "20"]
+    assert index.deadlines_between(local_index, now + 200 * 3600, now + 300 * 3600) == []
+
+
+def test_version_1_index_is_migrated(local_index):
+    index.INDEX_FILE.write_text(json.dumps({"version": 1, "courses": local_index["courses"]}))
+    assert index.load_index()["deadlines"] == local_index["deadlines"]
+
+
+def test_due_command_answers_offline(local_index):
+    index.save_index(local_index)
+    result = CliRunner().invoke(app, ["due", "--within", "48h"])
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert "Python / Homework 1" in lines[0]
+    assert "Systems / Malloc Lab (late submissions)" in lines[1]
+    assert "Homework 2" not in result.stdout
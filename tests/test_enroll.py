@@ -0,0 +1,97 @@
+import threading
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from typer.testing import CliRunner
+
+import gscli.gscli as commands
+from gscli import enroll, index
+from gscli.cli import app
+from gscli.utils import GRADESCOPE_URL
+
+# entry codes and the courses they lead to
+CODES = {"ABC123": "1", "DEF456": "2"}
+
+
+class FakeAccount(BaseAdapter):
+    """Serves the account page and enrolls with the known entry codes."""
+
+    def __init__(self, enrolled):
+        super().__init__()
+        self.enrolled = enrolled
+        self.posted = []
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.request = request
+        response.status_code = 200
+        response.url = request.url
+        body = '<meta name="csrf-token" content="token">'
+        if request.url == enroll.ENROLL_URL:
+            form = parse_qs(request.body)
+            assert form["authenticity_token"] == ["token"]
+            code = form["course[entry_code]"][0]
+            with self.lock:
+                self.posted.append(code)
+            if code in CODES:
+                self.enrolled.add(CODES[code])
+                response.url = f"{GRADESCOPE_URL}/courses/{CODES[code]}"
+            else:
+                response.url = f"{GRADESCOPE_URL}/account"
+                body = '<div class="alert alert-error">Invalid entry code.</div>'
+        response._content = body.encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self):
+        self.enrolled = {"2"}
+        self.adapter = FakeAccount(self.enrolled)
+        self.session = requests.Session()
+        self.session.mount(GRADESCOPE_URL, self.adapter)
+        self.listed = 0
+
+    def list_courses(self):
+        self.listed += 1
+        return {c: SimpleNamespace(name=f"Course {c}", semester="Fall", year="2025") for c in self.enrolled}
+
+    def save_session(self):
+        pass
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    monkeypatch.setattr(index, "INDEX_FILE", tmp_path / "index.json")
+    fake = FakeClient()
+    monkeypatch.setattr(commands.Client, "restore", classmethod(lambda cls: fake))
+    return fake
+
+
+def test_join_codes_from_arguments_and_file(fake, tmp_path):
+    codes = tmp_path / "codes.txt"
+    codes.write_text("# section codes\ndef456\n\nNOPE00\n")
+
+    result = CliRunner().invoke(app, ["join", "ABC123", "--from-file", str(codes)])
+
+    assert result.exit_code == 1
+    assert "ABC123: joined 1 - Course 1" in result.output
+    assert "DEF456: already enrolled in 2 - Course 2" in result.output
+    assert "NOPE00: Invalid entry code." in result.output
+    # the course list is fetched before and once after all the codes
+    assert fake.listed == 2
+    assert set(index.load_index()["courses"]) == {"1", "2"}
+
+    # codes that led to a course the user is in aren't sent again
+    fake.adapter.posted.clear()
+    result = CliRunner().invoke(app, ["join", "ABC123", "DEF456"])
+
+    assert result.exit_code == 0
+    assert fake.adapter.posted == []
+    assert fake.listed == 3
@@ -0,0 +1,103 @@
+import io
+import json
+import threading
+
+import requests
+from requests.adapters import BaseAdapter
+
+from gscli import export
+from gscli.utils import GRADESCOPE_URL
+
+COURSE_ID = "1197898"
+ASSIGNMENT_ID = "7308477"
+STORAGE_URL = "https://storage.example.com"
+SUBMISSIONS = ["101", "102", "103"]
+
+
+class FakeInstructorView(BaseAdapter):
+    """Serves an assignment's review grades page, submission file lists, files and results."""
+
+    def __init__(self, broken=(), pdf_only=(), unlisted=()):
+        super().__init__()
+        self.broken = set(broken)
+        self.pdf_only = set(pdf_only)
+        self.unlisted = set(unlisted)
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.sent.append(request.url)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        path = request.url.split("?")[0]
+        if path.endswith("/review_grades"):
+            rows = "".join(
+                f'<tr><td class="table--primaryLink"><a href="/courses/{COURSE_ID}/assignments/{ASSIGNMENT_ID}/submissions/{s}">s</a></td></tr>'
+                for s in SUBMISSIONS
+            )
+            body = f"<table>{rows}</table>".encode()
+        elif path.endswith(".json"):
+            submission_id = path.rsplit("/", 1)[-1].removesuffix(".json")
+            files = [{"file": {"url": f"{STORAGE_URL}/{submission_id}/calculator.py?signature=x"}}]
+            if submission_id in self.pdf_only:
+                files = []
+            if submission_id in self.unlisted:
+                response.status_code = 404
+            body = json.dumps({"text_files": files}).encode()
+        elif path.startswith(STORAGE_URL):
+            submission_id = path.split("/")[-2]
+            if submission_id in self.broken:
+                response.status_code = 500
+            body = f"# submission {submission_id}\n".encode()
+        else:
+            body = json.dumps({"status": "processed", "results": {"score": 1.0}}).encode()
+        response.raw = io.BytesIO(body)
+        return response
+
+    def close(self):
+        pass
+
+
+def make_session(adapter):
+    session = requests.Session()
+    session.mount(GRADESCOPE_URL, adapter)
+    session.mount(STORAGE_URL, adapter)
+    return session
+
+
+def test_export_resumes_after_failures(tmp_path):
+    adapter = FakeInstructorView(broken={"102"})
+    exported, skipped, failed = export.export_assignment(make_session(adapter), COURSE_ID, ASSIGNMENT_ID, tmp_path, workers=2)
+
+    assert (exported, skipped, list(failed)) == (2, 0, ["102"])
+    assert (tmp_path / "101" / "calculator.py").read_text() == "# submission 101\n"
+    assert json.loads((tmp_path / "103" / "results.json").read_text()) == {"score": 1.0}
+    assert not list(tmp_path.glob("*/*.part"))
+
+    # the rerun only fetches the submission that failed
+    adapter = FakeInstructorView()
+    exported, skipped, failed = export.export_assignment(make_session(adapter), COURSE_ID, ASSIGNMENT_ID, tmp_path)
+
+    assert (exported, skipped, failed) == (1, 2, {})
+    assert not any("/101" in url or "/103" in url for url in adapter.sent)
+    assert export.load_checkpoint(tmp_path, COURSE_ID, ASSIGNMENT_ID) == set(SUBMISSIONS)
+    assert export.load_checkpoint(tmp_path, COURSE_ID, "1") == set()
+
+
+def test_submissions_without_code_files_are_reported_clearly(tmp_path):
+    adapter = FakeInstructorView(pdf_only={"101"}, unlisted={"102"})
+    exported, skipped, failed = export.export_assignment(make_session(adapter), COURSE_ID, ASSIGNMENT_ID, tmp_path)
+
+    assert exported == 1
+    assert isinstance(failed["101"], export.NoCodeFilesError)
+    assert str(failed["101"]) == "submission 101 has no downloadable code files"
+    assert str(failed["102"]) == "could not fetch the file list of submission 102"
+    assert not (tmp_path / "101").exists()
+
+
+def test_file_names():
+    urls = [f"{STORAGE_URL}/1/a%20b.py?x=1", f"{STORAGE_URL}/2/a%20b.py", f"{STORAGE_URL}/"]
+    assert export.file_names(urls) == ["a b.py", "1_a b.py", "file"]
@@ -0,0 +1,144 @@
+import threading
+from datetime import datetime
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from gradescopeapi.classes import extensions as gs_extensions
+from gradescopeapi.classes.account import Account
+from gradescopeapi.classes.extensions import Extension
+from gradescopeapi.classes.member import Member
+
+from gscli import extensions
+from gscli.utils import GRADESCOPE_URL
+
+COURSE_ID = "1197898"
+
+
+def member(email, user_id):
+    return Member(full_name=email, first_name="", last_name="", sid="", email=email, role="Student",
+                  user_id=user_id, num_submissions=0, sections="", course_id=COURSE_ID)
+
+
+class AccountPage(BaseAdapter):
+    """Serves the account page the CSRF token is read from."""
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        response._content = b'<meta name="csrf-token" content="token">'
+        return response
+
+    def close(self):
+        pass
+
+
+def restored_session():
+    """A session like Client.restore() makes: cookies, but no CSRF header."""
+    session = requests.Session()
+    session.mount(GRADESCOPE_URL, AccountPage())
+    return session
+
+
+class FakeCourse:
+    """Stands in for Gradescope's roster and extensions pages."""
+
+    def __init__(self, failures=0):
+        self.extensions = {}
+        self.failures = failures
+        self.updates = []
+        self.lock = threading.Lock()
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(Account, "get_course_users", lambda account, course_id: [member("ada@example.com", "11"), member("bob@example.com", "12")])
+        monkeypatch.setattr(gs_extensions, "get_extensions", lambda session, course_id, assignment_id: dict(self.extensions.get(assignment_id, {})))
+        monkeypatch.setattr(gs_extensions, "update_student_extension", self.update)
+        monkeypatch.setattr(extensions, "RETRY_DELAY", 0)
+
+    def update(self, session, course_id, assignment_id, user_id, release_date, due_date, late_due_date):
+        # Gradescope rejects the JSON post without it
+        assert session.headers.get("X-CSRF-Token") == "token"
+        with self.lock:
+            self.updates.append((assignment_id, user_id))
+            if self.failures:
+                self.failures -= 1
+                return False
+            self.extensions.setdefault(assignment_id, {})[user_id] = Extension(user_id, release_date, due_date, late_due_date, "")
+        return True
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "extensions.csv"
+    path.write_text(text)
+    return path
+
+
+def test_read_extensions_reports_every_problem(tmp_path):
+    path = write_csv(tmp_path, (
+        "assignment,student,release,due,late_due\n"
+        "7308477,ada@example.com,,2025-10-03 23:59,2025-10-05 23:59\n"
+        "calc,,,,\n"
+        "7308477,bob@example.com,,2025-10-05 23:59,2025-10-03 23:59\n"
+        "7308477,ada@example.com,,tomorrow,\n"
+    ))
+
+    with pytest.raises(extensions.ExtensionsFileError) as raised:
+        extensions.read_extensions(path)
+
+    assert raised.value.problems == [
+        "line 3: assignment must be an id, not 'calc'",
+        "line 3: student is empty",
+        "line 3: no dates given",
+        "line 4: dates must be in order: release <= due <= late_due",
+        "line 5: due: could not understand date 'tomorrow', use ISO 8601 like 2025-10-03 23:59",
+    ]
+
+
+def test_apply_extensions_retries_and_skips_applied_rows(tmp_path, monkeypatch):
+    course = FakeCourse(failures=1)
+    course.install(monkeypatch)
+    rows = extensions.read_extensions(write_csv(tmp_path, (
+        "assignment,student,due\n"
+        "7308477,ada@example.com,2025-10-03 23:59\n"
+        "7308477,12,2025-10-04 23:59\n"
+        "7308478,bob@example.com,2025-10-04 23:59\n"
+    )))
+
+    results = extensions.apply_extensions(restored_session(), COURSE_ID, rows, workers=1)
+
+    assert [(r.row.line, r.row.student, r.outcome) for r in results] == [(2, "11", "applied"), (3, "12", "applied"), (4, "12", "applied")]
+    assert len(course.updates) == 4
+    assert course.extensions["7308477"]["11"].due_date == datetime.fromisoformat("2025-10-03 23:59").astimezone()
+
+    # a rerun changes nothing
+    course.updates.clear()
+    results = extensions.apply_extensions(restored_session(), COURSE_ID, rows)
+
+    assert [r.outcome for r in results] == ["skipped"] * 3
+    assert course.updates == []
+
+
+def test_apply_extensions_checks_students_before_applying(tmp_path, monkeypatch):
+    course = FakeCourse()
+    course.install(monkeypatch)
+    rows = extensions.read_extensions(write_csv(tmp_path, (
+        "assignment,student,due\n"
+        "7308477,ada@example.com,2025-10-03 23:59\n"
+        "7308477,eve@example.com,2025-10-03 23:59\n"
+        "7308477,11,2025-10-04 23:59\n"
+        "7308478,11,2025-10-04 23:59\n"
+        "7308477,ADA@example.com,2025-10-05 23:59\n"
+    )))
+
+    with pytest.raises(extensions.ExtensionsFileError) as raised:
+        extensions.apply_extensions(restored_session(), COURSE_ID, rows)
+
+    # ada@example.com is user 11, so lines 4 and 6 repeat line 2
+    assert raised.value.problems == [
+        f"line 3: eve@example.com is not a student of course {COURSE_ID}",
+        "line 4: same student and assignment as line 2",
+        "line 6: same student and assignment as line 2",
+    ]
+    assert course.updates == []
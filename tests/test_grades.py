@@ -0,0 +1,52 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from typer.testing import CliRunner
+
+from gscli import grades
+from gscli.cli import app
+
+COURSE_LIST = {"1197898": SimpleNamespace(name="Python")}
+
+
+def make_assignments(*grades_):
+    return [
+        SimpleNamespace(assignment_id=str(100 + i), name=f"Homework {i}", grade=grade, max_grade=max_grade)
+        for i, (grade, max_grade) in enumerate(grades_)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def grades_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(grades, "GRADES_FILE", tmp_path / "grades.json")
+
+
+def test_take_snapshot_ignores_ungraded_assignments():
+    snapshot = grades.take_snapshot(COURSE_LIST, {"1197898": make_assignments(("8.0", "10.0"), (None, "5.0"), ("", ""))})
+    course = snapshot["courses"]["1197898"]
+    assert (course["earned"], course["possible"]) == (8.0, 10.0)
+    assert list(course["assignments"]) == ["100"]
+
+
+def test_changed_assignments():
+    old = grades.take_snapshot(COURSE_LIST, {"1197898": make_assignments(("8.0", "10.0"), (None, "5.0"))})
+    new = grades.take_snapshot(COURSE_LIST, {"1197898": make_assignments(("9.0", "10.0"), ("5.0", "5.0"))})
+    changes = grades.changed_assignments(old, new)
+    assert [(a, before is None) for _, a, before, _ in changes] == [("100", False), ("101", True)]
+
+
+def test_grades_since_from_cache():
+    old = grades.take_snapshot(COURSE_LIST, {"1197898": make_assignments(("8.0", "10.0"))})
+    old["taken_at"] = time.time() - 3 * 24 * 60 * 60
+    grades.save_snapshot(old)
+    grades.save_snapshot(grades.take_snapshot(COURSE_LIST, {"1197898": make_assignments(("9.0", "10.0"), ("5.0", "5.0"))}))
+
+    result = CliRunner().invoke(app, ["grades", "--since", "2d"])
+
+    assert result.exit_code == 0
+    assert "Run with --refresh" in result.stdout
+    assert "14/15" in result.stdout
+    assert "+6/+5" in result.stdout
+    assert "Homework 0: 9/10 (was 8/10)" in result.stdout
+    assert "Homework 1: 5/5 (new)" in result.stdout
@@ -0,0 +1,99 @@
+import io
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.utils import get_encoding_from_headers
+
+from gscli import leaderboard
+from gscli.utils import GRADESCOPE_URL
+
+COURSE_ID = "1197898"
+ASSIGNMENT_ID = "7308477"
+
+
+def page(rows):
+    body = "".join(f"<tr><td>{rank}</td><td>{name}</td><td>{score}</td></tr>" for rank, name, score in rows)
+    return (
+        "<html><body><table class='nav'><tr><td>menu</td></tr></table>"
+        "<div><table class='table leaderboardTable'>"
+        "<thead><tr><th>Rank</th><th>Submission Name</th><th>Score</th></tr></thead>"
+        f"<tbody>{body}</tbody></table></div>"
+        "<footer>" + "x" * 100000 + "</footer></body></html>"
+    )
+
+
+class FakeLeaderboard(BaseAdapter):
+    """Serves a leaderboard page with an ETag, answering 304 when it's unchanged."""
+
+    def __init__(self, rows, content_type="text/html; charset=utf-8"):
+        super().__init__()
+        self.rows = rows
+        self.content_type = content_type
+        self.statuses = []
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        html = page(self.rows)
+        etag = f'W/"{hash(html)}"'
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response.raw = io.BytesIO(b"")
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = etag
+            response.headers["Content-Type"] = self.content_type
+            response.encoding = get_encoding_from_headers(response.headers)  # as HTTPAdapter does
+            response.raw = io.BytesIO(html.encode())
+        self.statuses.append(response.status_code)
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaderboard, "LEADERBOARD_DIR", tmp_path)
+
+
+def test_parser_stops_after_the_table():
+    html = page([(1, "Ada &amp; Bob", "10.0")])
+    chunks = [html[i:i + 50] for i in range(0, len(html), 50)]
+    consumed = []
+
+    headers, rows = leaderboard.parse_leaderboard(consumed.append(c) or c for c in chunks)
+
+    assert headers == ["Rank", "Submission Name", "Score"]
+    assert rows == [["1", "Ada & Bob", "10.0"]]
+    assert len(consumed) < len(chunks) / 10
+
+
+def test_refresh_is_conditional_and_reports_changed_rows():
+    adapter = FakeLeaderboard([(1, "ada", "10.0"), (2, "bob", "8.0")])
+    session = requests.Session()
+    session.mount(GRADESCOPE_URL, adapter)
+
+    board, changed = leaderboard.refresh_leaderboard(session, COURSE_ID, ASSIGNMENT_ID)
+    assert board["rows"] == [["1", "ada", "10.0"], ["2", "bob", "8.0"]]
+    assert changed == set()
+
+    board, changed = leaderboard.refresh_leaderboard(session, COURSE_ID, ASSIGNMENT_ID)
+    assert adapter.statuses == [200, 304]
+    assert changed == set()
+
+    adapter.rows = [(1, "bob", "12.0"), (2, "ada", "10.0")]
+    board, changed = leaderboard.refresh_leaderboard(session, COURSE_ID, ASSIGNMENT_ID)
+    assert changed == {"ada", "bob"}
+    assert leaderboard.load_cached_leaderboard(COURSE_ID, ASSIGNMENT_ID)["rows"] == board["rows"]
+
+
+def test_page_without_a_charset_is_read_as_utf8():
+    adapter = FakeLeaderboard([(1, "Zoë Ångström", "10.0")], content_type="text/html")
+    session = requests.Session()
+    session.mount(GRADESCOPE_URL, adapter)
+
+    board, _ = leaderboard.refresh_leaderboard(session, COURSE_ID, ASSIGNMENT_ID)
+    assert board["rows"] == [["1", "Zoë Ångström", "10.0"]]
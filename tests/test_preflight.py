@@ -0,0 +1,56 @@
+import json
+import sys
+
+from typer.testing import CliRunner
+
+import gscli.gscli as commands
+from gscli import preflight, project
+from gscli.cli import app
+
+CORRECT_CALCULATOR_FILE_PATH = "tests/uploads/correct/calculator.py"
+INCORRECT_CALCULATOR_FILE_PATH = "tests/uploads/off_by_1/calculator.py"
+
+
+def test_preflight_catches_trivial_mistakes(tmp_path):
+    broken = tmp_path / "broken.py"
+    broken.write_text("def add(a, b)\n    return a + b\n")
+    big = tmp_path / "data.bin"
+    big.write_bytes(b"0" * 64 * 1024)
+    checks = [f"{sys.executable} -c 'import sys; print(\"2 tests failed\"); sys.exit(1)'", f"{sys.executable} -c 'pass'"]
+
+    failures = preflight.run_preflight(
+        [CORRECT_CALCULATOR_FILE_PATH, INCORRECT_CALCULATOR_FILE_PATH, str(broken), str(big)],
+        {"required": ["calculator.py", "README.md"], "max_file_size": 32 * 1024, "checks": checks},
+    )
+
+    assert sorted((f.check, f.path) for f in failures if f.check != checks[0]) == [
+        ("duplicate", CORRECT_CALCULATOR_FILE_PATH),
+        ("duplicate", INCORRECT_CALCULATOR_FILE_PATH),
+        ("required", None),
+        ("size", str(big)),
+        ("syntax", str(broken)),
+    ]
+    assert [f.message for f in failures if f.check == checks[0]] == ["exited with status 1\n2 tests failed"]
+
+    # an archive keeps the paths, so the two calculators don't clash there
+    assert preflight.run_preflight([CORRECT_CALCULATOR_FILE_PATH, INCORRECT_CALCULATOR_FILE_PATH], archive=True) == []
+
+
+def test_failed_preflight_aborts_before_logging_in(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "calculator.py").write_text("print(\n")
+    (tmp_path / project.PROJECT_FILE_NAME).write_text(json.dumps({"course": "1", "assignment": "2", "files": ["calculator.py"]}))
+    project._find_from.cache_clear()
+
+    def restore(cls):
+        raise AssertionError("logged in despite failed checks")
+
+    monkeypatch.setattr(commands.Client, "restore", classmethod(restore))
+    try:
+        result = CliRunner().invoke(app, ["submit", "-c", "1", "-a", "2"])
+    finally:
+        project._find_from.cache_clear()
+
+    assert result.exit_code == 1
+    assert "Pre-flight checks failed, nothing was uploaded" in result.output
+    assert "line 1: '(' was never closed" in result.output
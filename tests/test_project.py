@@ -0,0 +1,115 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from typer.testing import CliRunner
+
+import gscli.gscli as commands
+from gscli import project, utils
+from gscli.cli import app
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "CURRENT_ASSIGNMENT_FILE", tmp_path / "current_assignment")
+    root = tmp_path / "calculator"
+    (root / "src" / "__pycache__").mkdir(parents=True)
+    (root / "src" / "calculator.py").write_text("")
+    (root / "src" / "__pycache__" / "calculator.cpython-311.pyc").write_text("")
+    (root / "notes.txt").write_text("")
+    project.write_project_file(root, "Python", "1197898", "Calculator", "7308477")
+    yield root
+    project._find_from.cache_clear()
+
+
+def test_project_file_is_found_from_subdirectories(project_dir, monkeypatch):
+    monkeypatch.chdir(project_dir / "src" / "__pycache__")
+    assert project.find_project_file() == project_dir / ".gscli"
+    assert project.find_project_file(project_dir.parent) is None
+
+    binding = utils.retrieve_current_assignment()
+    assert (binding["course"], binding["assignment"], binding["root"]) == ("1197898", "7308477", str(project_dir))
+
+
+def test_project_takes_precedence_over_the_global_assignment(project_dir, monkeypatch):
+    utils.write_to_current_assignment_file("Systems", "1", "Malloc Lab", "2")
+    monkeypatch.chdir(project_dir.parent)
+    assert utils.retrieve_current_assignment()["assignment"] == "2"
+
+    monkeypatch.chdir(project_dir)
+    result = CliRunner().invoke(app, [])
+    assert "Calculator (7308477)" in result.stdout
+    assert "Set for this project" in result.stdout
+
+
+def test_rewriting_keeps_project_settings(project_dir):
+    path = project_dir / ".gscli"
+    data = json.loads(path.read_text())
+    data.update(files=["src"], ignore=["__pycache__"], leaderboard="me")
+    path.write_text(json.dumps(data))
+
+    project.write_project_file(project_dir, "Python", "1197898", "Calculator 2", "7308478")
+
+    data = json.loads(path.read_text())
+    assert (data["assignment"], data["files"], data["leaderboard"]) == ("7308478", ["src"], "me")
+
+
+def test_ignore_rules(project_dir):
+    files = utils.collect_file_objs([str(project_dir)], recursive=True, ignore=["__pycache__/", "*.txt"])
+    assert [Path(f.name).name for f in files] == ["calculator.py"]
+    for f in files:
+        f.close()
+
+
+@pytest.mark.parametrize("content", ['[1, 2]', '{"course": "1"}', '{"course": "1", '])
+def test_invalid_project_files_are_reported_and_ignored(project_dir, monkeypatch, content):
+    utils.write_to_current_assignment_file("Systems", "1", "Malloc Lab", "2")
+    (project_dir / ".gscli").write_text(content)
+    monkeypatch.setattr(project, "_reported", set())
+    monkeypatch.chdir(project_dir)
+
+    result = CliRunner().invoke(app, [])
+
+    assert result.exit_code == 0
+    assert "Malloc Lab (2)" in result.stdout
+    assert "Ignoring" in result.stderr
+
+
+def test_names_are_optional(project_dir, monkeypatch):
+    (project_dir / ".gscli").write_text('{"course": "1197898", "assignment": 7308477}')
+    monkeypatch.chdir(project_dir)
+
+    result = CliRunner().invoke(app, [])
+
+    assert result.exit_code == 0
+    assert "You're working on 7308477 (7308477) for 1197898 (1197898)" in result.stdout
+
+
+def test_choose_inside_a_project_updates_its_binding(project_dir, monkeypatch):
+    import questionary
+
+    class FakeClient:
+        def list_courses(self):
+            return {"1": SimpleNamespace(name="Systems", semester="Fall", year="2025")}
+
+        def list_assignments(self, course_id):
+            return [SimpleNamespace(assignment_id="2", name="Malloc Lab", release_date=None, due_date=None,
+                                    late_due_date=None, grade=None, max_grade=None)]
+
+        def save_session(self):
+            pass
+
+    monkeypatch.setattr(commands.Client, "restore", classmethod(lambda cls: FakeClient()))
+    monkeypatch.setattr(questionary, "select", lambda message, choices, **kwargs: SimpleNamespace(ask=lambda: choices[0].value))
+    monkeypatch.chdir(project_dir / "src")
+
+    result = CliRunner().invoke(app, ["choose"])
+
+    assert result.exit_code == 0
+    assert "Updated the project binding" in result.stdout
+    assert json.loads((project_dir / ".gscli").read_text())["assignment"] == "2"
+    assert not utils.CURRENT_ASSIGNMENT_FILE.exists()
+
+    result = CliRunner().invoke(app, ["clean"])
+    assert "still bound to an assignment" in result.stdout
@@ -0,0 +1,119 @@
+import requests
+from requests.adapters import BaseAdapter
+
+from gscli.ratelimit import RateLimiter, UPLOAD, NORMAL, POLL, request_priority
+from gscli import session as session_module
+from gscli.session import GscliSession
+from gscli.utils import GRADESCOPE_URL
+
+
+def make_limiter(tmp_path, rate, burst):
+    return RateLimiter(state_file=tmp_path / "ratelimit.json", rate=rate, burst=burst)
+
+
+def test_burst_then_delay(tmp_path):
+    limiter = make_limiter(tmp_path, rate=50, burst=2)
+    waits = [limiter.acquire() for _ in range(4)]
+    assert waits[0] == 0
+    assert waits[-1] > 0
+    counters = limiter.counters()
+    assert counters["requests"] == 4
+    assert counters["delayed"] >= 1
+
+
+def test_uploads_are_not_starved_by_polls(tmp_path):
+    limiter = make_limiter(tmp_path, rate=20, burst=4)
+    limiter.acquire(NORMAL)
+    limiter.acquire(NORMAL)
+    # two tokens left: enough for an upload, but polls must leave half the bucket
+    assert limiter.acquire(UPLOAD) == 0
+    assert limiter.acquire(POLL) > 0
+
+
+def test_budget_is_shared_through_the_state_file(tmp_path):
+    first = make_limiter(tmp_path, rate=50, burst=2)
+    second = make_limiter(tmp_path, rate=50, burst=2)
+    first.acquire()
+    first.acquire()
+    assert second.acquire() > 0
+
+
+def test_throttling_holds_back_requests(tmp_path):
+    limiter = make_limiter(tmp_path, rate=1000, burst=10)
+    limiter.throttled(0.05)
+    assert limiter.acquire() >= 0.04
+    assert limiter.counters()["throttled"] == 1
+
+
+def test_request_priority():
+    poll = requests.Request("GET", f"{GRADESCOPE_URL}/courses/1/assignments/2/submissions/3",
+                            headers={"Accept": "application/json, text/javascript"}).prepare()
+    upload = requests.Request("POST", f"{GRADESCOPE_URL}/courses/1/assignments/2/submissions").prepare()
+    page = requests.Request("GET", f"{GRADESCOPE_URL}/account").prepare()
+    assert (request_priority(poll), request_priority(upload), request_priority(page)) == (POLL, UPLOAD, NORMAL)
+
+
+class TooManyRequests(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = "0"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_session_records_throttled_responses(tmp_path):
+    session = GscliSession(make_limiter(tmp_path, rate=1000, burst=10))
+    session.mount(GRADESCOPE_URL, TooManyRequests())
+    session.get(f"{GRADESCOPE_URL}/account")
+    counters = session.rate_limiter.counters()
+    assert counters["requests"] == 1
+    assert counters["throttled"] == 1
+
+
+def test_session_reuses_pooled_connections(tmp_path, monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    # the server stands in for Gradescope; the same server by another name doesn't
+    monkeypatch.setattr(session_module, "GRADESCOPE_URL", url.rstrip("/"))
+    other_url = f"http://localhost:{server.server_port}/"
+    limiter = make_limiter(tmp_path, rate=1000, burst=1000)
+    try:
+        session = GscliSession(rate_limiter=limiter)
+        for _ in range(5):
+            session.get(url)
+        assert session.connection_stats() == (1, 5)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: session.get(url), range(40)))
+        connections, sent = session.connection_stats()
+        assert connections <= 8 and sent == 45
+        assert limiter.counters()["connections"] == connections
+
+        # connections to other hosts (e.g. file downloads) aren't counted
+        session.get(other_url)
+        assert session.connection_stats()[0] == connections + 1
+        assert limiter.counters()["connections"] == connections
+    finally:
+        server.shutdown()
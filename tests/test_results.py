@@ -0,0 +1,91 @@
+import pytest
+import requests
+from typer.testing import CliRunner
+
+import gscli.gscli as commands
+from gscli import results, poller, timings
+from gscli.cli import app
+
+LINK = "https://www.gradescope.com/courses/1197898/assignments/7308477/submissions/{}"
+
+PROCESSED = {
+    "status": "processed",
+    "results": {"tests": [{"name": "add", "status": "passed", "output": "", "score": 1.0, "max_score": 1.0}]},
+}
+
+
+@pytest.fixture(autouse=True)
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "RESULTS_DIR", tmp_path)
+    monkeypatch.setattr(timings, "TIMINGS_FILE", tmp_path / "timings.jsonl")
+    monkeypatch.setattr(poller, "POLL_INTERVAL", 0)
+
+
+def test_entries_lifecycle():
+    entry = results.new_entry("1197898", "7308477", LINK.format(42))
+    assert entry["submission"] == "42"
+    results.save_entry(entry)
+
+    assert [e["submission"] for e in results.pending_entries()] == ["42"]
+    assert results.unnotified_entries() == []
+
+    results.record_status(entry, PROCESSED)
+    assert results.pending_entries() == []
+    assert [e["submission"] for e in results.unnotified_entries("1197898", "7308477")] == ["42"]
+    assert results.unnotified_entries("1197898", "1") == []
+    assert results.load_entry("42")["results"] == PROCESSED["results"]
+
+
+def test_poll_pending_polls_all_submissions_until_processed(monkeypatch):
+    for submission_id in ("1", "2"):
+        results.save_entry(results.new_entry("1197898", "7308477", LINK.format(submission_id)))
+
+    polls = []
+
+    def fake_fetch(session, link):
+        polls.append(link)
+        # each submission is processed on its second poll
+        if polls.count(link) < 2:
+            return {"status": "autograder_task_started"}
+        return PROCESSED
+
+    monkeypatch.setattr(poller, "fetch_submission_status", fake_fetch)
+    poller.poll_pending(session=None)
+
+    assert len(polls) == 4
+    assert all(e["status"] == "processed" for e in results.all_entries())
+
+
+def test_poll_pending_gives_up_on_old_submissions(monkeypatch):
+    entry = results.new_entry("1197898", "7308477", LINK.format(3))
+    entry["submitted_at"] -= results.DETACHED_TIMEOUT + 1
+    results.save_entry(entry)
+
+    monkeypatch.setattr(poller, "fetch_submission_status", lambda session, link: pytest.fail("polled"))
+    poller.poll_pending(session=None)
+
+    assert results.load_entry("3")["gave_up"]
+    assert results.pending_entries() == []
+
+
+def test_submission_survives_a_failed_wait(monkeypatch):
+    class FakeClient:
+        def submit(self, course, assignment, files, leaderboard_name=None):
+            return LINK.format(77)
+
+        def wait_for_results(self, *args, **kwargs):
+            raise requests.ConnectionError("connection reset")
+
+        def save_session(self):
+            pass
+
+    spawned = []
+    monkeypatch.setattr(commands.Client, "restore", classmethod(lambda cls: FakeClient()))
+    monkeypatch.setattr(commands, "spawn_poller", lambda: spawned.append(True))
+
+    result = CliRunner().invoke(app, ["submit", "-c", "1197898", "-a", "7308477", "--no-checks", "tests/uploads/correct/calculator.py"])
+
+    assert result.exit_code == 0
+    assert "connection reset" in result.output
+    assert [e["submission"] for e in results.pending_entries()] == ["77"]
+    assert spawned
@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from gscli.search import AssignmentIndex, fuzzy_score
+
+
+def make_assignments(*names):
+    return [SimpleNamespace(assignment_id=str(100 + i), name=name) for i, name in enumerate(names)]
+
+
+def test_fuzzy_score():
+    assert fuzzy_score("hw1", "homework 1") is not None
+    assert fuzzy_score("hw 1", "homework 1") == fuzzy_score("hw1", "homework 1")
+    assert fuzzy_score("xyz", "homework 1") is None
+    # a tighter match scores better
+    assert fuzzy_score("hw", "hw 1") < fuzzy_score("hw", "homework 1")
+
+
+def test_assignment_index_search():
+    index = AssignmentIndex()
+    index.add("1", "Python", make_assignments("Homework 1", "Calculator", "Project"))
+    index.add("2", "Systems", make_assignments("Malloc Lab", "Shell Lab"))
+
+    assert index.search("calc") == ["Python / Calculator (101)"]
+    assert index.search("sys lab") == ["Systems / Shell Lab (101)", "Systems / Malloc Lab (100)"]
+    assert len(index.search("")) == 5
+
+    course_id, assignment = index.entries["Systems / Shell Lab (101)"]
+    assert (course_id, assignment.name) == ("2", "Shell Lab")
@@ -0,0 +1,117 @@
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from gscli.utils import GRADESCOPE_URL, parse_target_time, stage_upload, dispatch_staged_upload, build_archive, ARCHIVE_NAME
+
+COURSE_ID = "1197898"
+ASSIGNMENT_ID = "7308477"
+CORRECT_CALCULATOR_FILE_PATH = "tests/uploads/correct/calculator.py"
+
+
+class FakeGradescope(BaseAdapter):
+    """Transport adapter answering the two requests an upload makes."""
+
+    def __init__(self, upload_location: str):
+        super().__init__()
+        self.upload_location = upload_location
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if request.method == "GET":
+            response.status_code = 200
+            response._content = b'<html><head><meta name="csrf-token" content="token123"></head></html>'
+        else:
+            response.status_code = 302
+            response.headers["Location"] = self.upload_location
+            response._content = b""
+        return response
+
+    def close(self):
+        pass
+
+
+def make_session(upload_location: str) -> tuple[requests.Session, FakeGradescope]:
+    session = requests.Session()
+    adapter = FakeGradescope(upload_location)
+    session.mount(GRADESCOPE_URL, adapter)
+    return session, adapter
+
+
+def test_parse_target_time_today():
+    target = datetime.now() + timedelta(minutes=5)
+    parsed = parse_target_time(target.strftime("%H:%M:%S"))
+    assert parsed.tzinfo is not None
+    assert (parsed.hour, parsed.minute, parsed.second) == (target.hour, target.minute, target.second)
+
+
+def test_parse_target_time_rejects_past_and_garbage():
+    with pytest.raises(ValueError):
+        parse_target_time((datetime.now() - timedelta(days=1)).isoformat())
+    with pytest.raises(ValueError):
+        parse_target_time("tomorrow-ish")
+
+
+def test_staged_upload_is_sent_in_one_request():
+    submission = f"{GRADESCOPE_URL}/courses/{COURSE_ID}/assignments/{ASSIGNMENT_ID}/submissions/42"
+    session, adapter = make_session(submission)
+
+    with open(CORRECT_CALCULATOR_FILE_PATH, "rb") as f:
+        staged = stage_upload(session, COURSE_ID, ASSIGNMENT_ID, [f], leaderboard_name="name")
+
+    assert b"token123" in staged.request.body
+    assert b"calculator.py" in staged.request.body
+    assert len(adapter.sent) == 1
+
+    link, latency = dispatch_staged_upload(session, staged)
+    assert link == submission
+    assert latency >= 0
+    assert len(adapter.sent) == 2
+
+
+def test_rejected_staged_upload():
+    session, _ = make_session(f"{GRADESCOPE_URL}/courses/{COURSE_ID}")
+
+    with open(CORRECT_CALCULATOR_FILE_PATH, "rb") as f:
+        staged = stage_upload(session, COURSE_ID, ASSIGNMENT_ID, [f])
+
+    link, _ = dispatch_staged_upload(session, staged)
+    assert link is None
+
+
+def test_archive_is_deterministic(tmp_path):
+    for name in ("b.py", "a.py", "sub/c.txt"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(f"# {name}\n" * 100)
+    paths = [tmp_path / "b.py", tmp_path / "a.py", tmp_path / "sub" / "c.txt"]
+
+    archives = []
+    for order in (paths, paths[::-1]):
+        files = [open(p, "rb") for p in order]
+        archives.append(build_archive(files, compression_level=9))
+        for f in files:
+            f.close()
+
+    assert archives[0].getvalue() == archives[1].getvalue()
+    assert archives[0].name == ARCHIVE_NAME
+    with zipfile.ZipFile(archives[0]) as zf:
+        assert zf.namelist() == ["a.py", "b.py", "sub/c.txt"]
+        assert zf.read("sub/c.txt") == (tmp_path / "sub" / "c.txt").read_bytes()
+        assert zf.getinfo("a.py").compress_size < zf.getinfo("a.py").file_size
+
+
+def test_archive_is_staged_as_one_part():
+    session, _ = make_session(f"{GRADESCOPE_URL}/courses/{COURSE_ID}/assignments/{ASSIGNMENT_ID}/submissions/42")
+
+    with open(CORRECT_CALCULATOR_FILE_PATH, "rb") as f:
+        staged = stage_upload(session, COURSE_ID, ASSIGNMENT_ID, [build_archive([f], compression_level=0)])
+
+    assert staged.request.body.count(b"submission[files][]") == 1
+    assert f'filename="{ARCHIVE_NAME}"'.encode() in staged.request.body
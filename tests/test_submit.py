@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import pytest
 from typer.testing import CliRunner
 from gscli.cli import app
@@ -27,7 +29,7 @@ def runner():
     return CliRunner()
 
 @pytest.fixture
-def invoke_cli(runner):
+def invoke_cli(runner, cassette):
     def _invoke(args, input=None):
         return runner.invoke(app, args, input=input)
     return _invoke
@@ -50,6 +52,8 @@ def test_can_restore_session(invoke_cli):
     assert result.exit_code == 0
     assert "Please log in to Gradescope. Your credentials will not be saved anywhere." in result.stdout
     assert "Thank you! You are now logged in." in result.stdout
+    assert PYTHON_ASSIGNMENT_1 in result.stdout
+    assert result.stderr == ""
 
     # Now, try to submit again, which should restore the session
     result = invoke_cli([
@@ -68,8 +72,8 @@ def test_submit_valid_file(invoke_cli):
 
     result = invoke_cli([
         "submit",
-        PYTHON_COURSE_ID,
-        PYTHON_ASSIGNMENT_1,
+        "-c", PYTHON_COURSE_ID,
+        "-a", PYTHON_ASSIGNMENT_1,
         CORRECT_CALCULATOR_FILE_PATH,
         "-n",
         "leaderboard-name"
@@ -91,15 +95,15 @@ def test_wrong_password(invoke_cli):
 
     clear_session_cache()
 
-    assert "Invalid credentials" in result.stdout
+    assert "Invalid credentials" in result.output
 
 def test_wrong_course_id(invoke_cli):
     clear_session_cache()
     
     result = invoke_cli([
         "submit",
-        "0" * len(PYTHON_COURSE_ID),
-        PYTHON_ASSIGNMENT_1,
+        "-c", "0" * len(PYTHON_COURSE_ID),
+        "-a", PYTHON_ASSIGNMENT_1,
         CORRECT_CALCULATOR_FILE_PATH,
         "-n",
         "leaderboard-name"
@@ -110,6 +114,43 @@ def test_wrong_course_id(invoke_cli):
     assert "Failed to submit" in result.output
     assert "Autograder Results:" not in result.stdout
 
+def test_status_of_latest_submission(invoke_cli):
+    clear_session_cache()
+
+    result = invoke_cli([
+        "status",
+        PYTHON_COURSE_ID,
+        PYTHON_ASSIGNMENT_1,
+    ], input=f"{STUDENT_EMAIL_1}\n{STUDENT_PASSWORD_1}\n")
+
+    clear_session_cache()
+
+    assert result.exit_code == 0
+    assert "View your submission at" in result.stdout
+    assert result.stderr == ""
+
+
+def test_choose_course_and_assignment(invoke_cli, monkeypatch):
+    import questionary
+
+    def select(message, choices, **kwargs):
+        # picks the python course, then its first assignment
+        wanted = PYTHON_COURSE_ID if message == "Select a course:" else PYTHON_ASSIGNMENT_1
+        choice = next(c for c in choices if getattr(c.value, "assignment_id", c.value) == wanted)
+        return SimpleNamespace(ask=lambda: choice.value)
+
+    monkeypatch.setattr(questionary, "select", select)
+    clear_session_cache()
+
+    result = invoke_cli(["choose"], input=f"{STUDENT_EMAIL_1}\n{STUDENT_PASSWORD_1}\n")
+
+    clear_session_cache()
+
+    assert result.exit_code == 0
+    assert "You're working on" in result.stdout
+    assert f"({PYTHON_ASSIGNMENT_1}) for" in result.stdout
+
+
 # def test_assignment_unavailable(invoke_cli):
 #     email = os.getenv("STUDENT2_EMAIL")
 #     password = os.getenv("STUDENT2_PASSWORD")
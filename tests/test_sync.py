@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from typer.testing import CliRunner
+
+import gscli.gscli as commands
+from gscli import index, results
+from gscli.cli import app
+from gscli.client import SubmissionStatus
+
+NOW = datetime.now(timezone.utc)
+PROCESSED = {
+    "status": "processed",
+    "results": {"tests": [{"name": "add", "status": "passed", "output": "", "score": 1.0, "max_score": 1.0}]},
+}
+
+
+def assignment(assignment_id, name):
+    return SimpleNamespace(
+        assignment_id=assignment_id, name=name, release_date=NOW - timedelta(days=1), due_date=NOW + timedelta(days=1),
+        late_due_date=None, grade="8.0", max_grade="10.0",
+    )
+
+
+class FakeClient:
+    """Serves one course with two assignments, each with a processed latest submission."""
+
+    def __init__(self):
+        self.fetched = []
+
+    def list_courses(self):
+        return {"1": SimpleNamespace(name="Python", semester="Fall", year="2025")}
+
+    def list_assignments(self, course_id):
+        return [assignment("10", "Homework 1"), assignment("11", "Homework 2")]
+
+    def latest_submissions(self, course_id):
+        return {"10": "100", "11": "110"}
+
+    def submission_status(self, link):
+        self.fetched.append(link)
+        return SubmissionStatus(link, "processed", None, PROCESSED)
+
+    def save_session(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def mirror(tmp_path, monkeypatch):
+    monkeypatch.setattr(index, "INDEX_FILE", tmp_path / "index.json")
+    monkeypatch.setattr(results, "RESULTS_DIR", tmp_path / "results")
+    fake = FakeClient()
+    monkeypatch.setattr(commands.Client, "restore", classmethod(lambda cls: fake))
+    return fake
+
+
+def test_sync_is_incremental(mirror):
+    runner = CliRunner()
+    assert runner.invoke(app, ["sync"]).exit_code == 0
+    assert len(mirror.fetched) == 2
+    assert index.load_index()["courses"]["1"]["assignments"]["11"]["submission"] == "110"
+    assert results.unnotified_entries() == []
+
+    # processed results are never fetched again
+    assert runner.invoke(app, ["sync"]).exit_code == 0
+    assert len(mirror.fetched) == 2
+
+
+def test_reindexing_keeps_mirrored_submissions(mirror):
+    CliRunner().invoke(app, ["sync"])
+    data = index.load_index()
+    index.index_assignments(data, "1", [assignment("10", "Homework 1")])
+    assert data["courses"]["1"]["assignments"]["10"]["submission"] == "100"
+
+
+def test_offline_commands_answer_from_the_mirror(mirror, monkeypatch):
+    CliRunner().invoke(app, ["sync"])
+    monkeypatch.setattr(commands.Client, "restore", classmethod(lambda cls: pytest.fail("went online")))
+
+    result = CliRunner().invoke(app, ["--offline", "list"])
+    assert result.exit_code == 0
+    assert "Offline: courses as of" in result.stdout
+    assert "Homework 2" in result.stdout and "[8.0/10.0]" in result.stdout
+
+    result = CliRunner().invoke(app, ["--offline", "status", "1", "10"])
+    assert result.exit_code == 0
+    assert "Offline: status as of" in result.stdout
+    assert "add" in result.stdout
+
+    result = CliRunner().invoke(app, ["--offline", "submit", "-c", "1", "-a", "10", "calculator.py"])
+    assert result.exit_code == 1
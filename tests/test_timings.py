@@ -0,0 +1,78 @@
+import pytest
+from typer.testing import CliRunner
+
+from gscli import poller, results, timings
+from gscli.cli import app
+
+LINK = "https://www.gradescope.com/courses/1197898/assignments/7308477/submissions/{}"
+PROCESSED = {
+    "status": "processed",
+    "results": {"tests": [{"name": "add", "status": "passed", "output": "", "score": 1.0, "max_score": 1.0}]},
+}
+
+
+@pytest.fixture(autouse=True)
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "RESULTS_DIR", tmp_path)
+    monkeypatch.setattr(timings, "TIMINGS_FILE", tmp_path / "timings.jsonl")
+
+
+def follow(submission_id, started_after, done_after, uploaded=1000.0):
+    """Record a submission that started running and was processed the given seconds after its upload."""
+    entry = results.new_entry("1197898", "7308477", LINK.format(submission_id))
+    results.note_phase(entry, timings.UPLOADED, uploaded)
+    results.note_phase(entry, "autograder_task_started", uploaded + started_after)
+    results.note_phase(entry, "processed", uploaded + done_after)
+    results.record_status(entry, PROCESSED)
+
+
+def test_processed_submissions_record_their_timing():
+    follow("1", started_after=5, done_after=25)
+
+    assert timings.load_timings() == [["1197898", "7308477", 1000.0, 5, 20, 25]]
+    assert timings.load_timings(assignment="1") == []
+
+
+def test_only_submissions_whose_upload_was_seen_are_timed():
+    entry = results.new_entry("1197898", "7308477", LINK.format(2))
+    results.record_status(entry, PROCESSED)
+    assert timings.load_timings() == []
+
+
+def test_percentiles():
+    for i in range(1, 21):
+        follow(str(i), started_after=i, done_after=10 * i)
+
+    summary = timings.summarize(timings.load_timings())
+    assert summary["count"] == 20
+    assert summary["queue"] == (10, 19)
+    assert summary["total"] == (100, 190)
+    assert timings.expected_total("1197898", "7308477") == (100, 190)
+    assert timings.earliest_results("1197898", "7308477") == 10
+    assert timings.earliest_results("1197898", "1") == 0
+
+
+def test_poller_skips_polls_before_results_can_be_ready(monkeypatch):
+    for i in range(timings.MIN_SAMPLES):
+        follow(str(i), started_after=30, done_after=60)
+    results.save_entry(results.new_entry("1197898", "7308477", LINK.format(99)))
+
+    class OneRound(Exception):
+        pass
+
+    def end_round(seconds):
+        raise OneRound
+
+    monkeypatch.setattr(poller, "fetch_submission_status", lambda session, link: pytest.fail("polled too early"))
+    monkeypatch.setattr(poller.time, "sleep", end_round)
+    with pytest.raises(OneRound):
+        poller.poll_pending(session=None)
+    assert results.load_entry("99")["status"] == "unprocessed"
+
+
+def test_stats_command():
+    follow("1", started_after=5, done_after=65)
+    result = CliRunner().invoke(app, ["stats"])
+    assert result.exit_code == 0
+    assert "0:05 / 0:05" in result.stdout
+    assert "1:05 / 1:05" in result.stdout
@@ -0,0 +1,119 @@
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gscli import results, timings, watch
+
+LINK = "https://www.gradescope.com/courses/{}/assignments/{}/submissions/{}"
+
+PROCESSED = {
+    "status": "processed",
+    "results": {"tests": [{"name": "add", "status": "passed", "output": "", "score": 1.0, "max_score": 1.0}]},
+}
+
+
+@pytest.fixture(autouse=True)
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "RESULTS_DIR", tmp_path)
+    monkeypatch.setattr(timings, "TIMINGS_FILE", tmp_path / "timings.jsonl")
+
+
+def fake_fetch(processed_after: int):
+    """A fetch_submission_status whose submissions are processed on their processed_after'th poll."""
+    polls = []
+
+    def fetch(session, link):
+        polls.append(link)
+        return PROCESSED if polls.count(link) >= processed_after else {"status": "autograder_task_started"}
+
+    return fetch, polls
+
+
+def test_discover_finds_unfinished_submissions_once(monkeypatch):
+    results.save_entry(results.new_entry("1", "10", LINK.format(1, 10, 100)))
+    index = {"courses": {}, "deadlines": [[time.time() + 3600, "due", "1", "10"], [time.time() - 60, "due", "2", "20"]]}
+    pages = {"1": {"10": "100", "11": "110"}, "2": {"20": "200", "21": "210"}}
+    monkeypatch.setattr(watch, "get_submissions", lambda session, course_id: pages[course_id])
+    statuses = {"110": PROCESSED, "200": {"status": "unprocessed"}, "210": PROCESSED}
+    fetched = []
+
+    def fetch(session, link):
+        fetched.append(link)
+        return statuses[results.submission_id_from_link(link)]
+
+    monkeypatch.setattr(watch, "fetch_submission_status", fetch)
+
+    found = watch.discover(None, index)
+    assert [e["submission"] for e in found] == ["100", "200"]
+    assert len(fetched) == 3  # 100 was already known to be pending
+
+    # what was learned is remembered: nothing is fetched again
+    fetched.clear()
+    assert [e["submission"] for e in watch.discover(None, index, course="2")] == ["200"]
+    assert fetched == []
+    assert results.unnotified_entries() == []
+
+
+def test_discover_reports_failures_and_skips_given_up_submissions(monkeypatch):
+    given_up = results.new_entry("1", "12", LINK.format(1, 12, 120))
+    given_up["gave_up"] = True
+    results.save_entry(given_up)
+    index = {"courses": {}, "deadlines": [[time.time() + 3600, "due", "1", "10"], [time.time() + 3600, "due", "2", "20"]]}
+    pages = {"1": {"10": "100", "11": "110", "12": "120"}}
+    submitted = datetime.now(timezone.utc) - timedelta(hours=2)
+
+    def get_page(session, course_id):
+        if course_id not in pages:
+            raise RuntimeError("page unavailable")
+        return pages[course_id]
+
+    def fetch(session, link):
+        submission_id = results.submission_id_from_link(link)
+        if submission_id == "100":
+            raise RuntimeError("status unavailable")
+        assert submission_id == "110"
+        return {"status": "unprocessed", "created_at": submitted.isoformat()}
+
+    monkeypatch.setattr(watch, "get_submissions", get_page)
+    monkeypatch.setattr(watch, "fetch_submission_status", fetch)
+    errors = []
+
+    found = watch.discover(None, index, on_error=errors.append)
+
+    assert [e["submission"] for e in found] == ["110"]
+    # the entry is as old as the submission, not as its discovery
+    assert found[0]["submitted_at"] == pytest.approx(submitted.timestamp())
+    assert sorted(errors) == [
+        "Could not fetch the status of submission 100: status unavailable",
+        "Could not list the submissions of course 2: page unavailable",
+    ]
+
+
+def test_scheduler_staggers_and_drops_processed_submissions(monkeypatch):
+    entries = [results.new_entry("1", "10", LINK.format(1, 10, i)) for i in range(4)]
+    fetch, polls = fake_fetch(processed_after=2)
+    monkeypatch.setattr(watch, "fetch_submission_status", fetch)
+    scheduler = watch.PollScheduler(None, entries, interval=4, batch_size=8)
+    start = scheduler.next_poll()
+
+    with ThreadPoolExecutor() as executor:
+        # the first polls are spread over one interval
+        assert len(scheduler.step(executor, now=start)) == 1
+        assert len(scheduler.step(executor, now=start + 2.5)) == 2
+        while not scheduler.done:
+            scheduler.step(executor, now=scheduler.next_poll())
+
+    assert len(polls) == scheduler.requests == 8
+    assert all(e["status"] == "processed" for e in results.all_entries())
+
+
+def test_scheduler_gives_up_on_old_submissions(monkeypatch):
+    entry = results.new_entry("1", "10", LINK.format(1, 10, 5))
+    entry["submitted_at"] -= results.DETACHED_TIMEOUT + 1
+    monkeypatch.setattr(watch, "fetch_submission_status", lambda session, link: pytest.fail("polled"))
+
+    watch.PollScheduler(None, [entry], interval=0).run()
+
+    assert results.load_entry("5")["gave_up"]